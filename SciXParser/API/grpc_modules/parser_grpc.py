@@ -221,3 +221,299 @@ class ParserMonitor(object):
             timeout,
             metadata,
         )
+
+
+"""gRPC definitions for submitting bulk reparse jobs"""
+
+
+class ParserBulkStub(object):
+    """The Stub for connecting to the Parser bulk service."""
+
+    def __init__(self, channel, avroserialhelper):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.bulkParser = channel.stream_stream(
+            "/parseraapi.ParserBulk/bulkParser",
+            request_serializer=avroserialhelper.avro_serializer,
+            response_deserializer=avroserialhelper.avro_deserializer,
+        )
+
+
+class ParserBulkServicer(object):
+    """The servicer definition for streaming chunks of records to be reparsed to the Parser pipeline."""
+
+    def bulkParser(self, request_iterator, context):
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+
+def add_ParserBulkServicer_to_server(servicer, server, avroserialhelper):
+    """The actual methods for sending and receiving RPC calls."""
+    rpc_method_handlers = {
+        "bulkParser": grpc.stream_stream_rpc_method_handler(
+            servicer.bulkParser,
+            request_deserializer=avroserialhelper.avro_deserializer,
+            response_serializer=avroserialhelper.avro_serializer,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        "parseraapi.ParserBulk", rpc_method_handlers
+    )
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+class ParserBulk(object):
+    """The definition of the bulk Parser gRPC API and stream connections."""
+
+    @staticmethod
+    def bulkParser(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/parseraapi.ParserBulk/bulkParser",
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+
+"""gRPC definitions for viewing parsed data in bulk"""
+
+
+class ParserViewBulkStub(object):
+    """The Stub for connecting to the Parser bulk view service."""
+
+    def __init__(self, channel, avroserialhelper):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.viewParserBulk = channel.stream_stream(
+            "/parseraapi.ParserViewBulk/viewParserBulk",
+            request_serializer=avroserialhelper.avro_serializer,
+            response_deserializer=avroserialhelper.avro_deserializer,
+        )
+
+
+class ParserViewBulkServicer(object):
+    """The servicer definition for streaming the parsed data of many records."""
+
+    def viewParserBulk(self, request_iterator, context):
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+
+def add_ParserViewBulkServicer_to_server(servicer, server, avroserialhelper):
+    """The actual methods for sending and receiving RPC calls."""
+    rpc_method_handlers = {
+        "viewParserBulk": grpc.stream_stream_rpc_method_handler(
+            servicer.viewParserBulk,
+            request_deserializer=avroserialhelper.avro_deserializer,
+            response_serializer=avroserialhelper.avro_serializer,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        "parseraapi.ParserViewBulk", rpc_method_handlers
+    )
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+class ParserViewBulk(object):
+    """The definition of the bulk view Parser gRPC API and stream connections."""
+
+    @staticmethod
+    def viewParserBulk(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/parseraapi.ParserViewBulk/viewParserBulk",
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+
+"""gRPC definitions for monitoring batches of jobs"""
+
+
+class ParserMonitorBulkStub(object):
+    """The Stub for connecting to the Parser bulk monitor service."""
+
+    def __init__(self, channel, avroserialhelper):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.monitorParserBulk = channel.stream_stream(
+            "/parseraapi.ParserMonitorBulk/monitorParserBulk",
+            request_serializer=avroserialhelper.avro_serializer,
+            response_deserializer=avroserialhelper.avro_deserializer,
+        )
+
+
+class ParserMonitorBulkServicer(object):
+    """The servicer definition for monitoring the progress of batches of jobs."""
+
+    def monitorParserBulk(self, request_iterator, context):
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+
+def add_ParserMonitorBulkServicer_to_server(servicer, server, avroserialhelper):
+    """The actual methods for sending and receiving RPC calls."""
+    rpc_method_handlers = {
+        "monitorParserBulk": grpc.stream_stream_rpc_method_handler(
+            servicer.monitorParserBulk,
+            request_deserializer=avroserialhelper.avro_deserializer,
+            response_serializer=avroserialhelper.avro_serializer,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        "parseraapi.ParserMonitorBulk", rpc_method_handlers
+    )
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+class ParserMonitorBulk(object):
+    """The definition of the bulk Monitor gRPC API and stream connections."""
+
+    @staticmethod
+    def monitorParserBulk(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/parseraapi.ParserMonitorBulk/monitorParserBulk",
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+
+"""gRPC definitions for reparsing the records selected by a query"""
+
+
+class ParserInitQueryStub(object):
+    """The Stub for connecting to the Parser query init service."""
+
+    def __init__(self, channel, avroserialhelper):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.initParserQuery = channel.unary_stream(
+            "/parseraapi.ParserInitQuery/initParserQuery",
+            request_serializer=avroserialhelper.avro_serializer,
+            response_deserializer=avroserialhelper.avro_deserializer,
+        )
+
+
+class ParserInitQueryServicer(object):
+    """The servicer definition for reparsing every record matching a query with the Parser pipeline."""
+
+    def initParserQuery(self, request, context):
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+
+def add_ParserInitQueryServicer_to_server(servicer, server, avroserialhelper):
+    """The actual methods for sending and receiving RPC calls."""
+    rpc_method_handlers = {
+        "initParserQuery": grpc.unary_stream_rpc_method_handler(
+            servicer.initParserQuery,
+            request_deserializer=avroserialhelper.avro_deserializer,
+            response_serializer=avroserialhelper.avro_serializer,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        "parseraapi.ParserInitQuery", rpc_method_handlers
+    )
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+class ParserInitQuery(object):
+    """The definition of the query Parser gRPC API and stream connections."""
+
+    @staticmethod
+    def initParserQuery(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/parseraapi.ParserInitQuery/initParserQuery",
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
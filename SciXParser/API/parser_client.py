@@ -61,6 +61,38 @@ def input_parser(cli_args):
         default=None,
         help="File path containing a list of the records to be reparsed, one per line.",
     )
+    process_parser.add_argument(
+        "--chunk-size",
+        action="store",
+        dest="chunk_size",
+        type=int,
+        default=1000,
+        help="Number of records from --uuid-file streamed to the server per chunk.",
+    )
+    process_parser.add_argument(
+        "--source",
+        action="store",
+        dest="source",
+        type=str,
+        default=None,
+        help="Reparse every record of this source, e.g. ARXIV.",
+    )
+    process_parser.add_argument(
+        "--modified-since",
+        action="store",
+        dest="modified_since",
+        type=str,
+        default=None,
+        help="Reparse every record last modified at or after this ISO 8601 date.",
+    )
+    process_parser.add_argument(
+        "--modified-until",
+        action="store",
+        dest="modified_until",
+        type=str,
+        default=None,
+        help="Reparse every record last modified before this ISO 8601 date.",
+    )
 
     process_parser = subparsers.add_parser("VIEW", help="Initialize a job with given inputs")
     process_parser.add_argument(
@@ -77,11 +109,90 @@ def input_parser(cli_args):
         type=str,
         help="The UUID of the record to be reparsed.",
     )
+    process_parser.add_argument(
+        "--uuid-file",
+        action="store",
+        dest="uuid_file",
+        type=str,
+        default=None,
+        help="File path containing a list of the records to be viewed, one per line.",
+    )
+    process_parser.add_argument(
+        "--source",
+        action="store",
+        dest="source",
+        type=str,
+        default=None,
+        help="View every record of this source, e.g. ARXIV.",
+    )
+    process_parser.add_argument(
+        "--modified-since",
+        action="store",
+        dest="modified_since",
+        type=str,
+        default=None,
+        help="View every record last modified at or after this ISO 8601 date.",
+    )
+    process_parser.add_argument(
+        "--modified-until",
+        action="store",
+        dest="modified_until",
+        type=str,
+        default=None,
+        help="View every record last modified before this ISO 8601 date.",
+    )
+    process_parser.add_argument(
+        "--chunk-size",
+        action="store",
+        dest="chunk_size",
+        type=int,
+        default=1000,
+        help="Number of records from --uuid-file streamed to the server per chunk.",
+    )
+    process_parser.add_argument(
+        "--output",
+        action="store",
+        dest="output",
+        type=str,
+        default=None,
+        help="File to write the parsed records to as JSON lines. Defaults to stdout.",
+    )
 
     process_parser = subparsers.add_parser("MONITOR", help="Initialize a job with given inputs")
     process_parser.add_argument(
         "--uuid", action="store", dest="uuid", type=str, help="Job ID string to query."
     )
+    process_parser.add_argument(
+        "--uuid-file",
+        action="store",
+        dest="uuid_file",
+        type=str,
+        default=None,
+        help="File path containing a list of the job IDs to monitor together, one per line.",
+    )
+    process_parser.add_argument(
+        "--batch-id",
+        action="store",
+        dest="batch_id",
+        type=str,
+        default=None,
+        help="The batch of jobs to monitor, along with the jobs in --uuid-file.",
+    )
+    process_parser.add_argument(
+        "--events",
+        action="store_true",
+        dest="events",
+        default=False,
+        help="Also print the final status of each job in the batch.",
+    )
+    process_parser.add_argument(
+        "--chunk-size",
+        action="store",
+        dest="chunk_size",
+        type=int,
+        default=1000,
+        help="Number of job IDs from --uuid-file streamed to the server per chunk.",
+    )
     process_parser.add_argument(
         "--persistence",
         action="store_true",
@@ -89,6 +200,14 @@ def input_parser(cli_args):
         default=False,
         help="Specify whether server keeps channel open to client during processing.",
     )
+    process_parser.add_argument(
+        "--last-id",
+        action="store",
+        dest="last_id",
+        type=str,
+        default=None,
+        help="Resume a persistent stream after the last_id of a status it returned.",
+    )
     args = parser.parse_args(cli_args)
     return args
 
@@ -102,8 +221,11 @@ def output_message(args):
     if s["task"] == "REPARSE":
         s["force"] = args.force
         s["resend"] = args.resend
-        if args.uuid_file:
-            s["record_id"] = break_bulk_entries(args)
+    if s["task"] == "MONITOR":
+        s["last_id"] = args.last_id
+
+    if getattr(args, "uuid_file", None):
+        s["record_id"] = break_bulk_entries(args)
 
     if not s["record_id"]:
         raise AttributeError("No record identifiers provided. Stopping.")
@@ -120,6 +242,98 @@ def break_bulk_entries(args):
         raise e
 
 
+def read_uuid_chunks(uuid_file, chunk_size):
+    """
+    Yields the UUIDs in uuid_file, one or more per line, in lists of at most chunk_size
+    without reading the whole file into memory.
+    """
+    chunk = []
+    with open(uuid_file, "r") as f:
+        for line in f:
+            for uuid in line.split():
+                chunk.append(uuid)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def bulk_requests(args):
+    """Yields the bulk REPARSE request for each chunk of the UUIDs in args.uuid_file."""
+    for record_ids in read_uuid_chunks(args.uuid_file, args.chunk_size):
+        yield {"record_ids": record_ids, "force": args.force, "resend": args.resend}
+
+
+def init_query(args):
+    """Returns whether args select the records to REPARSE by filters."""
+    return args.action == "REPARSE" and any(
+        (args.source, args.modified_since, args.modified_until)
+    )
+
+
+def init_query_request(args):
+    """Returns the REPARSE by query request with the filters in args."""
+    return {
+        "source": args.source,
+        "modified_since": args.modified_since,
+        "modified_until": args.modified_until,
+        "force": args.force,
+        "resend": args.resend,
+    }
+
+
+def view_bulk(args):
+    """Returns whether args select the records to VIEW by a file or filters."""
+    return args.action == "VIEW" and any(
+        (args.uuid_file, args.source, args.modified_since, args.modified_until)
+    )
+
+
+def view_bulk_requests(args):
+    """
+    Yields the bulk VIEW request for each chunk of the UUIDs in args.uuid_file, or a single
+    request with the filters in args.
+    """
+    if args.uuid_file:
+        for record_ids in read_uuid_chunks(args.uuid_file, args.chunk_size):
+            yield {"record_ids": record_ids}
+    else:
+        yield {
+            "record_ids": [],
+            "source": args.source,
+            "modified_since": args.modified_since,
+            "modified_until": args.modified_until,
+        }
+
+
+def monitor_bulk(args):
+    """Returns whether args select a batch of jobs to MONITOR."""
+    return args.action == "MONITOR" and bool(args.uuid_file or args.batch_id)
+
+
+def monitor_bulk_requests(args):
+    """
+    Yields the bulk MONITOR request for each chunk of the job IDs in args.uuid_file, or a
+    single request for args.batch_id.
+    """
+    request = {"batch_id": args.batch_id, "events": args.events, "persistence": args.persistence}
+    if args.uuid_file:
+        for record_ids in read_uuid_chunks(args.uuid_file, args.chunk_size):
+            yield dict(request, record_ids=record_ids)
+    else:
+        yield dict(request, record_ids=[])
+
+
+async def write_jsonl(responses, output):
+    """Writes each response to output as a line of JSON and returns the number written."""
+    written = 0
+    async for response in responses:
+        output.write(json.dumps(response) + "\n")
+        written += 1
+    return written
+
+
 async def run() -> None:
     schema_client = SchemaRegistryClient({"url": "http://localhost:8081"})
 
@@ -127,10 +341,101 @@ async def run() -> None:
     schema = get_schema(logger, schema_client, "ParserInputSchema")
     viewschema = get_schema(logger, schema_client, "ParserOutputSchema")
 
+    bulkschema = get_schema(logger, schema_client, "ParserBulkInputSchema")
+    bulkoutputschema = get_schema(logger, schema_client, "ParserBulkOutputSchema")
+
     avroserialhelper = AvroSerialHelper(schema)
     viewserialhelper = AvroSerialHelper(ser_schema=schema, des_schema=viewschema)
+    bulkserialhelper = AvroSerialHelper(ser_schema=bulkschema, des_schema=bulkoutputschema)
     args = input_parser(sys.argv[1:])
     async with grpc.aio.insecure_channel("localhost:50052") as channel:
+        if view_bulk(args):
+            viewbulkschema = get_schema(logger, schema_client, "ParserViewBulkInputSchema")
+            viewbulkserialhelper = AvroSerialHelper(
+                ser_schema=viewbulkschema, des_schema=viewschema
+            )
+            output = open(args.output, "w") if args.output else sys.stdout
+            try:
+                stub = parser_grpc.ParserViewBulkStub(channel, viewbulkserialhelper)
+                written = await write_jsonl(stub.viewParserBulk(view_bulk_requests(args)), output)
+                print("Wrote {} records.".format(written), file=sys.stderr)
+
+            except grpc.aio._call.AioRpcError as e:
+                code = e.code()
+                print(
+                    "gRPC server connection failed with status {}: {}".format(
+                        code.name, code.value
+                    )
+                )
+            finally:
+                if args.output:
+                    output.close()
+            return
+
+        if init_query(args):
+            if args.force and args.resend:
+                raise ValueError(
+                    "Cannot specify --resend-only and --force flags together. Stopping."
+                )
+            initqueryschema = get_schema(logger, schema_client, "ParserInitQueryInputSchema")
+            initqueryserialhelper = AvroSerialHelper(
+                ser_schema=initqueryschema, des_schema=bulkoutputschema
+            )
+            try:
+                stub = parser_grpc.ParserInitQueryStub(channel, initqueryserialhelper)
+                async for response in stub.initParserQuery(init_query_request(args)):
+                    print(response)
+
+            except grpc.aio._call.AioRpcError as e:
+                code = e.code()
+                print(
+                    "gRPC server connection failed with status {}: {}".format(
+                        code.name, code.value
+                    )
+                )
+            return
+
+        if args.action == "REPARSE" and args.uuid_file:
+            if args.force and args.resend:
+                raise ValueError(
+                    "Cannot specify --resend-only and --force flags together. Stopping."
+                )
+            try:
+                stub = parser_grpc.ParserBulkStub(channel, bulkserialhelper)
+                async for response in stub.bulkParser(bulk_requests(args)):
+                    print(response)
+
+            except grpc.aio._call.AioRpcError as e:
+                code = e.code()
+                print(
+                    "gRPC server connection failed with status {}: {}".format(
+                        code.name, code.value
+                    )
+                )
+            return
+
+        if monitor_bulk(args):
+            monitorbulkschema = get_schema(logger, schema_client, "ParserMonitorBulkInputSchema")
+            monitorbulkoutputschema = get_schema(
+                logger, schema_client, "ParserMonitorBulkOutputSchema"
+            )
+            monitorbulkserialhelper = AvroSerialHelper(
+                ser_schema=monitorbulkschema, des_schema=monitorbulkoutputschema
+            )
+            try:
+                stub = parser_grpc.ParserMonitorBulkStub(channel, monitorbulkserialhelper)
+                async for response in stub.monitorParserBulk(monitor_bulk_requests(args)):
+                    print(response)
+
+            except grpc.aio._call.AioRpcError as e:
+                code = e.code()
+                print(
+                    "gRPC server connection failed with status {}: {}".format(
+                        code.name, code.value
+                    )
+                )
+            return
+
         s = output_message(args)
         if s["task"] == "VIEW":
             try:
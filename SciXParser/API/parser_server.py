@@ -1,15 +1,21 @@
 """The Python AsyncIO implementation of the GRPC parser server."""
 
+import asyncio
+import collections
+import functools
 import json
 import logging
+import queue
 import sys
+import time
+import uuid
+from concurrent import futures
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from threading import Thread
+from threading import Event, Lock, Thread
 
 import grpc
-import redis
 from confluent_kafka.avro import AvroProducer
 from confluent_kafka.schema_registry import SchemaRegistryClient
 from SciXPipelineUtils import utils
@@ -18,14 +24,25 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from API.grpc_modules.parser_grpc import (
+    ParserBulkServicer,
+    ParserInitQueryServicer,
     ParserInitServicer,
+    ParserMonitorBulkServicer,
     ParserMonitorServicer,
+    ParserViewBulkServicer,
     ParserViewServicer,
+    add_ParserBulkServicer_to_server,
+    add_ParserInitQueryServicer_to_server,
     add_ParserInitServicer_to_server,
+    add_ParserMonitorBulkServicer_to_server,
     add_ParserMonitorServicer_to_server,
+    add_ParserViewBulkServicer_to_server,
     add_ParserViewServicer_to_server,
 )
 from SciXParser.parser import db
+from SciXParser.parser.schema_cache import SchemaCache
+from SciXParser.parser.status_buffer import TERMINAL_STATUSES, StatusBuffer
+from SciXParser.parser.status_publisher import StatusPublisher, get_redis
 
 HERE = Path(__file__).parent
 proj_home = str(HERE / "..")
@@ -42,37 +59,276 @@ class Logging:
 NUMBER_OF_REPLY = 10
 
 
-class Listener(Thread):
-    def __init__(self):
-        self.redis = redis.StrictRedis(
-            config.get("REDIS_HOST", "localhost"),
-            config.get("REDIS_PORT", 6379),
-            charset="utf-8",
-            decode_responses=True,
-        )
-        self.subscription = self.redis.pubsub()
-        self.end = False
-
-    def subscribe(self, channel_name="PARSER_statuses"):
-        self.subscription.subscribe(channel_name)
-
-    def get_status_redis(self, job_id, logger):
-        status = None
-        logger.debug("DB: Listening for parser status updates")
-        logger.debug(str(self.subscription.listen()))
-        for message in self.subscription.listen():
-            if self.end:
-                logger.debug("Ending Listener thread")
+class StatusHub(Thread):
+    """
+    A single redis connection shared by every persistent stream in the server process to
+    receive job statuses. It reads only the status channels, or status streams if
+    STATUS_TRANSPORT is stream, of the jobs being watched, and each status is decoded once
+    and put on the queues of the streams waiting on its job as an (entry id, status) pair.
+    The entry id is None for statuses received over pubsub.
+    """
+
+    def __init__(self, logger=None, poll_interval=0.1):
+        super().__init__(daemon=True)
+        self.redis = get_redis(config)
+        self.channel_mode = config.get("STATUS_CHANNEL_MODE", "single")
+        self.channel_shards = config.get("STATUS_CHANNEL_SHARDS", 64)
+        self.transport = config.get("STATUS_TRANSPORT", "pubsub")
+        self.replay_count = config.get("STATUS_STREAM_REPLAY", 1000)
+        self.logger = logger or logging.getLogger(__name__)
+        self.poll_interval = poll_interval
+        self._lock = Lock()
+        self._queues = {}
+        # channel: [number of jobs watched on it, Event set once it is subscribed,
+        #           id of the last entry read from it if it is a stream]
+        self._channels = {}
+        self._changes = queue.Queue()
+
+    def channel(self, job_id):
+        if self.transport == "stream":
+            return db.status_stream(job_id, self.channel_mode, self.channel_shards)
+        return db.status_channel(job_id, self.channel_mode, self.channel_shards)
+
+    def subscribe(self, job_id, last_id=None, status_queue=None, timeout=5):
+        """
+        Returns a queue that receives every status of job_id from now on, waiting up to
+        timeout seconds for the channel of job_id to be subscribed, and the list of
+        (entry id, status) pairs of job_id added to its stream after last_id, if given,
+        among the last STATUS_STREAM_REPLAY entries of the stream.
+        status_queue may be any object with a put method, e.g. an AsyncStatusQueue, and
+        defaults to a new queue.Queue.
+        """
+        job_id = str(job_id)
+        channel = self.channel(job_id)
+        if status_queue is None:
+            status_queue = queue.Queue()
+        latest_id = self._latest_id(channel)
+        with self._lock:
+            if job_id not in self._queues:
+                if channel not in self._channels:
+                    self._channels[channel] = [0, Event(), latest_id]
+                    if self.transport == "stream":
+                        self._channels[channel][1].set()
+                    else:
+                        self._changes.put(("subscribe", channel))
+                self._channels[channel][0] += 1
+            self._queues.setdefault(job_id, set()).add(status_queue)
+            subscribed, position = self._channels[channel][1:]
+        subscribed.wait(timeout)
+        replay = []
+        if last_id is not None and position is not None:
+            replay = self._replay(channel, job_id, last_id, position)
+        return status_queue, replay
+
+    def unsubscribe(self, job_id, status_queue):
+        job_id = str(job_id)
+        channel = self.channel(job_id)
+        with self._lock:
+            queues = self._queues.get(job_id)
+            if queues is None:
+                return
+            queues.discard(status_queue)
+            if queues:
+                return
+            del self._queues[job_id]
+            self._channels[channel][0] -= 1
+            if not self._channels[channel][0]:
+                del self._channels[channel]
+                if self.transport != "stream":
+                    self._changes.put(("unsubscribe", channel))
+
+    def subscribers(self):
+        with self._lock:
+            return sum(len(queues) for queues in self._queues.values())
+
+    def channels(self):
+        with self._lock:
+            return set(self._channels)
+
+    def run(self):
+        while True:
+            try:
+                if self.transport == "stream":
+                    self._read_streams()
+                else:
+                    self._listen()
+            except Exception:
+                self.logger.exception("Status hub lost its redis connection. Reconnecting.")
+                time.sleep(1)
+
+    def _latest_id(self, channel):
+        if self.transport != "stream":
+            return None
+        with self._lock:
+            if channel in self._channels:
+                return self._channels[channel][2]
+        entries = self.redis.xrevrange(channel, count=1)
+        return entries[0][0] if entries else "0-0"
+
+    def _replay(self, stream, job_id, last_id, position):
+        """Reads the entries of job_id after last_id and up to position from stream."""
+        replay = []
+        for entry_id, fields in self.redis.xrevrange(
+            stream, max=position, count=self.replay_count
+        ):
+            if db.stream_id(entry_id) <= db.stream_id(last_id):
+                break
+            if fields.get("job_id") == job_id:
+                replay.append((entry_id, fields.get("status")))
+        return replay[::-1]
+
+    def _read_streams(self):
+        """
+        Reads the watched streams from the last entry read from each, so that no status is
+        lost while the hub reconnects.
+        """
+        while True:
+            with self._lock:
+                streams = {channel: entry[2] for channel, entry in self._channels.items()}
+            if not streams:
+                time.sleep(self.poll_interval)
+                continue
+            response = self.redis.xread(streams, block=int(self.poll_interval * 1000))
+            for stream, entries in response or []:
+                with self._lock:
+                    entry = self._channels.get(stream)
+                    for entry_id, fields in entries:
+                        if entry is not None:
+                            entry[2] = entry_id
+                        for status_queue in self._queues.get(fields.get("job_id"), ()):
+                            status_queue.put((entry_id, fields.get("status")))
+
+    def _listen(self):
+        subscription = self.redis.pubsub()
+        with self._lock:
+            channels = list(self._channels)
+            for channel in channels:
+                self._channels[channel][1].clear()
+        if channels:
+            subscription.subscribe(*channels)
+        while True:
+            self._apply_changes(subscription)
+            message = subscription.get_message(timeout=self.poll_interval)
+            if message is None:
+                continue
+            if message.get("type") == "subscribe":
+                with self._lock:
+                    entry = self._channels.get(message.get("channel"))
+                if entry is not None:
+                    entry[1].set()
+            elif message.get("type") == "message":
+                self._route(message.get("data"))
+
+    def _apply_changes(self, subscription):
+        while True:
+            try:
+                change, channel = self._changes.get_nowait()
+            except queue.Empty:
                 return
-            logger.debug("DB: Message from redis: {}".format(message))
-            if message is not None and isinstance(message, dict):
-                if message.get("data") != 1:
-                    logger.debug("DB: data: {}".format(message.get("data")))
-                    status_dict = json.loads(message.get("data"))
-                    if status_dict["job_id"] == job_id:
-                        status = status_dict["status"]
-                        logger.debug("DB: status: {}".format(status))
-                        yield status
+            getattr(subscription, change)(channel)
+
+    def _route(self, data):
+        try:
+            status_dict = json.loads(data)
+            job_id = str(status_dict["job_id"])
+        except (ValueError, TypeError, KeyError):
+            return
+        with self._lock:
+            queues = list(self._queues.get(job_id, ()))
+        for status_queue in queues:
+            status_queue.put((None, status_dict.get("status")))
+
+
+_status_hub = None
+_status_hub_lock = Lock()
+
+
+def get_status_hub():
+    """Returns the StatusHub of this server process, starting it on first use."""
+    global _status_hub
+    with _status_hub_lock:
+        if _status_hub is None:
+            _status_hub = StatusHub()
+            _status_hub.start()
+    return _status_hub
+
+
+class AsyncStatusQueue:
+    """
+    Hands the statuses put by the StatusHub thread to an asyncio.Queue on loop, so that
+    they can be awaited without tying up a thread. Must be created on loop.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def put(self, item):
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+        except RuntimeError:
+            # The loop has been closed along with the stream waiting on it.
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Listener:
+    """
+    The status updates of a single job, received through the StatusHub of the process.
+    last_id is the id of the last stream entry read, which can be passed to subscribe to
+    resume from it when STATUS_TRANSPORT is stream.
+    """
+
+    job_id = None
+    status_queue = None
+    replay = ()
+    last_id = None
+    end = False
+
+    def __init__(self):
+        self.hub = get_status_hub()
+
+    def subscribe(self, job_id=None, last_id=None, status_queue=None):
+        """
+        Starts collecting the statuses published for job_id in status_queue, after
+        replaying those added to its stream after last_id.
+        """
+        if job_id is not None and self.status_queue is None:
+            self.job_id = str(job_id)
+            self.last_id = last_id
+            self.status_queue, self.replay = self.hub.subscribe(self.job_id, last_id, status_queue)
+
+    def latest_status(self):
+        """
+        Returns the latest replayed status, or None if nothing was replayed, and drops the
+        older replayed statuses.
+        """
+        if not self.replay:
+            return None
+        self.last_id, status = self.replay[-1]
+        self.replay = []
+        return status
+
+    def close(self):
+        self.end = True
+        if self.status_queue is not None:
+            self.hub.unsubscribe(self.job_id, self.status_queue)
+            self.status_queue = None
+
+    async def next_status(self, job_id, logger):
+        """
+        Waits for the next status of job_id. The listener must have been subscribed with
+        an AsyncStatusQueue.
+        """
+        if self.replay:
+            entry_id, status = self.replay.pop(0)
+        else:
+            entry_id, status = await self.status_queue.get()
+        self.last_id = entry_id or self.last_id
+        logger.debug("DB: status: {}".format(status))
+        return status
 
 
 def initialize_parser(gRPC_Servicer=ParserInitServicer):
@@ -86,6 +342,30 @@ def initialize_parser(gRPC_Servicer=ParserInitServicer):
             self.engine = create_engine(config.get("SQLALCHEMY_URL"))
             self.Session = sessionmaker(self.engine)
             self.logger = logger
+            self.schema_cache = SchemaCache(self, config.get("SCHEMA_CACHE_TTL", 300))
+            self.schema_cache.put(config.get("PARSER_INPUT_SCHEMA"), req_schema)
+            self.pending_statuses = StatusBuffer(
+                self,
+                config.get("PARSER_STATUS_FLUSH_INTERVAL", 1.0),
+                config.get("PARSER_STATUS_FLUSH_SIZE", 500),
+            )
+            self.redis = get_redis(config)
+            # Publishes the statuses set by the server like those set by the Pipeline.
+            self.status_publisher = StatusPublisher(
+                self.redis,
+                self.logger,
+                None,
+                config.get("REDIS_PUBLISH_MAX_BATCH", 100),
+                config.get("STATUS_CACHE_TTL", 86400),
+                config.get("STATUS_CHANNEL_MODE", "single"),
+                config.get("STATUS_CHANNEL_SHARDS", 64),
+                config.get("STATUS_TRANSPORT", "pubsub"),
+                config.get("STATUS_STREAM_MAXLEN", 10000),
+            )
+            # Runs the blocking postgres, redis and kafka calls of the RPCs.
+            self.executor = futures.ThreadPoolExecutor(
+                max_workers=config.get("GRPC_EXECUTOR_WORKERS", 16)
+            )
 
         @contextmanager
         def session_scope(self):
@@ -100,61 +380,118 @@ def initialize_parser(gRPC_Servicer=ParserInitServicer):
             finally:
                 session.close()
 
-        def persistent_connection(self, job_request, listener):
+        def get_job_statuses(self, record_ids):
+            """
+            Returns the latest status of every record in record_ids, read from the redis
+            status cache or, for records missing from it, from postgres.
+            Records without a status are reported as Error.
+            """
+            record_ids = [str(record_id) for record_id in record_ids]
+            statuses = db.get_cached_statuses_redis(self.redis, record_ids)
+            missing = [record_id for record_id in record_ids if record_id not in statuses]
+            if len(missing) == 1:
+                status = db.get_job_status_by_record_id(self, missing)
+                found = {missing[0]: status.name} if status else {}
+            elif missing:
+                found = {
+                    record_id: status.name
+                    for record_id, status in db.get_job_statuses_by_record_ids(
+                        self, missing, chunk_size=config.get("STATUS_LOOKUP_CHUNK_SIZE", 5000)
+                    ).items()
+                }
+            else:
+                found = {}
+            db.cache_statuses_redis(self.redis, found, config.get("STATUS_CACHE_TTL", 86400))
+            statuses.update(found)
+
+            for record_id in record_ids:
+                if record_id not in statuses:
+                    self.logger.warning("PARSER: No status found for {}".format(record_id))
+                    statuses[record_id] = "Error"
+            return statuses
+
+        async def _run(self, func, *args, **kwargs):
+            """
+            Runs the blocking call func in the executor of the servicer so that it does
+            not stall the other RPCs served by the event loop.
+            """
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, functools.partial(func, *args, **kwargs)
+            )
+
+        async def subscribe(self, listener, record_id, last_id=None):
+            """Subscribes listener to the statuses of record_id on the running event loop."""
+            status_queue = AsyncStatusQueue(asyncio.get_running_loop())
+            await self._run(listener.subscribe, record_id, last_id, status_queue)
+
+        async def persistent_connection(self, job_request, listener, context):
+            """
+            Yields the latest status of the job and then every change to it until it reaches
+            a terminal status, each with the id of the last stream entry read by listener as
+            last_id. The current status is sent again as a heartbeat whenever no
+            change arrives for GRPC_STREAM_HEARTBEAT seconds, and the stream is aborted with
+            DEADLINE_EXCEEDED after GRPC_STREAM_DEADLINE seconds, or earlier if the client
+            set a shorter deadline. The stream stops if the client cancels it.
+            """
             record_id = job_request.get("record_id")
-            msg = db.get_job_status_by_record_id(self, [str(record_id)]).name
+            msg = listener.latest_status()
+            if not msg:
+                msg = (await self._run(self.get_job_statuses, [record_id]))[str(record_id)]
             self.logger.info("PARSER: User requested persitent connection.")
             self.logger.info("PARSER: Latest message is: {}".format(msg))
             job_request["status"] = str(msg)
+            job_request["last_id"] = listener.last_id
             yield job_request
-            if msg == "Error":
-                Done = True
-                self.logger.debug("Error = {}".format(Done))
-                listener.end = True
-            elif msg == "Success":
-                Done = True
-                self.logger.debug("Done = {}".format(Done))
-                listener.end = True
-            else:
-                Done = False
-            old_msg = msg
-            while not Done:
-                if msg and msg != old_msg:
+
+            loop = asyncio.get_running_loop()
+            heartbeat = config.get("GRPC_STREAM_HEARTBEAT", 30)
+            deadline = config.get("GRPC_STREAM_DEADLINE", 3600)
+            if context.time_remaining() is not None:
+                deadline = min(deadline, context.time_remaining())
+            deadline += loop.time()
+
+            while msg not in TERMINAL_STATUSES:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self.logger.warning(
+                        "PARSER: No final status for {} before the stream deadline.".format(
+                            record_id
+                        )
+                    )
+                    await context.abort(
+                        grpc.StatusCode.DEADLINE_EXCEEDED,
+                        "No final status for {} before the deadline.".format(record_id),
+                    )
+                try:
+                    new_msg = await asyncio.wait_for(
+                        listener.next_status(record_id, self.logger),
+                        timeout=min(heartbeat, remaining),
+                    )
+                except asyncio.TimeoutError:
+                    new_msg = None
+                if context.cancelled():
+                    self.logger.info(
+                        "PARSER: Client cancelled the stream for {}.".format(record_id)
+                    )
+                    return
+                if new_msg and new_msg != msg:
+                    msg = new_msg
                     self.logger.info("yielded new status: {}".format(msg))
-                    job_request["status"] = str(msg)
-                    yield job_request
-                    old_msg = msg
-                    try:
-                        if msg == "Error":
-                            Done = True
-                            self.logger.debug("Error = {}".format(Done))
-                            listener.end = True
-                            break
-                        elif msg == "Success":
-                            Done = True
-                            self.logger.debug("Done = {}".format(Done))
-                            listener.end = True
-                            break
-
-                    except Exception:
-                        continue
-                    try:
-                        msg = next(listener.get_status_redis(record_id, self.logger))
-                        self.logger.debug("PARSER: Redis returned: {} for job_id".format(msg))
-                    except Exception:
-                        msg = ""
-                        continue
+                elif new_msg is not None:
+                    continue
+                job_request["status"] = str(msg)
+                job_request["last_id"] = listener.last_id
+                yield job_request
+            listener.end = True
 
-                else:
-                    try:
-                        msg = next(listener.get_status_redis(record_id, self.logger))
-                        self.logger.debug("PARSER: Redis published status: {}".format(msg))
-                    except Exception as e:
-                        self.logger.exception("failed to read message with error: {}.".format(e))
-                        continue
-            return
+        def produce_job(self, job_request):
+            self.producer.produce(
+                topic=self.topic,
+                value=job_request,
+                value_schema=self.schema_cache.get(config.get("PARSER_INPUT_SCHEMA")),
+            )
 
-        def initParser(self, request, context: grpc.aio.ServicerContext):
+        async def initParser(self, request, context: grpc.aio.ServicerContext):
             self.logger.info("Serving initParser request %s", request)
             self.logger.info(json.dumps(request.get("task_args")))
             self.logger.info(
@@ -173,34 +510,262 @@ def initialize_parser(gRPC_Servicer=ParserInitServicer):
             job_request.pop("persistence")
 
             job_request["status"] = "Pending"
+            job_request["batch_id"] = str(uuid.uuid4())
+            # Drop the cached status of a previous run before the Pipeline can pick up the job.
+            await self._run(db.clear_cached_statuses_redis, self.redis, record_ids)
+            await self._run(
+                self.register_batch,
+                job_request["batch_id"],
+                record_ids,
+                statuses=dict.fromkeys(record_ids, job_request["status"]),
+            )
+            if persistence:
+                # Subscribe before producing so that no status update is missed.
+                listener = Listener()
+                await self.subscribe(listener, record_ids[0])
+            try:
+                for record_id in record_ids:
+                    job_request["record_id"] = record_id
+                    await self._run(self.produce_job, job_request)
+
+                    await self._run(
+                        self.pending_statuses.add,
+                        job_request.get("record_id"),
+                        job_request["status"],
+                    )
+
+                    yield job_request
+            finally:
+                await self._run(self.pending_statuses.flush)
+            if persistence:
+                try:
+                    async for response in self.persistent_connection(
+                        job_request, listener, context
+                    ):
+                        yield response
+                finally:
+                    listener.close()
+
+        def submit_chunk(self, record_ids, force=None, resend=None, batch_id=None):
+            """
+            Sends a REPARSE job for every record in record_ids to the Parser Topic and sets
+            the status of those that were sent to Pending in bulk. The records are added to
+            batch_id, if given, before they are sent, and those that could not be sent are
+            counted as Error.
+            Returns the number of records sent and the number that could not be sent.
+            """
+            # Statuses a fast worker sets before Pending is written are kept.
+            since = datetime.now()
+            db.clear_cached_statuses_redis(self.redis, record_ids)
+            if batch_id:
+                self.register_batch(
+                    batch_id, record_ids, statuses=dict.fromkeys(record_ids, "Pending")
+                )
+            schema = self.schema_cache.get(config.get("PARSER_INPUT_SCHEMA"))
+            submitted = []
             for record_id in record_ids:
-                job_request["record_id"] = record_id
-                self.producer.produce(
-                    topic=self.topic, value=job_request, value_schema=self.req_schema
+                job_request = {
+                    "record_id": record_id,
+                    "task": "REPARSE",
+                    "status": "Pending",
+                    "force": force,
+                    "resend": resend,
+                    "batch_id": batch_id,
+                }
+                try:
+                    self.producer.produce(topic=self.topic, value=job_request, value_schema=schema)
+                except (ValueError, BufferError):
+                    self.logger.exception(
+                        "Failed to produce {} to Kafka topic: {}".format(record_id, self.topic)
+                    )
+                    if batch_id:
+                        db.write_status_redis(
+                            self.status_publisher,
+                            json.dumps({"job_id": record_id, "status": "Error"}),
+                        )
+                    continue
+                submitted.append(record_id)
+            # Serve the delivery callbacks of the chunk without waiting on them.
+            self.producer.poll(0)
+
+            with self.session_scope() as session:
+                db.update_job_statuses(
+                    session,
+                    dict.fromkeys(submitted, "Pending"),
+                    since=since,
+                    keep=TERMINAL_STATUSES,
+                    chunk_size=config.get("STATUS_LOOKUP_CHUNK_SIZE", 5000),
                 )
+            return len(submitted), len(record_ids) - len(submitted)
 
-                db.update_job_status(
-                    self, job_request.get("record_id"), status=job_request["status"]
+        async def bulkParser(self, request_iterator, context: grpc.aio.ServicerContext):
+            """
+            Submits REPARSE jobs for the chunks of record ids streamed by the client as a
+            single batch and acknowledges each chunk with its counts, the number of records
+            submitted so far and the id of the batch.
+            """
+            batch_id = str(uuid.uuid4())
+            submitted = 0
+            chunk_index = 0
+            async for chunk in request_iterator:
+                record_ids = chunk.get("record_ids") or []
+                accepted, failed = await self._run(
+                    self.submit_chunk,
+                    record_ids,
+                    chunk.get("force"),
+                    chunk.get("resend"),
+                    batch_id,
                 )
+                submitted += accepted
+                self.logger.info(
+                    "PARSER: Submitted chunk {} ({} records, {} failed). {} records submitted.".format(
+                        chunk_index, accepted, failed, submitted
+                    )
+                )
+                yield {
+                    "chunk": chunk_index,
+                    "accepted": accepted,
+                    "failed": failed,
+                    "submitted": submitted,
+                    "batch_id": batch_id,
+                }
+                chunk_index += 1
 
-                yield job_request
+        def get_parser_record_ids_page(self, after, filters, chunk_size):
+            with self.session_scope() as session:
+                return db.get_parser_record_ids_page(
+                    session, after=after, limit=chunk_size, **filters
+                )
 
-            if persistence:
-                listener = Listener()
-                listener.subscribe()
-                yield from self.persistent_connection(job_request, listener)
+        async def initParserQuery(self, request, context: grpc.aio.ServicerContext):
+            """
+            Submits a REPARSE job, as a single batch, for every parser record of the source
+            and date_modified range of request, in chunks of REPARSE_QUERY_CHUNK_SIZE records
+            read from postgres a page at a time, each on its own session, as they are
+            submitted. Submission is paced to at most REPARSE_QUERY_RATE records per second,
+            if set, and each chunk is acknowledged like the chunks of bulkParser.
+            """
+            filters = await self.record_filters(request, context)
+            if not any(filters.values()):
+                await context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    "Provide a source or a date range to reparse.",
+                )
+            self.logger.info("Serving initParserQuery request %s", request)
+
+            loop = asyncio.get_running_loop()
+            rate = config.get("REPARSE_QUERY_RATE", 0)
+            chunk_size = config.get("REPARSE_QUERY_CHUNK_SIZE", 1000)
+            batch_id = str(uuid.uuid4())
+            start = loop.time()
+            sent = 0
+            submitted = 0
+            chunk_index = 0
+            after = None
+            while True:
+                record_ids = await self._run(
+                    self.get_parser_record_ids_page, after, filters, chunk_size
+                )
+                if not record_ids:
+                    break
+                accepted, failed = await self._run(
+                    self.submit_chunk,
+                    record_ids,
+                    request.get("force"),
+                    request.get("resend"),
+                    batch_id,
+                )
+                sent += len(record_ids)
+                submitted += accepted
+                yield {
+                    "chunk": chunk_index,
+                    "accepted": accepted,
+                    "failed": failed,
+                    "submitted": submitted,
+                    "batch_id": batch_id,
+                }
+                chunk_index += 1
+                if context.cancelled():
+                    self.logger.info(
+                        "PARSER: Client cancelled the reparse of batch {}.".format(batch_id)
+                    )
+                    return
+                if len(record_ids) < chunk_size:
+                    break
+                after = record_ids[-1]
+                if rate:
+                    await asyncio.sleep(max(0, start + sent / rate - loop.time()))
+            self.logger.info(
+                "PARSER: Submitted {} records matching {} in batch {}.".format(
+                    submitted, request, batch_id
+                )
+            )
+
+        def get_parsed_record(self, record_id):
+            with self.session_scope() as session:
+                return db.get_parser_record(session, record_id).parsed_data
 
-        def viewParser(self, request, context: grpc.aio.ServicerContext):
+        async def viewParser(self, request, context: grpc.aio.ServicerContext):
             self.logger.info("Serving viewParser request %s", request)
             self.logger.info(json.dumps(request.get("task_args")))
             record_id = request["record_id"]
             record = {}
-            with self.session_scope() as session:
-                record["parsed_record"] = db.get_parser_record(session, record_id).parsed_data
+            record["parsed_record"] = await self._run(self.get_parsed_record, record_id)
             record["record_id"] = record_id
             yield record
 
-        def monitorParser(self, request, context: grpc.aio.ServicerContext):
+        def get_parsed_records_page(self, after, filters):
+            with self.session_scope() as session:
+                return db.get_parsed_records_page(
+                    session, after=after, limit=config.get("VIEW_BULK_PAGE_SIZE", 500), **filters
+                )
+
+        async def record_filters(self, request, context):
+            """
+            Returns the source and date_modified range of request as filters of the
+            parser records, aborting the RPC with INVALID_ARGUMENT if they are not valid.
+            """
+            filters = {"source": request.get("source")}
+            try:
+                for key in ("modified_since", "modified_until"):
+                    if request.get(key):
+                        filters[key] = datetime.fromisoformat(request.get(key))
+            except ValueError as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            if filters["source"] and filters["source"] not in db.models.Source.__members__:
+                await context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    "{} is not a valid data source.".format(filters["source"]),
+                )
+            return filters
+
+        async def viewParserBulk(self, request_iterator, context: grpc.aio.ServicerContext):
+            """
+            Streams the parsed data of the records selected by each request, either a chunk
+            of record ids or a source and date_modified range, reading VIEW_BULK_PAGE_SIZE
+            records from postgres at a time. Records without parsed data are skipped.
+            """
+            page_size = config.get("VIEW_BULK_PAGE_SIZE", 500)
+            async for request in request_iterator:
+                filters = await self.record_filters(request, context)
+                filters["record_ids"] = request.get("record_ids") or None
+                if not any(filters.values()):
+                    await context.abort(
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        "Provide record ids, a source or a date range to view.",
+                    )
+
+                after = None
+                while True:
+                    page = await self._run(self.get_parsed_records_page, after, filters)
+                    for record_id, parsed_record in page:
+                        if parsed_record:
+                            yield {"record_id": record_id, "parsed_record": parsed_record}
+                    if len(page) < page_size:
+                        break
+                    after = page[-1][0]
+
+        async def monitorParser(self, request, context: grpc.aio.ServicerContext):
             self.logger.info("%s", request)
             self.logger.info(json.dumps(request.get("task_args")))
 
@@ -208,21 +773,234 @@ def initialize_parser(gRPC_Servicer=ParserInitServicer):
             persistence = job_request.get("persistence", False)
 
             record_id = request.get("record_id")
+            record_ids = record_id.split() if record_id else []
 
-            if record_id:
+            if len(record_ids) > 1:
+                async for response in self.monitor_records(job_request, record_ids):
+                    yield response
+            elif record_id:
                 if persistence:
                     listener = Listener()
-                    listener.subscribe()
-                    yield from self.persistent_connection(job_request, listener)
+                    # Read the latest status from the status stream, if there is one, after
+                    # the last entry the client has seen.
+                    await self.subscribe(
+                        listener, record_id, last_id=request.get("last_id") or "0-0"
+                    )
+                    try:
+                        async for response in self.persistent_connection(
+                            job_request, listener, context
+                        ):
+                            yield response
+                    finally:
+                        listener.close()
                 else:
-                    msg = db.get_job_status_by_record_id(self, [str(record_id)]).name
-                    job_request["status"] = str(msg)
+                    statuses = await self._run(self.get_job_statuses, [record_id])
+                    job_request["status"] = statuses[str(record_id)]
                     yield job_request
             else:
                 msg = "Error"
                 job_request["status"] = msg
                 yield job_request
 
+        def register_batch(self, batch_id, record_ids, statuses=None):
+            """
+            Adds the jobs in record_ids to the batch job batch_id in postgres and to its
+            counters in redis, counted with their current statuses unless statuses is given.
+            """
+            if statuses is None:
+                statuses = self.get_job_statuses(record_ids)
+            with self.session_scope() as session:
+                db.add_batch_job_records(session, batch_id, len(statuses))
+            db.register_batch_redis(
+                self.redis, batch_id, statuses, config.get("STATUS_CACHE_TTL", 86400)
+            )
+
+        def get_job_batches(self, record_ids):
+            """
+            Returns the batches the jobs in record_ids belong to and the jobs that do not
+            belong to any batch.
+            """
+            batch_ids = set()
+            unbatched = []
+            for record_id, batch_id in db.get_job_batches_redis(
+                self.redis, [str(record_id) for record_id in record_ids]
+            ).items():
+                if batch_id:
+                    batch_ids.add(batch_id)
+                else:
+                    unbatched.append(record_id)
+            return batch_ids, unbatched
+
+        def batch_progress(self, batch_id, events, last_id):
+            """
+            Returns the progress of batch_id and, if events is set, the final status events
+            of its jobs recorded after the entry last_id.
+            Once the counters of the batch have expired from redis, the progress last
+            reconciled into postgres is returned without any events.
+            """
+            progress = db.get_batch_progress_redis(self.redis, batch_id)
+            if progress is None:
+                with self.session_scope() as session:
+                    return db.get_batch_job_progress(session, batch_id), []
+            if not events:
+                return progress, []
+            return progress, db.read_batch_events_redis(self.redis, batch_id, last_id)
+
+        def reconcile_batches(self):
+            """
+            Copies the redis counters of every open batch job into postgres, marking those
+            whose jobs are all done as completed, and those whose counters have expired from
+            redis as expired, as their progress can no longer be followed.
+            Returns the number of batch jobs reconciled.
+            """
+            with self.session_scope() as session:
+                batch_ids = db.get_open_batch_job_ids(session)
+            reconciled = 0
+            for batch_id in batch_ids:
+                progress = db.get_batch_progress_redis(self.redis, batch_id)
+                if progress is None:
+                    self.logger.warning(
+                        "PARSER: Counters of batch {} have expired from redis. "
+                        "Marking it expired.".format(batch_id)
+                    )
+                    with self.session_scope() as session:
+                        db.expire_batch_job(session, batch_id)
+                    continue
+                with self.session_scope() as session:
+                    db.update_batch_job_progress(session, batch_id, progress)
+                reconciled += 1
+            return reconciled
+
+        async def reconcile_batches_periodically(self, interval):
+            """Reconciles the batch jobs into postgres every interval seconds until cancelled."""
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self._run(self.reconcile_batches)
+                except Exception:
+                    self.logger.exception("PARSER: Failed to reconcile batch progress.")
+
+        @staticmethod
+        def batch_message(batch_id, progress, record_id=None, status=None):
+            message = {
+                "batch_id": batch_id,
+                "total": progress["total"],
+                "record_id": record_id,
+                "status": status,
+                "done": sum(progress[terminal] for terminal in TERMINAL_STATUSES)
+                >= progress["total"],
+            }
+            for status in ("Pending", "Processing", "Success", "Error", "Unchanged"):
+                message[status.lower()] = progress[status]
+            return message
+
+        async def monitorParserBulk(self, request_iterator, context: grpc.aio.ServicerContext):
+            """
+            Streams the number of jobs in each status of the batch_id of the first request
+            and of the batches the record ids streamed by the client were submitted in,
+            read from counters that redis keeps up to date as the statuses change. Monitoring
+            never registers batches: the jobs that do not belong to a batch are counted from
+            their current statuses, and the status of each of them is streamed whenever it
+            changes. With events set, the final status of each job in the batches is
+            streamed as well.
+            Without persistence only the current progress is returned, otherwise progress is
+            streamed whenever it changes, and at least every GRPC_STREAM_HEARTBEAT seconds,
+            until every job is done.
+            """
+            first = True
+            batch_ids = set()
+            unbatched = []
+            async for request in request_iterator:
+                if first:
+                    first = False
+                    events = bool(request.get("events"))
+                    persistence = bool(request.get("persistence"))
+                    if request.get("batch_id"):
+                        batch_ids.add(request.get("batch_id"))
+                if request.get("record_ids"):
+                    found, missing = await self._run(
+                        self.get_job_batches, request.get("record_ids")
+                    )
+                    batch_ids.update(found)
+                    unbatched.extend(missing)
+            if not (batch_ids or unbatched):
+                await context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    "Provide record ids or a batch id to monitor.",
+                )
+            batch_id = " ".join(sorted(batch_ids))
+
+            loop = asyncio.get_running_loop()
+            heartbeat = config.get("GRPC_STREAM_HEARTBEAT", 30)
+            interval = config.get("GRPC_BATCH_PROGRESS_INTERVAL", 1.0)
+            deadline = config.get("GRPC_STREAM_DEADLINE", 3600)
+            if context.time_remaining() is not None:
+                deadline = min(deadline, context.time_remaining())
+            deadline += loop.time()
+            last_ids = dict.fromkeys(batch_ids, "0-0")
+            record_statuses = {}
+            previous = None
+            last_sent = loop.time()
+            while True:
+                progress = collections.Counter()
+                batch_events = []
+                read_on = False
+                for batch in sorted(batch_ids):
+                    batch_progress, new_events = await self._run(
+                        self.batch_progress, batch, events, last_ids[batch]
+                    )
+                    if batch_progress is None:
+                        await context.abort(
+                            grpc.StatusCode.NOT_FOUND, "Batch {} is not known.".format(batch)
+                        )
+                    progress.update(batch_progress)
+                    if new_events:
+                        last_ids[batch] = new_events[-1][0]
+                        batch_events.extend(new_events)
+                    read_on = read_on or len(new_events) >= db.BATCH_EVENTS_READ_COUNT
+                changed = []
+                if unbatched:
+                    statuses = await self._run(self.get_job_statuses, unbatched)
+                    progress.update(statuses.values())
+                    progress["total"] += len(statuses)
+                    changed = [
+                        (record_id, status)
+                        for record_id, status in statuses.items()
+                        if record_statuses.get(record_id) != status
+                    ]
+                    record_statuses = statuses
+                for record_id, status in changed:
+                    yield self.batch_message(batch_id, progress, record_id, status)
+                for _, record_id, status in batch_events:
+                    yield self.batch_message(batch_id, progress, record_id, status)
+                message = self.batch_message(batch_id, progress)
+                if progress != previous or loop.time() - last_sent >= heartbeat:
+                    yield message
+                    previous = progress
+                    last_sent = loop.time()
+                if message["done"] or not persistence:
+                    return
+                if loop.time() >= deadline:
+                    await context.abort(
+                        grpc.StatusCode.DEADLINE_EXCEEDED,
+                        "Batch {} was not done before the deadline.".format(batch_id),
+                    )
+                # Read on at once if there were more events than fit in one read.
+                if not read_on:
+                    await asyncio.sleep(interval)
+                if context.cancelled():
+                    return
+
+        async def monitor_records(self, job_request, record_ids):
+            """
+            Yields the current status of every record in record_ids, looked up in bulk.
+            """
+            statuses = await self._run(self.get_job_statuses, record_ids)
+            for record_id in record_ids:
+                job_request["record_id"] = record_id
+                job_request["status"] = statuses[record_id]
+                yield job_request
+
     return Parser
 
 
@@ -264,9 +1042,72 @@ async def serve() -> None:
         server,
         mainserialhelper,
     )
+    view_bulk_input_schema = utils.get_schema(
+        app_log, schema_client, config.get("PARSER_VIEW_BULK_INPUT_SCHEMA")
+    )
+    viewbulkserialhelper = AvroSerialHelper(
+        ser_schema=data_schema, des_schema=view_bulk_input_schema, logger=app_log.logger
+    )
+    add_ParserViewBulkServicer_to_server(
+        initialize_parser(ParserViewBulkServicer)(
+            producer, main_schema, schema_client, app_log.logger
+        ),
+        server,
+        viewbulkserialhelper,
+    )
+    monitor_bulk_input_schema = utils.get_schema(
+        app_log, schema_client, config.get("PARSER_MONITOR_BULK_INPUT_SCHEMA")
+    )
+    monitor_bulk_output_schema = utils.get_schema(
+        app_log, schema_client, config.get("PARSER_MONITOR_BULK_OUTPUT_SCHEMA")
+    )
+    monitorbulkserialhelper = AvroSerialHelper(
+        ser_schema=monitor_bulk_output_schema,
+        des_schema=monitor_bulk_input_schema,
+        logger=app_log.logger,
+    )
+    add_ParserMonitorBulkServicer_to_server(
+        initialize_parser(ParserMonitorBulkServicer)(
+            producer, main_schema, schema_client, app_log.logger
+        ),
+        server,
+        monitorbulkserialhelper,
+    )
+    bulk_input_schema = utils.get_schema(
+        app_log, schema_client, config.get("PARSER_BULK_INPUT_SCHEMA")
+    )
+    bulk_output_schema = utils.get_schema(
+        app_log, schema_client, config.get("PARSER_BULK_OUTPUT_SCHEMA")
+    )
+    bulkserialhelper = AvroSerialHelper(
+        ser_schema=bulk_output_schema, des_schema=bulk_input_schema, logger=app_log.logger
+    )
+    init_query_input_schema = utils.get_schema(
+        app_log, schema_client, config.get("PARSER_INIT_QUERY_INPUT_SCHEMA")
+    )
+    initqueryserialhelper = AvroSerialHelper(
+        ser_schema=bulk_output_schema, des_schema=init_query_input_schema, logger=app_log.logger
+    )
+    add_ParserInitQueryServicer_to_server(
+        initialize_parser(ParserInitQueryServicer)(
+            producer, main_schema, schema_client, app_log.logger
+        ),
+        server,
+        initqueryserialhelper,
+    )
+    bulk_servicer = initialize_parser(ParserBulkServicer)(
+        producer, main_schema, schema_client, app_log.logger
+    )
+    add_ParserBulkServicer_to_server(bulk_servicer, server, bulkserialhelper)
+    reconciler = asyncio.ensure_future(
+        bulk_servicer.reconcile_batches_periodically(config.get("BATCH_RECONCILE_INTERVAL", 60))
+    )
     listen_addr = "[::]:" + str(config.get("GRPC_PORT", 50051))
     server.add_insecure_port(listen_addr)
 
     app_log.logger.info("Starting server on %s", listen_addr)
     await server.start()
-    await server.wait_for_termination()
+    try:
+        await server.wait_for_termination()
+    finally:
+        reconciler.cancel()
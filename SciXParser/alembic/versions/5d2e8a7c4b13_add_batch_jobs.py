@@ -0,0 +1,37 @@
+"""add_batch_jobs
+
+Revision ID: 5d2e8a7c4b13
+Revises: e71f4b9c2a58
+Create Date: 2026-10-18 15:02:41.207365
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "5d2e8a7c4b13"
+down_revision = "e71f4b9c2a58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "batch_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=True),
+        sa.Column("pending", sa.Integer(), nullable=True),
+        sa.Column("processing", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Integer(), nullable=True),
+        sa.Column("success", sa.Integer(), nullable=True),
+        sa.Column("unchanged", sa.Integer(), nullable=True),
+        sa.Column("date_created", sa.DateTime(), nullable=True),
+        sa.Column("date_modified", sa.DateTime(), nullable=True),
+        sa.Column("date_completed", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("batch_jobs")
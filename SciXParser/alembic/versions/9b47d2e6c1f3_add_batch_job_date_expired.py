@@ -0,0 +1,23 @@
+"""add_batch_job_date_expired
+
+Revision ID: 9b47d2e6c1f3
+Revises: 5d2e8a7c4b13
+Create Date: 2026-10-18 18:41:07.532914
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9b47d2e6c1f3"
+down_revision = "5d2e8a7c4b13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("batch_jobs", sa.Column("date_expired", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("batch_jobs", "date_expired")
@@ -0,0 +1,23 @@
+"""add_parser_record_input_hash
+
+Revision ID: c3a8e51f0d27
+Revises: 411043fdb731
+Create Date: 2026-10-18 10:02:41.218337
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3a8e51f0d27"
+down_revision = "411043fdb731"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("parser_records", sa.Column("input_hash", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("parser_records", "input_hash")
@@ -0,0 +1,23 @@
+"""add_parser_record_fingerprint
+
+Revision ID: e71f4b9c2a58
+Revises: c3a8e51f0d27
+Create Date: 2026-10-18 11:26:09.530118
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e71f4b9c2a58"
+down_revision = "c3a8e51f0d27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("parser_records", sa.Column("parsed_fingerprint", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("parser_records", "parsed_fingerprint")
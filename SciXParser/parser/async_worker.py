@@ -0,0 +1,287 @@
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent import futures
+
+from confluent_kafka import TopicPartition
+
+from SciXParser.parser import db, parsing_handler
+from SciXParser.parser.registry import registry
+
+STAGES = ("prepare", "parse", "persist", "produce", "publish")
+
+
+class _Job:
+    """A consumed message as it moves through the stages of the async worker."""
+
+    def __init__(self, msg):
+        self.msg = msg
+        self.partition = (msg.topic(), msg.partition())
+        self.offset = msg.offset()
+        self.record_id = msg.value().get("record_id")
+        self.job_request = None
+        self.reparse = False
+        self.parsed_record = None
+        self.status = None
+        # None if nothing was produced for the job, otherwise whether it was delivered.
+        self.delivered = None
+        self.completed = False
+
+
+class AsyncParserWorker:
+    """
+    Runs the Parser pipeline as a set of asyncio stages joined by bounded queues:
+
+    prepare: status updates and, for REPARSE requests, the db lookup and S3 fetch
+    parse: parsing the raw metadata, in the app parse_executor if one is configured
+    persist: writing the parsed record to postgres
+    produce: sending the parsed record to the Pipeline output topic
+    publish: publishing and recording the final job status
+
+    Each stage runs PARSER_ASYNC_STAGE_CONCURRENCY[stage] workers, so records waiting on
+    the network overlap with records being parsed. Records are not guaranteed to finish
+    in the order they were consumed, so the offset of a partition is only committed up to
+    the last message before which every message of the partition has finished. A message
+    whose parsed record was produced only finishes once the producer reports its delivery,
+    and one whose delivery failed is never committed, so that it is consumed again.
+    """
+
+    def __init__(self, app, consumer, producer):
+        """
+        input:
+        app: The PARSER_APP instance
+        consumer: The kafka consumer for the pipeline
+        producer: The kafka producer for the pipeline
+        """
+        self.app = app
+        self.consumer = consumer
+        self.producer = producer
+        self.queue_size = app.config.get("PARSER_ASYNC_QUEUE_SIZE", 64)
+        self.concurrency = dict.fromkeys(STAGES, 1)
+        self.concurrency.update(app.config.get("PARSER_ASYNC_STAGE_CONCURRENCY", {}))
+        self.stats_interval = app.config.get("PARSER_STATS_INTERVAL", 60)
+        # One thread per blocking stage worker plus one for the consumer poll.
+        self.io_executor = futures.ThreadPoolExecutor(
+            max_workers=sum(self.concurrency.values()) + 1
+        )
+        self.loop = None
+        self.queues = {}
+        self.tasks = []
+        # (topic, partition): (offsets in consumption order, finished offsets)
+        self.offsets = {}
+
+    async def run(self):
+        """
+        Starts the stage workers and feeds them from the consumer until cancelled.
+        """
+        self.start()
+        self.tasks.append(asyncio.ensure_future(self._report_stats()))
+        await self._consume()
+
+    def start(self):
+        """Creates the stage queues and starts the stage workers."""
+        self.loop = asyncio.get_event_loop()
+        self.queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+        for stage in STAGES:
+            for _ in range(self.concurrency[stage]):
+                self.tasks.append(asyncio.ensure_future(self._stage_worker(stage)))
+
+    async def submit(self, msg):
+        """Queues a consumed message, waiting while the prepare queue is full."""
+        job = _Job(msg)
+        self._track(job)
+        await self.queues["prepare"].put(job)
+
+    async def join(self):
+        """
+        Waits until every submitted message has passed through all of the stages and its
+        parsed record, if any, has been delivered.
+        """
+        for stage in STAGES:
+            await self.queues[stage].join()
+        await self._run(self.io_executor, self.producer.flush)
+
+    def stats(self):
+        """
+        Returns the current queue depths along with the app metrics, which include the
+        time spent in each stage.
+        """
+        for stage, queue in self.queues.items():
+            self.app.metrics.gauge("queue.{}".format(stage), queue.qsize())
+        return self.app.metrics.snapshot()
+
+    async def _run(self, executor, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(executor, func, *args)
+
+    async def _consume(self):
+        backoff = self.app._poll_backoff()
+        while True:
+            # The stages buffer statuses inside units of work, which leave the flush to here.
+            if self.app.status_buffer.due():
+                await self._run(self.io_executor, self.app.status_buffer.flush_if_due)
+            # Serve the delivery reports of the parsed records produced so far.
+            self.producer.poll(0)
+            msg = await self._run(
+                self.io_executor, self.app._consume_from_topic, self.consumer, backoff.timeout
+            )
+            if msg is None:
+                backoff.idle()
+                continue
+            if msg.error():
+                self.app.logger.error("Consumer error: {}".format(msg.error()))
+                continue
+            backoff.reset()
+            await self.submit(msg)
+
+    async def _report_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            self.app.logger.info("Async worker stats: {}".format(json.dumps(self.stats())))
+
+    async def _stage_worker(self, stage):
+        queue = self.queues[stage]
+        while True:
+            job = await queue.get()
+            start = time.monotonic()
+            try:
+                next_stage = await self._handle(stage, job)
+            except Exception:
+                self.app.logger.exception("{} stage failed for {}".format(stage, job.record_id))
+                job.status = "Error"
+                next_stage = "publish" if stage != "publish" else None
+            self.app.metrics.observe("stage.{}".format(stage), time.monotonic() - start)
+            # Hand the job on before marking it done so that join() sees it in the next stage.
+            if next_stage:
+                await self.queues[next_stage].put(job)
+            else:
+                self._complete(job)
+            queue.task_done()
+
+    def _track(self, job):
+        """Records the offset of job as in flight in its partition."""
+        self.offsets.setdefault(job.partition, (deque(), set()))[0].append(job.offset)
+
+    def _complete(self, job):
+        """Marks job as through all of the stages, finishing it unless it awaits delivery."""
+        job.completed = True
+        if job.delivered is not False:
+            self._finish(job)
+
+    def _delivered(self, job, err):
+        """Handles the delivery report of the parsed record of job."""
+        if err is not None:
+            self.app.logger.error(
+                "Failed to deliver the parsed record of {}: {}. Its offset is not committed.".format(
+                    job.record_id, err
+                )
+            )
+            return
+        job.delivered = True
+        if job.completed:
+            self._finish(job)
+
+    def _finish(self, job):
+        """
+        Marks the offset of job as finished and commits the offset of its partition past
+        every message that has finished without an earlier message still in flight.
+        """
+        in_flight, finished = self.offsets[job.partition]
+        finished.add(job.offset)
+        committable = None
+        while in_flight and in_flight[0] in finished:
+            committable = in_flight.popleft()
+            finished.discard(committable)
+        if committable is not None:
+            topic, partition = job.partition
+            self.consumer.commit(
+                offsets=[TopicPartition(topic, partition, committable + 1)], asynchronous=True
+            )
+
+    async def _handle(self, stage, job):
+        """Runs stage for job and returns the stage the job should move to next."""
+        if stage == "parse":
+            task = job.job_request.get("task")
+            await self._run(self.io_executor, registry.acquire, task)
+            try:
+                job.parsed_record = await self._run(
+                    self.app.parse_executor or self.io_executor,
+                    parsing_handler.parse_metadata,
+                    task,
+                    job.job_request.get("record_xml"),
+                )
+            finally:
+                registry.release(task)
+            return "persist"
+        handler = getattr(self, "_{}_job".format(stage))
+        return await self._run(self.io_executor, self._in_unit_of_work, handler, job)
+
+    def _in_unit_of_work(self, handler, job):
+        """Runs handler so that its db writes are committed in a single transaction."""
+        with db.unit_of_work(self.app):
+            return handler(job)
+
+    def _prepare_job(self, job):
+        self.app._observe_time_to_process(job.msg)
+        job_request = job.msg.value()
+        job_request["status"] = "Processing"
+        db.write_status_redis(
+            self.app.status_publisher,
+            json.dumps({"job_id": str(job.record_id), "status": job_request["status"]}),
+        )
+
+        if job_request.get("task") == "REPARSE":
+            db.update_job_status(self.app, job.record_id, job_request["status"])
+            job.reparse = True
+            job.job_request, job.status = parsing_handler.prepare_reparse(
+                self.app, job_request, self.producer
+            )
+        else:
+            db.write_job_status(self.app, job_request)
+            job.job_request = job_request
+
+        if not job.status and job.job_request.get("task") not in registry:
+            self.app.logger.error(
+                "{} is not a valid data source. Stopping.".format(job.job_request.get("task"))
+            )
+            job.status = "Error"
+        elif not job.status and parsing_handler.input_unchanged(self.app, job.job_request):
+            job.status = "Unchanged"
+
+        return "publish" if job.status else "parse"
+
+    def _persist_job(self, job):
+        record_status, job.status = parsing_handler.store_parsed_record(
+            self.app, job.job_request, job.parsed_record, reparse=job.reparse
+        )
+        return "produce" if record_status else "publish"
+
+    def _produce_job(self, job):
+        job.delivered = False
+        try:
+            job.status = parsing_handler.produce_parsed_record(
+                self.app,
+                job.job_request,
+                self.producer,
+                job.parsed_record,
+                # Delivery reports are served on the thread polling the producer.
+                on_delivery=lambda err, _: self.loop.call_soon_threadsafe(
+                    self._delivered, job, err
+                ),
+            )
+        except Exception:
+            job.delivered = None
+            raise
+        return "publish"
+
+    def _publish_job(self, job):
+        db.write_status_redis(
+            self.app.status_publisher,
+            json.dumps({"job_id": str(job.record_id), "status": job.status}),
+        )
+        if job.status == "Error":
+            db.write_job_error(self.app, job.msg.value())
+        else:
+            db.update_job_status(self.app, job.record_id, job.status)
+        self.app.metrics.incr("records.{}".format(job.status))
+        return None
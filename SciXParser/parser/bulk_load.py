@@ -0,0 +1,263 @@
+import io
+import json
+import logging
+from datetime import datetime
+
+from SciXParser.parser import db, parsing_handler
+from SciXParser.parser.registry import registry
+
+PARSER_RECORD_COLUMNS = (
+    "id",
+    "s3_key",
+    "parsed_data",
+    "date_created",
+    "date_modified",
+    "source",
+    "input_hash",
+    "parsed_fingerprint",
+)
+JOB_STATUS_COLUMNS = (
+    "record_id",
+    "job_request",
+    "status",
+    "date_added",
+    "date_of_last_success",
+    "date_of_last_attempt",
+)
+
+PARSER_RECORD_MERGE = """
+    INSERT INTO parser_records ({columns}) SELECT {columns} FROM {staging}
+    ON CONFLICT (id) DO UPDATE SET
+        s3_key = EXCLUDED.s3_key,
+        parsed_data = EXCLUDED.parsed_data,
+        date_modified = EXCLUDED.date_modified,
+        source = EXCLUDED.source,
+        input_hash = EXCLUDED.input_hash,
+        parsed_fingerprint = EXCLUDED.parsed_fingerprint
+"""
+JOB_STATUS_MERGE = """
+    INSERT INTO grpc_status ({columns}) SELECT {columns} FROM {staging}
+    ON CONFLICT (record_id) DO UPDATE SET
+        job_request = EXCLUDED.job_request,
+        status = EXCLUDED.status,
+        date_of_last_success = COALESCE(
+            EXCLUDED.date_of_last_success, grpc_status.date_of_last_success
+        ),
+        date_of_last_attempt = EXCLUDED.date_of_last_attempt
+"""
+
+
+def copy_parser_records(session, records):
+    """
+    input:
+    session: The session to write with
+    records: A list of dicts keyed by the names in PARSER_RECORD_COLUMNS
+
+    Streams records into a staging table with COPY and merges them into parser_records
+    with a single statement. Returns the number of records merged.
+    """
+    return _copy_merge(
+        session, "parser_records", PARSER_RECORD_COLUMNS, PARSER_RECORD_MERGE, records
+    )
+
+
+def copy_job_statuses(session, statuses):
+    """
+    input:
+    session: The session to write with
+    statuses: A list of dicts keyed by the names in JOB_STATUS_COLUMNS
+
+    Streams statuses into a staging table with COPY and merges them into grpc_status
+    with a single statement. Returns the number of statuses merged.
+    """
+    return _copy_merge(session, "grpc_status", JOB_STATUS_COLUMNS, JOB_STATUS_MERGE, statuses)
+
+
+def _copy_merge(session, table, columns, merge, rows):
+    # Only the last row for each key is kept, since a merge may not update a row twice.
+    rows = list({str(row[columns[0]]): row for row in rows}.values())
+    if not rows:
+        return 0
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row.get(column)) for column in columns) + "\n")
+    buffer.seek(0)
+
+    staging = "{}_staging".format(table)
+    column_names = ", ".join(columns)
+    # Write anything pending in the session before going around it on the same connection.
+    session.flush()
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(
+            "CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP".format(
+                staging, table
+            )
+        )
+        cursor.copy_expert("COPY {} ({}) FROM STDIN".format(staging, column_names), buffer)
+        cursor.execute(merge.format(columns=column_names, staging=staging))
+        merged = cursor.rowcount
+        cursor.execute("DROP TABLE {}".format(staging))
+    finally:
+        cursor.close()
+    return merged
+
+
+def _copy_value(value):
+    """Returns value in the COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    elif hasattr(value, "name"):
+        value = value.name
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def load_records(app, job_requests, producer=None):
+    """
+    input:
+    app: The PARSER_APP instance
+    job_requests: Job requests carrying the raw metadata of records from known sources
+    producer: If given, parsed records are also sent to the Pipeline output topic
+
+    Parses every record and writes the parsed records and their job statuses with one
+    COPY and merge per table. Records whose raw metadata is unchanged are skipped unless
+    force is set. Returns a map of record_id to the final status of each record.
+    The parsed records are only produced once the load has been committed, so that a
+    failed load can be retried one record at a time without producing any record twice.
+    """
+    if not job_requests:
+        return {}
+
+    date = datetime.now()
+    records = []
+    statuses = {}
+    for job_request in job_requests:
+        job_request["input_hash"] = parsing_handler.compute_input_hash(
+            job_request.get("task"), job_request.get("record_xml")
+        )
+
+    with db.unit_of_work(app) as session:
+        stored_hashes = db.get_parser_record_input_hashes(
+            session, [job_request.get("record_id") for job_request in job_requests]
+        )
+        for job_request in job_requests:
+            record_id = str(job_request.get("record_id"))
+            task = job_request.get("task")
+            if (
+                not job_request.get("force")
+                and stored_hashes.get(record_id) == job_request["input_hash"]
+            ):
+                app.metrics.incr("records_skipped")
+                statuses[record_id] = "Unchanged"
+                continue
+            try:
+                with registry.slot(task):
+                    parsed_record = parsing_handler.parse_metadata(
+                        task, job_request.get("record_xml")
+                    )
+            except Exception:
+                app.logger.exception("Failed to parse record {}".format(record_id))
+                statuses[record_id] = "Error"
+                continue
+            records.append(
+                {
+                    "id": record_id,
+                    "s3_key": job_request.get("s3_path"),
+                    "parsed_data": parsed_record,
+                    "date_created": date,
+                    "date_modified": date,
+                    "source": task,
+                    "input_hash": job_request["input_hash"],
+                    "parsed_fingerprint": parsing_handler.compute_fingerprint(parsed_record),
+                }
+            )
+            statuses[record_id] = "Success"
+
+        copy_parser_records(session, records)
+        copy_job_statuses(
+            session,
+            [
+                {
+                    "record_id": job_request.get("record_id"),
+                    "job_request": job_request.get("task"),
+                    "status": statuses[str(job_request.get("record_id"))],
+                    "date_added": date,
+                    "date_of_last_success": (
+                        date if statuses[str(job_request.get("record_id"))] == "Success" else None
+                    ),
+                    "date_of_last_attempt": date,
+                }
+                for job_request in job_requests
+            ],
+        )
+    if producer:
+        for record in records:
+            try:
+                # Sets the status of the record to Error if it cannot be produced.
+                parsing_handler.produce_parsed_record(
+                    app, {"record_id": record["id"]}, producer, record["parsed_data"]
+                )
+            except ValueError:
+                statuses[record["id"]] = "Error"
+    app.logger.info("Bulk loaded {} of {} records".format(len(records), len(job_requests)))
+    return statuses
+
+
+def read_backfill_file(path, task="ARXIV", logger=None):
+    """
+    Yields a job request for every line of path, each holding a record id and the S3 path
+    of its raw metadata separated by whitespace. Malformed lines are logged and skipped.
+    """
+    logger = logger or logging.getLogger(__name__)
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) != 2:
+                logger.error(
+                    "Skipping line {} of {}: expected a record id and an S3 path, got {!r}".format(
+                        line_number, path, line.strip()
+                    )
+                )
+                continue
+            yield {"record_id": fields[0], "s3_path": fields[1], "task": task}
+
+
+def backfill(app, job_requests, batch_size=1000, producer=None):
+    """
+    input:
+    app: The PARSER_APP instance
+    job_requests: An iterable of job requests with a record_id, s3_path and task
+    batch_size: The number of records loaded with each COPY
+    producer: If given, parsed records are also sent to the Pipeline output topic
+
+    Collects the raw metadata of each record from S3 and bulk loads the records in
+    batches of batch_size. Returns the number of records loaded with each status.
+    """
+    counts = {}
+    for batch in db.chunked(job_requests, batch_size):
+        loadable = []
+        for job_request in batch:
+            try:
+                job_request["record_xml"] = db.collect_metadata_from_secondary_s3(
+                    app, job_request["s3_path"], job_request, job_request["record_id"]
+                )
+                loadable.append(job_request)
+            except ValueError:
+                counts["Error"] = counts.get("Error", 0) + 1
+        for status in load_records(app, loadable, producer).values():
+            counts[status] = counts.get(status, 0) + 1
+        app.logger.info("Backfill progress: {}".format(json.dumps(counts)))
+    return counts
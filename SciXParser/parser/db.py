@@ -1,14 +1,296 @@
+import collections
 import datetime
+import itertools
+import json
 import logging as logger
+import threading
+import zlib
+from contextlib import contextmanager
+
+import redis
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
 
 import parser.models as models
 
 logger.basicConfig(level=logger.DEBUG)
 
+_unit_of_work = threading.local()
+
+STATUS_CACHE_KEY = "PARSER_status:{}"
+STATUS_CACHE_TTL = 86400
+STATUS_CHANNEL = "PARSER_statuses"
+STATUS_STREAM = "PARSER_status_stream"
+BATCH_COUNTERS_KEY = "PARSER_batch:{}"
+BATCH_EVENTS_KEY = "PARSER_batch_events:{}"
+BATCH_EVENTS_MAXLEN = 100000
+BATCH_EVENTS_READ_COUNT = 1000
+# Sets the latest status of a job and, if the job belongs to a batch, moves it from its old
+# status counter to its new one and records a terminal status in the batch events stream,
+# so that the progress of a batch is kept up to date in O(1) per status update.
+# KEYS: status hash of the job; ARGV: job_id, status, updated, ttl, events maxlen
+STATUS_UPDATE_SCRIPT = """
+local old = redis.call('HGET', KEYS[1], 'status')
+local batch = redis.call('HGET', KEYS[1], 'batch')
+redis.call('HSET', KEYS[1], 'status', ARGV[2], 'updated', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+local counters = batch and 'PARSER_batch:' .. batch
+-- Counters without a total have expired and are not recreated.
+if batch and old ~= ARGV[2] and redis.call('HEXISTS', counters, 'total') == 1 then
+    if old then
+        redis.call('HINCRBY', counters, old, -1)
+    end
+    redis.call('HINCRBY', counters, ARGV[2], 1)
+    redis.call('EXPIRE', counters, ARGV[4])
+    if ARGV[2] == 'Success' or ARGV[2] == 'Error' or ARGV[2] == 'Unchanged' then
+        local events = 'PARSER_batch_events:' .. batch
+        redis.call('XADD', events, 'MAXLEN', '~', ARGV[5], '*', 'job_id', ARGV[1], 'status', ARGV[2])
+        redis.call('EXPIRE', events, ARGV[4])
+    end
+end
+"""
+
+
+@contextmanager
+def unit_of_work(cls):
+    """
+    Runs every db call made by this thread inside the block on one session and commits
+    them together when the block exits, or rolls them all back if it raises.
+    A nested unit_of_work joins the outer one inside a savepoint, so that a failure only
+    rolls back the changes made in the nested block.
+    """
+    session = current_session()
+    if session is not None:
+        with session.begin_nested():
+            yield session
+        return
+
+    with cls.session_scope() as session:
+        _unit_of_work.session = session
+        try:
+            yield session
+        finally:
+            _unit_of_work.session = None
+
+
+def chunked(items, size):
+    """
+    Yield successive lists of at most size items
+    """
+    items = iter(items)
+    chunk = list(itertools.islice(items, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(items, size))
+
+
+def current_session():
+    """
+    Return the session of the unit of work open in this thread, if there is one.
+    """
+    return getattr(_unit_of_work, "session", None)
+
+
+def status_channel(job_id, mode="single", shards=64):
+    """
+    Return the redis channel the statuses of job_id are published on.
+    mode: single publishes every status on PARSER_statuses, sharded on one of shards
+          PARSER_statuses:{shard} channels and job on PARSER_statuses:{job_id}
+    """
+    if mode == "job":
+        return "{}:{}".format(STATUS_CHANNEL, job_id)
+    if mode == "sharded":
+        return "{}:{}".format(STATUS_CHANNEL, zlib.crc32(str(job_id).encode("utf-8")) % shards)
+    return STATUS_CHANNEL
+
+
+def status_stream(job_id, mode="single", shards=64):
+    """
+    Return the redis stream the statuses of job_id are added to, split across streams
+    the same way as the channels of status_channel.
+    """
+    return status_channel(job_id, mode, shards).replace(STATUS_CHANNEL, STATUS_STREAM, 1)
+
+
+def stream_id(entry_id):
+    """
+    Return a redis stream entry id as a tuple that sorts in the order of the stream.
+    """
+    milliseconds, _, sequence = str(entry_id).partition("-")
+    return int(milliseconds), int(sequence or 0)
+
 
 def write_status_redis(redis_instance, status):
+    """
+    Publish status and keep it in redis as the latest status of its job.
+    redis_instance may be a redis client or a StatusPublisher, in which case status is
+    published on the channel of its job for the channel mode of the publisher, or added
+    to the stream of its job, trimmed to about stream_maxlen entries, if the publisher
+    uses the stream transport.
+    The latest status is kept by STATUS_UPDATE_SCRIPT, which is sent with EVALSHA.
+    """
     logger.debug("Publishing status: {}".format(status))
-    redis_instance.publish("PARSER_statuses", status)
+    try:
+        status_dict = json.loads(status)
+    except ValueError:
+        status_dict = None
+    if not isinstance(status_dict, dict) or not status_dict.get("job_id"):
+        redis_instance.publish(STATUS_CHANNEL, status)
+        return
+
+    mode = getattr(redis_instance, "channel_mode", "single")
+    shards = getattr(redis_instance, "channel_shards", 64)
+    pipeline = redis_instance.pipeline(transaction=False)
+    if getattr(redis_instance, "transport", "pubsub") == "stream":
+        pipeline.xadd(
+            status_stream(status_dict["job_id"], mode, shards),
+            {"job_id": str(status_dict["job_id"]), "status": str(status_dict.get("status"))},
+            maxlen=getattr(redis_instance, "stream_maxlen", 10000),
+            approximate=True,
+        )
+    else:
+        pipeline.publish(status_channel(status_dict["job_id"], mode, shards), status)
+    _cache_status(
+        pipeline,
+        redis_instance.register_script(STATUS_UPDATE_SCRIPT),
+        status_dict["job_id"],
+        status_dict.get("status"),
+        getattr(redis_instance, "status_ttl", STATUS_CACHE_TTL),
+    )
+    pipeline.execute()
+
+
+def cache_statuses_redis(redis_instance, statuses, ttl=STATUS_CACHE_TTL):
+    """
+    Keep statuses, a map of job_id to status read from postgres, in redis as the latest
+    status of each job that has no status in redis yet, so that a status written by the
+    Pipeline in the meantime is not replaced.
+    """
+    if not statuses:
+        return
+    try:
+        pipeline = redis_instance.pipeline(transaction=False)
+        for job_id, status in statuses.items():
+            key = STATUS_CACHE_KEY.format(job_id)
+            pipeline.hsetnx(key, "status", status)
+            pipeline.expire(key, ttl)
+        pipeline.execute()
+    except redis.RedisError:
+        logger.exception("Failed to cache {} statuses in redis".format(len(statuses)))
+
+
+def clear_cached_statuses_redis(redis_instance, job_ids):
+    """
+    Drop the statuses kept in redis for job_ids, e.g. before the jobs are run again.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    try:
+        redis_instance.delete(*[STATUS_CACHE_KEY.format(job_id) for job_id in job_ids])
+    except redis.RedisError:
+        logger.exception("Failed to clear {} cached statuses in redis".format(len(job_ids)))
+
+
+def get_cached_statuses_redis(redis_instance, job_ids):
+    """
+    Return a map of job_id to the latest status kept in redis for every job in job_ids
+    that has one. Returns an empty map if redis cannot be reached.
+    """
+    job_ids = [str(job_id) for job_id in job_ids]
+    try:
+        pipeline = redis_instance.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipeline.hget(STATUS_CACHE_KEY.format(job_id), "status")
+        cached = pipeline.execute()
+    except redis.RedisError:
+        logger.exception("Failed to read cached statuses from redis")
+        return {}
+    return {job_id: status for job_id, status in zip(job_ids, cached) if status}
+
+
+def _cache_status(pipeline, script, job_id, status, ttl):
+    keys = [STATUS_CACHE_KEY.format(job_id)]
+    args = [
+        str(job_id),
+        str(status),
+        datetime.datetime.now().isoformat(),
+        ttl,
+        BATCH_EVENTS_MAXLEN,
+    ]
+    # The script is loaded into redis by the pipeline if redis no longer has it.
+    run_script = getattr(pipeline, "run_script", None)
+    if run_script is not None:
+        run_script(script, keys, args)
+    else:
+        script(keys=keys, args=args, client=pipeline)
+
+
+def register_batch_redis(
+    redis_instance, batch_id, statuses, ttl=STATUS_CACHE_TTL, reset=False, chunk_size=1000
+):
+    """
+    Add the jobs in statuses, a map of job_id to its current status, to the batch batch_id,
+    counting them in the progress of the batch. A job belongs to a single batch at a time.
+    reset: Start the batch over, dropping the counters and events of a previous run
+    """
+    pipeline = redis_instance.pipeline(transaction=False)
+    counters = BATCH_COUNTERS_KEY.format(batch_id)
+    if reset:
+        pipeline.delete(counters, BATCH_EVENTS_KEY.format(batch_id))
+    pipeline.hincrby(counters, "total", len(statuses))
+    for status, count in collections.Counter(statuses.values()).items():
+        pipeline.hincrby(counters, status, count)
+    pipeline.expire(counters, ttl)
+    pipeline.execute()
+
+    for chunk in chunked(statuses.items(), chunk_size):
+        pipeline = redis_instance.pipeline(transaction=False)
+        for job_id, status in chunk:
+            key = STATUS_CACHE_KEY.format(job_id)
+            pipeline.hset(key, mapping={"status": status, "batch": batch_id})
+            pipeline.expire(key, ttl)
+        pipeline.execute()
+
+
+def get_job_batches_redis(redis_instance, job_ids):
+    """
+    Return a map of job_id to the batch the job belongs to, or None if it has none, for
+    every job in job_ids.
+    """
+    pipeline = redis_instance.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipeline.hget(STATUS_CACHE_KEY.format(job_id), "batch")
+    return dict(zip(job_ids, pipeline.execute()))
+
+
+def get_batch_progress_redis(redis_instance, batch_id):
+    """
+    Return a map of status to the number of jobs of batch_id with that status, along with
+    the total number of jobs in the batch, or None if the batch is not known to redis or
+    its counters have expired.
+    """
+    counters = redis_instance.hgetall(BATCH_COUNTERS_KEY.format(batch_id))
+    if "total" not in counters:
+        return None
+    progress = dict.fromkeys([status.name for status in models.Status] + ["total"], 0)
+    progress.update({key: int(value) for key, value in counters.items()})
+    return progress
+
+
+def read_batch_events_redis(
+    redis_instance, batch_id, last_id="0-0", count=BATCH_EVENTS_READ_COUNT
+):
+    """
+    Return up to count (entry id, job_id, status) terminal status events of batch_id
+    recorded after the entry last_id.
+    """
+    response = redis_instance.xread({BATCH_EVENTS_KEY.format(batch_id): last_id}, count=count)
+    return [
+        (entry_id, fields.get("job_id"), fields.get("status"))
+        for _, entries in response or []
+        for entry_id, fields in entries
+    ]
 
 
 def collect_metadata_from_secondary_s3(app, s3_path, job_request, metadata_uuid):
@@ -23,7 +305,10 @@ def collect_metadata_from_secondary_s3(app, s3_path, job_request, metadata_uuid)
 
     app.logger.error("Unable to find a valid s3 object for {}. Stopping.".format(metadata_uuid))
     status = "Error"
-    write_status_redis(app.redis, status)
+    write_status_redis(
+        app.status_publisher,
+        json.dumps({"job_id": str(job_request.get("record_id")), "status": status}),
+    )
     update_job_status(app, job_request.get("record_id"), status)
 
     msg = "Unable to find a valid s3 object for {}. Stopping.".format(metadata_uuid)
@@ -32,30 +317,34 @@ def collect_metadata_from_secondary_s3(app, s3_path, job_request, metadata_uuid)
 
 def get_job_status_by_record_id(cls, record_ids, only_status=None):
     """
-    Return all updates with record_id
+    Return the status of the last record in record_ids that has one
+    """
+    statuses = get_job_statuses_by_record_ids(cls, record_ids, only_status)
+    status = None
+    for record_id in record_ids:
+        status = statuses.get(str(record_id), status)
+    return status
+
+
+def get_job_statuses_by_record_ids(cls, record_ids, only_status=None, chunk_size=5000):
+    """
+    Return a map of record_id to status for every record in record_ids that has one.
+    The statuses are fetched with a single query per chunk_size record ids.
     """
+    record_ids = list(dict.fromkeys(str(record_id) for record_id in record_ids))
+    statuses = {}
     with cls.session_scope() as session:
-        status = None
         logger.info("Opening Session")
-        for record_id in record_ids:
+        for chunk in chunked(record_ids, chunk_size):
+            query = session.query(models.gRPC_status.record_id, models.gRPC_status.status).filter(
+                models.gRPC_status.record_id.in_(chunk)
+            )
             if only_status:
-                record_db = (
-                    session.query(models.gRPC_status)
-                    .filter(models.gRPC_status.record_id == record_id)
-                    .filter_by(status=only_status)
-                    .first()
-                )
-            else:
-                record_db = (
-                    session.query(models.gRPC_status)
-                    .filter(models.gRPC_status.record_id == record_id)
-                    .first()
-                )
-            if record_db:
-                status = record_db.status
-                logger.info("{} has status: {}".format(record_db.record_id, status))
-
-    return status
+                query = query.filter(models.gRPC_status.status == only_status)
+            for record_id, status in query:
+                statuses[str(record_id)] = status
+    logger.info("Found statuses for {} of {} records".format(len(statuses), len(record_ids)))
+    return statuses
 
 
 def _get_job_by_record_id(session, record_id, only_status=None):
@@ -85,23 +374,38 @@ def _get_job_by_record_id(session, record_id, only_status=None):
 def write_job_status(cls, job_request):
     """
     Write new status for job to db
+    If the job has already been written (e.g. a replayed message), its status is updated.
     """
+    date = datetime.datetime.now()
+    statement = insert(models.gRPC_status).values(
+        record_id=job_request.get("record_id"),
+        job_request=job_request.get("task"),
+        status=job_request.get("status"),
+        date_added=date,
+        date_of_last_attempt=date,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[models.gRPC_status.record_id],
+        set_={
+            "job_request": statement.excluded.job_request,
+            "status": statement.excluded.status,
+            "date_of_last_attempt": statement.excluded.date_of_last_attempt,
+        },
+    )
     with cls.session_scope() as session:
-        job_status = models.gRPC_status()
-        job_status.record_id = job_request.get("record_id")
-        job_status.job_request = job_request.get("task")
-        job_status.status = job_request.get("status")
-        job_status.date_added = datetime.datetime.now()
-        job_status.date_of_last_attempt = job_status.date_added
-        session.add(job_status)
-        session.commit()
+        session.execute(statement)
     return True
 
 
 def update_job_status(cls, record_id, status=None):
     """
     Update status for job previously written to db
+    If cls has a status_buffer, intermediate statuses are left to it to write in bulk.
     """
+    status_buffer = getattr(cls, "status_buffer", None)
+    if status_buffer is not None and status_buffer.add(record_id, status):
+        return True
+
     updated = False
     with cls.session_scope() as session:
         job_status = _get_job_by_record_id(session, record_id)
@@ -113,27 +417,87 @@ def update_job_status(cls, record_id, status=None):
             else:
                 job_status.date_of_last_success = job_status.date_of_last_success
             session.add(job_status)
-            session.commit()
+            session.flush()
             updated = True
     return updated
 
 
-def write_parser_record(cls, record_id, date, s3_key, parsed_metadata, source):
+def update_job_statuses(session, statuses, since=None, keep=(), chunk_size=5000):
+    """
+    Update the jobs in statuses, a map of record_id to status, with a single UPDATE per
+    status and chunk_size record ids.
+    Jobs whose status is in keep and was last updated at or after since are left unchanged.
+    """
+    date = datetime.datetime.now()
+    record_ids_by_status = {}
+    for record_id, status in statuses.items():
+        record_ids_by_status.setdefault(status, []).append(record_id)
+
+    updated = 0
+    for status, record_ids in record_ids_by_status.items():
+        values = {
+            models.gRPC_status.status: status,
+            models.gRPC_status.date_of_last_attempt: date,
+        }
+        if status == "Success":
+            values[models.gRPC_status.date_of_last_success] = date
+        for chunk in chunked(record_ids, chunk_size):
+            query = session.query(models.gRPC_status).filter(
+                models.gRPC_status.record_id.in_(chunk)
+            )
+            if since and keep:
+                query = query.filter(
+                    or_(
+                        models.gRPC_status.status.is_(None),
+                        models.gRPC_status.status.notin_(keep),
+                        models.gRPC_status.date_of_last_attempt < since,
+                    )
+                )
+            updated += query.update(values, synchronize_session=False)
+    return updated
+
+
+def write_job_error(cls, job_request):
+    """
+    Set the status of job_request to Error, writing the job if it was rolled back with
+    the rest of a failed unit of work.
+    """
+    if not update_job_status(cls, job_request.get("record_id"), "Error"):
+        write_job_status(cls, dict(job_request, status="Error"))
+
+
+def write_parser_record(
+    cls,
+    record_id,
+    date,
+    s3_key,
+    parsed_metadata,
+    source,
+    input_hash=None,
+    parsed_fingerprint=None,
+):
     """
     Write harvested record to db.
+    If the record has already been written (e.g. a replayed message), it is overwritten.
     """
     success = False
     with cls.session_scope() as session:
         try:
-            parser_record = models.parser_record()
-            parser_record.id = record_id
-            parser_record.s3_key = s3_key
-            parser_record.parsed_data = parsed_metadata
-            parser_record.date_created = date
-            parser_record.date_modified = date
-            parser_record.source = source
-            session.add(parser_record)
-            session.commit()
+            upsert_parser_records(
+                session,
+                [
+                    {
+                        "id": record_id,
+                        "s3_key": s3_key,
+                        "parsed_data": parsed_metadata,
+                        "date_created": date,
+                        "date_modified": date,
+                        "source": source,
+                        "input_hash": input_hash,
+                        "parsed_fingerprint": parsed_fingerprint,
+                    }
+                ],
+            )
             success = True
 
         except Exception as e:
@@ -142,24 +506,54 @@ def write_parser_record(cls, record_id, date, s3_key, parsed_metadata, source):
     return success
 
 
-def update_parser_record_metadata(session, record_id, date, parsed_metadata, logger):
+def upsert_parser_records(session, records):
+    """
+    Insert or update several parser records with a single INSERT ... ON CONFLICT statement.
+    input:
+    session: The session to write with
+    records: A list of dicts with the same parser_record columns as keys
+    The date_created of records that already exist is kept. If a record id is repeated,
+    only its last record is written.
+    Returns the number of records written.
+    """
+    records = list({str(record["id"]): record for record in records}.values())
+    if not records:
+        return 0
+    statement = insert(models.parser_record).values(records)
+    statement = statement.on_conflict_do_update(
+        index_elements=[models.parser_record.id],
+        set_={
+            column: statement.excluded[column]
+            for column in records[0]
+            if column not in ("id", "date_created")
+        },
+    )
+    return session.execute(statement).rowcount
+
+
+def update_parser_record_metadata(
+    session, record_id, date, parsed_metadata, logger, input_hash=None, parsed_fingerprint=None
+):
     """
     Write harvested record to db.
+    The existing row is updated in place so that the old parsed data is never loaded.
     """
     updated = False
-    record_db = get_parser_record(session, record_id)
     try:
-        if record_db:
-            parser_record = models.parser_record()
-            parser_record.id = record_db.id
-            parser_record.s3_key = record_db.s3_key
-            parser_record.parsed_data = parsed_metadata
-            parser_record.date_created = record_db.date_created
-            parser_record.date_modified = date
-            parser_record.source = record_db.source
-            session.merge(parser_record)
-            session.commit()
-            updated = True
+        updated = (
+            session.query(models.parser_record)
+            .filter(models.parser_record.id == record_id)
+            .update(
+                {
+                    models.parser_record.parsed_data: parsed_metadata,
+                    models.parser_record.date_modified: date,
+                    models.parser_record.input_hash: input_hash,
+                    models.parser_record.parsed_fingerprint: parsed_fingerprint,
+                },
+                synchronize_session=False,
+            )
+            > 0
+        )
     except Exception as e:
         logger.exception("Failed to write record {}.".format(record_id))
         raise e
@@ -167,6 +561,117 @@ def update_parser_record_metadata(session, record_id, date, parsed_metadata, log
     return updated
 
 
+def update_parser_record_hashes(session, record_id, input_hash, parsed_fingerprint):
+    """
+    Set the input hash and parsed fingerprint of the record with UUID: record_id without
+    touching its parsed data or date_modified.
+    """
+    return (
+        session.query(models.parser_record)
+        .filter(models.parser_record.id == record_id)
+        .update(
+            {
+                models.parser_record.input_hash: input_hash,
+                models.parser_record.parsed_fingerprint: parsed_fingerprint,
+            },
+            synchronize_session=False,
+        )
+        > 0
+    )
+
+
+def get_parser_record_input_hash(session, record_id):
+    """
+    Return the input hash stored with the record with UUID: record_id, without loading
+    the parsed data.
+    """
+    record_db = (
+        session.query(models.parser_record.input_hash)
+        .filter(models.parser_record.id == record_id)
+        .first()
+    )
+    return record_db.input_hash if record_db else None
+
+
+def get_parser_record_input_hashes(session, record_ids, chunk_size=5000):
+    """
+    Return a map of record_id to the input hash stored with each record in record_ids,
+    fetched with a single query per chunk_size record ids.
+    """
+    input_hashes = {}
+    for chunk in chunked(record_ids, chunk_size):
+        query = session.query(models.parser_record.id, models.parser_record.input_hash).filter(
+            models.parser_record.id.in_(chunk)
+        )
+        for record_id, input_hash in query:
+            input_hashes[str(record_id)] = input_hash
+    return input_hashes
+
+
+def get_parser_record_fingerprint(session, record_id):
+    """
+    Return the fingerprint of the parsed data stored with the record with UUID: record_id,
+    without loading the parsed data.
+    """
+    record_db = (
+        session.query(models.parser_record.parsed_fingerprint)
+        .filter(models.parser_record.id == record_id)
+        .first()
+    )
+    return record_db.parsed_fingerprint if record_db else None
+
+
+def get_parsed_records_page(
+    session,
+    after=None,
+    record_ids=None,
+    source=None,
+    modified_since=None,
+    modified_until=None,
+    limit=500,
+):
+    """
+    Return up to limit (record_id, parsed_data) pairs, ordered by record id, of the records
+    in record_ids, if given, from source, if given, and last modified in
+    [modified_since, modified_until). Passing the last record id of a page as after returns
+    the next page, without the query skipping over the records already returned.
+    """
+    query = session.query(models.parser_record.id, models.parser_record.parsed_data)
+    query = _filter_parser_records(query, record_ids, source, modified_since, modified_until)
+    if after is not None:
+        query = query.filter(models.parser_record.id > after)
+    query = query.order_by(models.parser_record.id).limit(limit)
+    return [(str(record_id), parsed_data) for record_id, parsed_data in query]
+
+
+def get_parser_record_ids_page(
+    session, after=None, source=None, modified_since=None, modified_until=None, limit=1000
+):
+    """
+    Return up to limit ids, in order, of the records from source, if given, and last
+    modified in [modified_since, modified_until). Passing the last id of a page as after
+    returns the next page, like get_parsed_records_page.
+    """
+    query = session.query(models.parser_record.id)
+    query = _filter_parser_records(query, None, source, modified_since, modified_until)
+    if after is not None:
+        query = query.filter(models.parser_record.id > after)
+    query = query.order_by(models.parser_record.id).limit(limit)
+    return [str(record_id) for (record_id,) in query]
+
+
+def _filter_parser_records(query, record_ids, source, modified_since, modified_until):
+    if record_ids is not None:
+        query = query.filter(models.parser_record.id.in_(record_ids))
+    if source:
+        query = query.filter(models.parser_record.source == source)
+    if modified_since:
+        query = query.filter(models.parser_record.date_modified >= modified_since)
+    if modified_until:
+        query = query.filter(models.parser_record.date_modified < modified_until)
+    return query
+
+
 def get_parser_record(session, record_id):
     """
     Return record with UUID: record_id
@@ -175,3 +680,75 @@ def get_parser_record(session, record_id):
         session.query(models.parser_record).filter(models.parser_record.id == record_id).first()
     )
     return record_db
+
+
+def add_batch_job_records(session, batch_id, count, date=None):
+    """
+    Add count jobs to the total of batch job batch_id, creating it if it does not exist.
+    """
+    date = date or datetime.datetime.now()
+    statement = insert(models.batch_job).values(
+        id=batch_id, total=count, date_created=date, date_modified=date
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[models.batch_job.id],
+        set_={
+            "total": models.batch_job.total + statement.excluded.total,
+            "date_modified": statement.excluded.date_modified,
+        },
+    )
+    session.execute(statement)
+
+
+def update_batch_job_progress(session, batch_id, progress, date=None):
+    """
+    Overwrite the status counters of batch job batch_id with progress, a map of status to
+    the number of jobs with that status, marking the batch job completed once every job in
+    it has reached a final status. The total of the batch job is only ever set by
+    add_batch_job_records.
+    Returns whether the batch job is completed.
+    """
+    batch = session.query(models.batch_job).filter(models.batch_job.id == batch_id).first()
+    if batch is None:
+        return False
+    date = date or datetime.datetime.now()
+    for status in models.Status:
+        setattr(batch, status.name.lower(), progress.get(status.name, 0))
+    batch.date_modified = date
+    completed = sum(progress.get(status, 0) for status in ("Error", "Success", "Unchanged"))
+    if completed >= (batch.total or 0):
+        batch.date_completed = date
+    return completed >= (batch.total or 0)
+
+
+def get_batch_job_progress(session, batch_id):
+    """
+    Return the counters of batch job batch_id in the same form as get_batch_progress_redis,
+    or None if there is no such batch job.
+    """
+    batch = session.query(models.batch_job).filter(models.batch_job.id == batch_id).first()
+    if batch is None:
+        return None
+    progress = {status.name: getattr(batch, status.name.lower()) or 0 for status in models.Status}
+    progress["total"] = batch.total or 0
+    return progress
+
+
+def expire_batch_job(session, batch_id, date=None):
+    """
+    Mark batch job batch_id as expired, so that it is no longer reconciled. Its counters
+    keep the progress last reconciled from redis.
+    """
+    session.query(models.batch_job).filter(models.batch_job.id == batch_id).update(
+        {"date_expired": date or datetime.datetime.now()}, synchronize_session=False
+    )
+
+
+def get_open_batch_job_ids(session):
+    """
+    Return the ids of the batch jobs that have been neither completed nor expired.
+    """
+    query = session.query(models.batch_job.id).filter(
+        models.batch_job.date_completed.is_(None), models.batch_job.date_expired.is_(None)
+    )
+    return [str(batch_id) for batch_id, in query]
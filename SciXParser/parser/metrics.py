@@ -0,0 +1,54 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Metrics:
+    """
+    Process-local counters, gauges and timings for the Parser pipeline.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.timings = {}
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timing = self.timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Records the time spent in the with block under name."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start)
+
+    def snapshot(self):
+        """
+        Returns a copy of the current metrics.
+        Timings include the mean duration in seconds.
+        """
+        with self._lock:
+            timings = {}
+            for name, timing in self.timings.items():
+                timings[name] = dict(timing, mean=timing["total"] / timing["count"])
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timings": timings,
+            }
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import JSON, Column, DateTime, Enum, String
+from sqlalchemy import JSON, Column, DateTime, Enum, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -49,3 +49,27 @@ class parser_record(Base):
     date_modified = Column(DateTime)
     parsed_data = Column(JSON)
     source = Column(Enum(Source))
+    input_hash = Column(String)
+    parsed_fingerprint = Column(String)
+
+
+class batch_job(Base):
+    """
+    Batch jobs table
+    table containing the number of jobs of each batch submitted through the gRPC API in
+    each status, as last reconciled from the counters kept in redis. Batch jobs whose
+    counters expired from redis before they were completed are marked expired.
+    """
+
+    __tablename__ = "batch_jobs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    total = Column(Integer, default=0)
+    pending = Column(Integer, default=0)
+    processing = Column(Integer, default=0)
+    error = Column(Integer, default=0)
+    success = Column(Integer, default=0)
+    unchanged = Column(Integer, default=0)
+    date_created = Column(DateTime)
+    date_modified = Column(DateTime)
+    date_completed = Column(DateTime)
+    date_expired = Column(DateTime)
@@ -1,9 +1,12 @@
+import asyncio
 import json
 import logging
 import time
+from collections import deque
+from concurrent import futures
 from contextlib import contextmanager
 
-import redis
+from confluent_kafka import TIMESTAMP_NOT_AVAILABLE
 from confluent_kafka.avro import AvroConsumer, AvroProducer
 from confluent_kafka.schema_registry import SchemaRegistryClient
 from SciXPipelineUtils import utils
@@ -11,13 +14,33 @@ from SciXPipelineUtils.s3_methods import load_s3_providers
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from SciXParser.parser import db, parsing_handler
+from SciXParser.parser import (
+    async_worker,
+    bulk_load,
+    db,
+    metrics,
+    parsing_handler,
+    schema_cache,
+    status_buffer,
+    status_publisher,
+)
+from SciXParser.parser.registry import registry
 
 
-def init_pipeline(proj_home, consumer_topic_name=None, consumer_schema_name=None):
+def init_pipeline(
+    proj_home,
+    consumer_topic_name=None,
+    consumer_schema_name=None,
+    parse_workers=None,
+    worker_mode=None,
+):
     """
     input:
     proj_home: The home directory for the Pipeline
+    parse_workers: The number of worker processes to parse records with.
+                   Defaults to PARSER_PARSE_WORKERS. 0 parses in the consumer process.
+    worker_mode: "sync" to run the consumer loop or "async" to run the staged asyncio worker.
+                 Defaults to PARSER_WORKER_MODE.
 
     Initializes the relevant python methods
     app: The main application class
@@ -32,7 +55,15 @@ def init_pipeline(proj_home, consumer_topic_name=None, consumer_schema_name=None
     if not consumer_topic_name:
         consumer_topic_name = app.config.get("PARSER_INPUT_TOPIC")
     app.schema_client = SchemaRegistryClient({"url": app.config.get("SCHEMA_REGISTRY_URL")})
-    schema = utils.get_schema(app, app.schema_client, consumer_schema_name)
+    schema = app.schema_cache.get(consumer_schema_name)
+    app.schema_cache.warm([app.config.get("PARSER_OUTPUT_SCHEMA")])
+    if parse_workers is None:
+        parse_workers = app.config.get("PARSER_PARSE_WORKERS", 0)
+    if parse_workers:
+        app.logger.info("Parsing records with {} worker processes".format(parse_workers))
+        app.parse_executor = futures.ProcessPoolExecutor(max_workers=parse_workers)
+    if worker_mode is None:
+        worker_mode = app.config.get("PARSER_WORKER_MODE", "sync")
     app.logger.info("Generating New Consumer on topic: {}".format(consumer_topic_name))
     consumer = AvroConsumer(
         {
@@ -40,6 +71,11 @@ def init_pipeline(proj_home, consumer_topic_name=None, consumer_schema_name=None
             "schema.registry.url": app.config.get("SCHEMA_REGISTRY_URL"),
             "auto.offset.reset": "earliest",
             "group.id": "ParserPipeline-" + str(consumer_schema_name),
+            # In batch, worker pool and async modes offsets are committed once records
+            # are handled.
+            "enable.auto.commit": app.config.get("PARSER_CONSUMER_BATCH_SIZE", 1) <= 1
+            and not app.parse_executor
+            and worker_mode != "async",
         },
         reader_value_schema=schema,
     )
@@ -51,13 +87,78 @@ def init_pipeline(proj_home, consumer_topic_name=None, consumer_schema_name=None
         }
     )
     app.logger.info("Starting PARSER APP on TOPIC: {}".format(consumer_topic_name))
-    app.parser_consumer(consumer, producer)
+    if worker_mode == "async":
+        asyncio.run(async_worker.AsyncParserWorker(app, consumer, producer).run())
+    else:
+        app.parser_consumer(consumer, producer)
+
+
+def init_backfill(proj_home, path, task="ARXIV", produce=False):
+    """
+    input:
+    proj_home: The home directory for the Pipeline
+    path: A file listing a record id and the S3 path of its raw metadata on each line
+    task: The source of the records
+    produce: Whether the parsed records are also sent to the Pipeline output topic
+
+    Bulk loads every record listed in path into postgres, BULK_LOAD_BATCH_SIZE at a time.
+    """
+    app = PARSER_APP(proj_home)
+    producer = None
+    if produce:
+        app.schema_client = SchemaRegistryClient({"url": app.config.get("SCHEMA_REGISTRY_URL")})
+        app.schema_cache.warm([app.config.get("PARSER_OUTPUT_SCHEMA")])
+        producer = AvroProducer(
+            {
+                "bootstrap.servers": app.config.get("KAFKA_BROKER"),
+                "schema.registry.url": app.config.get("SCHEMA_REGISTRY_URL"),
+            }
+        )
+    counts = bulk_load.backfill(
+        app,
+        bulk_load.read_backfill_file(path, task, app.logger),
+        app.config.get("BULK_LOAD_BATCH_SIZE", 1000),
+        producer,
+    )
+    if producer:
+        producer.flush()
+    app.logger.info("Backfill finished: {}".format(json.dumps(counts)))
+    return counts
+
+
+class PollBackoff:
+    """
+    Exponential backoff for the timeout of a blocking consumer poll.
+    The timeout doubles after every empty poll, up to max_wait, and resets to min_wait
+    as soon as a message is received. A blocking poll returns as soon as a message
+    arrives, so a longer timeout only reduces idle polling and never delays a message.
+    """
+
+    def __init__(self, min_wait, max_wait):
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.timeout = min_wait
+
+    def idle(self):
+        self.timeout = min(self.timeout * 2, self.max_wait)
+
+    def reset(self):
+        self.timeout = self.min_wait
 
 
 class PARSER_APP:
     @contextmanager
     def session_scope(self):
-        """Provide a transactional scope for postgres."""
+        """
+        Provide a transactional scope for postgres.
+        Inside a db.unit_of_work, the session of the unit of work is used instead and is
+        committed when the unit of work ends.
+        """
+        session = db.current_session()
+        if session is not None:
+            yield session
+            return
+
         session = self.Session()
         try:
             yield session
@@ -68,9 +169,66 @@ class PARSER_APP:
         finally:
             session.close()
 
-    def _consume_from_topic(self, consumer):
+    def _consume_from_topic(self, consumer, timeout=None):
         self.logger.debug("Consuming from Parser Topic")
-        return consumer.poll()
+        return consumer.poll(timeout)
+
+    def _consume_batch_from_topic(self, consumer, timeout=None):
+        """
+        Collects up to PARSER_CONSUMER_BATCH_SIZE messages. Waits up to timeout for the
+        first message (PARSER_CONSUMER_BATCH_LINGER_MS if not given), then at most
+        PARSER_CONSUMER_BATCH_LINGER_MS for the rest of the batch to fill.
+        """
+        self.logger.debug("Consuming batch from Parser Topic")
+        batch_size = self.config.get("PARSER_CONSUMER_BATCH_SIZE", 1)
+        linger = self.config.get("PARSER_CONSUMER_BATCH_LINGER_MS", 500) / 1000.0
+        deadline = None
+        msgs = []
+        while len(msgs) < batch_size:
+            if deadline is None:
+                remaining = linger if timeout is None else timeout
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+            # AvroConsumer only decodes messages returned by poll(), so the batch is built
+            # from polls against the local prefetch queue rather than consume().
+            msg = consumer.poll(remaining)
+            if msg is None:
+                break
+            if deadline is None:
+                deadline = time.monotonic() + linger
+            if msg.error():
+                self.logger.error("Consumer error: {}".format(msg.error()))
+                continue
+            msgs.append(msg)
+        return msgs
+
+    def _poll_backoff(self):
+        return PollBackoff(
+            self.config.get("PARSER_CONSUMER_POLL_MIN_WAIT", 0.1),
+            self.config.get("PARSER_CONSUMER_POLL_MAX_WAIT", 5),
+        )
+
+    def _observe_time_to_process(self, msg):
+        """
+        Records the time between a message being written to its topic and the start of
+        its processing.
+        """
+        timestamp_type, timestamp = msg.timestamp()
+        if timestamp_type != TIMESTAMP_NOT_AVAILABLE:
+            latency = max(time.time() - timestamp / 1000.0, 0)
+            self.metrics.observe("time_to_first_process", latency)
+            self.logger.debug("Processing message {:.3f}s after it was produced".format(latency))
+
+    def _report_stats_if_due(self):
+        """Logs the app metrics if PARSER_STATS_INTERVAL seconds have passed since they last were."""
+        now = time.monotonic()
+        if now - self._last_stats < self.config.get("PARSER_STATS_INTERVAL", 60):
+            return False
+        self._last_stats = now
+        self.logger.info("Parser stats: {}".format(json.dumps(self.metrics.snapshot())))
+        return True
 
     def _init_logger(self):
         logging.basicConfig(level=logging.DEBUG)
@@ -89,7 +247,12 @@ class PARSER_APP:
         schema_client: The kafka schema registry client
         s3Clients: The S3 providers that the pipeline may interact with
         Session: The SQLAlchemy session
-        redis: The redis server configuration
+        redis: The redis client, which uses the shared connection pool of the process
+        status_publisher: Publishes job statuses to redis in the background
+        parse_executor: The optional process pool that records are parsed in
+        metrics: Process-local counters and timings for the pipeline
+        schema_cache: Process-local cache of schemas fetched from the schema registry
+        status_buffer: Write-behind buffer for intermediate job statuses
         """
         self.config = utils.load_config(proj_home)
         self.engine = create_engine(self.config.get("SQLALCHEMY_URL"))
@@ -98,36 +261,262 @@ class PARSER_APP:
         self._init_logger()
         self.s3Clients = load_s3_providers(self.config)
         self.Session = sessionmaker(self.engine)
-        self.redis = redis.StrictRedis(
-            self.config.get("REDIS_HOST", "localhost"),
-            self.config.get("REDIS_PORT", 6379),
-            decode_responses=True,
+        self.redis = status_publisher.get_redis(self.config)
+        self.parse_executor = None
+        self.metrics = metrics.Metrics()
+        self._last_stats = time.monotonic()
+        self.status_publisher = status_publisher.StatusPublisher(
+            self.redis,
+            self.logger,
+            self.metrics,
+            self.config.get("REDIS_PUBLISH_MAX_BATCH", 100),
+            self.config.get("STATUS_CACHE_TTL", 86400),
+            self.config.get("STATUS_CHANNEL_MODE", "single"),
+            self.config.get("STATUS_CHANNEL_SHARDS", 64),
+            self.config.get("STATUS_TRANSPORT", "pubsub"),
+            self.config.get("STATUS_STREAM_MAXLEN", 10000),
+        )
+        self.schema_cache = schema_cache.SchemaCache(
+            self, self.config.get("SCHEMA_CACHE_TTL", 300)
+        )
+        registry.set_concurrency(self.config.get("PARSER_SOURCE_CONCURRENCY", {}))
+        self.status_buffer = status_buffer.StatusBuffer(
+            self,
+            self.config.get("PARSER_STATUS_FLUSH_INTERVAL", 1.0),
+            self.config.get("PARSER_STATUS_FLUSH_SIZE", 500),
         )
 
     def parser_consumer(self, consumer, producer):
         """
-        Ingests a message from the Pipeline input topic and passes it to the consumer task
+        Ingests a message from the Pipeline input topic and passes it to the consumer task.
+        If PARSER_CONSUMER_BATCH_SIZE is greater than 1, messages are ingested in batches
+        and the consumer offsets are committed once per batch.
+        If a parse_executor has been configured, parser_pool_consumer is used instead.
         """
+        if self.parse_executor:
+            return self.parser_pool_consumer(consumer, producer)
+
+        batch_size = self.config.get("PARSER_CONSUMER_BATCH_SIZE", 1)
+        backoff = self._poll_backoff()
         while True:
-            msg = self._consume_from_topic(consumer)
-            if msg:
-                self.parser_task(msg, producer)
+            self._report_stats_if_due()
+            self.status_buffer.flush_if_due()
+            if batch_size > 1:
+                msgs = self._consume_batch_from_topic(consumer, backoff.timeout)
+                if msgs:
+                    backoff.reset()
+                    if self.config.get("PARSER_BULK_LOAD", False):
+                        self.parser_bulk_task(msgs, producer)
+                    else:
+                        self.parser_batch_task(msgs, producer)
+                    consumer.commit(asynchronous=False)
+                    continue
+            else:
+                msg = self._consume_from_topic(consumer, backoff.timeout)
+                if msg and msg.error():
+                    self.logger.error("Consumer error: {}".format(msg.error()))
+                    continue
+                if msg:
+                    backoff.reset()
+                    self.parser_task(msg, producer)
+                    continue
+            self.logger.debug("No new messages")
+            backoff.idle()
+
+    def parser_batch_task(self, msgs, producer):
+        """
+        input:
+        msgs: A batch of consumed msgs from the Pipeline input topic
+        producer: The relevant Pipeline output producer
+
+        Passes every message in the batch to the consumer task. A failed message is logged
+        and does not stop the rest of the batch. The db writes for the whole batch are
+        committed in a single transaction, and the producer is flushed once for the whole
+        batch so that all output is delivered before the batch offsets are committed.
+        """
+        with db.unit_of_work(self):
+            for msg in msgs:
+                try:
+                    self.parser_task(msg, producer)
+                except Exception:
+                    self.logger.exception("Failed to process message {}".format(msg.value()))
+        producer.flush()
+
+    def parser_bulk_task(self, msgs, producer):
+        """
+        input:
+        msgs: A batch of consumed msgs from the Pipeline input topic
+        producer: The relevant Pipeline output producer
+
+        Loads the raw records from known sources in the batch with bulk_load, so that the
+        batch is written with one COPY per table. The rest of the batch (e.g. REPARSE
+        requests) is passed to parser_batch_task, as is the whole batch if the bulk load
+        fails.
+        """
+        job_requests = []
+        remaining = []
+        for msg in msgs:
+            job_request = msg.value()
+            if job_request.get("task") in registry and job_request.get("record_xml") is not None:
+                self._observe_time_to_process(msg)
+                job_requests.append(job_request)
             else:
-                self.logger.debug("No new messages")
-                time.sleep(2)
+                remaining.append(msg)
+
+        try:
+            statuses = bulk_load.load_records(self, job_requests, producer)
+        except Exception:
+            self.logger.exception("Failed to bulk load batch. Processing it one at a time.")
+            remaining = msgs
+        else:
+            for record_id, status in statuses.items():
+                db.write_status_redis(
+                    self.status_publisher, json.dumps({"job_id": record_id, "status": status})
+                )
+        self.parser_batch_task(remaining, producer)
+
+    def parser_pool_consumer(self, consumer, producer):
+        """
+        Ingests messages from the Pipeline input topic and parses them in parse_executor.
+        The consumer keeps polling while the workers parse, and parsed records are handed
+        to the consumer task in the order they were consumed within each partition.
+        The offset of each message is committed once it has been handled and its output
+        delivered.
+        """
+        max_in_flight = self.config.get("PARSER_PARSE_MAX_IN_FLIGHT", 16)
+        backoff = self._poll_backoff()
+        in_flight = {}
+        while True:
+            self._report_stats_if_due()
+            self.status_buffer.flush_if_due()
+            pending = sum(len(queue) for queue in in_flight.values())
+            if pending >= max_in_flight:
+                self._drain_parsed(consumer, producer, in_flight, block=True)
                 continue
 
-    def parser_task(self, msg, producer):
+            # Only wait briefly for new messages while there is parsed work to hand off.
+            msg = self._consume_from_topic(consumer, 0.05 if pending else backoff.timeout)
+            if msg is None:
+                if not pending:
+                    self.logger.debug("No new messages")
+                    backoff.idle()
+            elif msg.error():
+                self.logger.error("Consumer error: {}".format(msg.error()))
+            else:
+                backoff.reset()
+                self._submit_parse(msg, in_flight)
+            self._drain_parsed(consumer, producer, in_flight)
+
+    def _submit_parse(self, msg, in_flight):
+        """
+        Queues msg behind the other in flight messages from its partition and, if it carries
+        raw metadata for a known source that has changed, submits it to parse_executor.
+        REPARSE requests collect their metadata from S3 and are run in the consumer process.
+        Whether the metadata has changed is passed on to the consumer task, unless an earlier
+        message for the same record is still in flight and may change the stored hash.
+        """
+        job_request = msg.value()
+        task = job_request.get("task")
+        queue = in_flight.setdefault((msg.topic(), msg.partition()), deque())
+        future = None
+        unchanged = None
+        if task in registry and job_request.get("record_xml") is not None:
+            unchanged = parsing_handler.input_hash_unchanged(self, job_request)
+            record_id = job_request.get("record_id")
+            if any(queued.value().get("record_id") == record_id for queued, _, _ in queue):
+                unchanged = None
+        if unchanged is False:
+            # The slot for the source is held until the worker has finished with the record.
+            registry.acquire(task)
+            try:
+                future = self.parse_executor.submit(
+                    parsing_handler.parse_metadata, task, job_request.get("record_xml")
+                )
+            except Exception:
+                registry.release(task)
+                self.logger.exception(
+                    "Failed to submit {} to the parse workers. Parsing it in-process.".format(
+                        job_request.get("record_id")
+                    )
+                )
+            else:
+                future.add_done_callback(lambda _: registry.release(task))
+        queue.append((msg, future, unchanged))
+
+    def _drain_parsed(self, consumer, producer, in_flight, block=False):
+        """
+        Hands every ready message at the head of its partition queue to the consumer task.
+        If block is True, waits until at least one of the queue heads is ready.
+        The producer is flushed once for the handled messages, so that their output is
+        delivered before their offsets are committed. The offset of a message whose task
+        failed is not committed.
+        """
+        if block:
+            heads = [queue[0][1] for queue in in_flight.values() if queue]
+            if None not in heads:
+                futures.wait(heads, return_when=futures.FIRST_COMPLETED)
+        handled = {}
+        for partition, queue in in_flight.items():
+            while queue and (queue[0][1] is None or queue[0][1].done()):
+                msg, future, unchanged = queue.popleft()
+                if self._finish_parsed(producer, msg, future, unchanged):
+                    handled[partition] = msg
+        if handled:
+            producer.flush()
+            for msg in handled.values():
+                consumer.commit(message=msg, asynchronous=True)
+
+    def _finish_parsed(self, producer, msg, future=None, unchanged=None):
+        """
+        Passes msg, the result of its parse future and whether its metadata is unchanged to
+        the consumer task and returns whether the task succeeded. If the worker failed, the record is parsed again
+        in-process so that the error is handled the same way as without a worker pool.
+        """
+        parsed_record = None
+        if future is not None:
+            try:
+                parsed_record = future.result()
+            except Exception:
+                self.logger.exception(
+                    "Parse worker failed for {}".format(msg.value().get("record_id"))
+                )
+        try:
+            self.parser_task(msg, producer, parsed_record=parsed_record, unchanged=unchanged)
+        except Exception:
+            self.logger.exception("Failed to process message {}".format(msg.value()))
+            return False
+        return True
+
+    def parser_task(self, msg, producer, parsed_record=None, unchanged=None):
         """
         input:
         msg: The consumed msg from the Pipeline input topic
         producer: The relevant Pipeline output producer
+        parsed_record: The record parsed from msg, if it has already been parsed elsewhere
+        unchanged: Whether the raw metadata of msg is unchanged, if it has already been
+                   checked
 
         The main consumer task for the Pipeline
         This task will take any consumed messages and pass them to the relevant subprocesses
         as well as updating postgres and redis.
+        All of the postgres writes for msg are made in one transaction. If the task fails,
+        they are rolled back and only the Error status of the job is kept, which is also
+        published to redis so that the status cache and monitors see the failure.
         """
+        try:
+            with db.unit_of_work(self):
+                self._parser_task(msg, producer, parsed_record=parsed_record, unchanged=unchanged)
+        except Exception:
+            db.write_status_redis(
+                self.status_publisher,
+                json.dumps({"job_id": str(msg.value().get("record_id")), "status": "Error"}),
+            )
+            db.write_job_error(self, msg.value())
+            raise
+
+    def _parser_task(self, msg, producer, parsed_record=None, unchanged=None):
         self.logger.debug("Received message {}".format(msg.value()))
+        self._observe_time_to_process(msg)
 
         job_request = msg.value()
         metadata_uuid = job_request.get("record_id")
@@ -135,7 +524,7 @@ class PARSER_APP:
 
         job_request["status"] = "Processing"
         db.write_status_redis(
-            self.redis,
+            self.status_publisher,
             json.dumps({"job_id": str(metadata_uuid), "status": job_request["status"]}),
         )
 
@@ -146,10 +535,10 @@ class PARSER_APP:
         else:
             db.write_job_status(self, job_request)
             job_request["status"] = parsing_handler.parse_task_selector(
-                self, job_request, producer
+                self, job_request, producer, parsed_record=parsed_record, unchanged=unchanged
             )
 
         db.write_status_redis(
-            self.redis,
+            self.status_publisher,
             json.dumps({"job_id": str(job_request["record_id"]), "status": job_request["status"]}),
         )
@@ -1,16 +1,28 @@
+import hashlib
 import json
 from datetime import datetime
 
-from SciXPipelineUtils import utils
-
 from SciXParser.parser import db
-from SciXParser.parser.metadata_parsers import parse_arxiv
+from SciXParser.parser.registry import registry
 
 
 def reparse_handler(app, job_request, producer):
     """
     Collects S3 information and prepares a compatible request for the task_selector
     """
+    new_job_request, status = prepare_reparse(app, job_request, producer)
+    if new_job_request is None:
+        return status
+
+    return parse_task_selector(app, new_job_request, producer, reparse=True)
+
+
+def prepare_reparse(app, job_request, producer):
+    """
+    Collects the stored record and raw S3 metadata for a REPARSE request.
+    Returns the job request to be parsed and None, or None and the final status
+    if the request was fully handled here (e.g. resend only).
+    """
 
     metadata_uuid = job_request.get("record_id")
     with app.session_scope() as session:
@@ -33,9 +45,7 @@ def reparse_handler(app, job_request, producer):
 
     # If resend, only resend the data from the DB, do not initiate a parsing task.
     if job_request.get("resend") and producer_message.get("parsed_record"):
-        parser_output_schema = utils.get_schema(
-            app, app.schema_client, app.config.get("PARSER_OUTPUT_SCHEMA")
-        )
+        parser_output_schema = app.schema_cache.get(app.config.get("PARSER_OUTPUT_SCHEMA"))
 
         try:
             producer.produce(
@@ -55,7 +65,7 @@ def reparse_handler(app, job_request, producer):
 
         db.update_job_status(app, job_request["record_id"], status)
 
-        return status
+        return None, status
 
     elif job_request.get("resend"):
         app.logger.error(
@@ -67,7 +77,7 @@ def reparse_handler(app, job_request, producer):
 
         db.update_job_status(app, job_request["record_id"], status)
 
-        return status
+        return None, status
 
     date = datetime.now()
 
@@ -83,21 +93,233 @@ def reparse_handler(app, job_request, producer):
         "force": job_request.get("force"),
     }
 
-    return parse_task_selector(app, new_job_request, producer, reparse=True)
+    return new_job_request, None
+
+
+def parse_metadata(task, metadata):
+    """
+    Parses raw metadata for the given task without touching postgres, kafka or redis
+    so that it can be handed to a separate worker process.
+    """
+    return registry.parse(task, metadata)
+
+
+def compute_input_hash(task, metadata):
+    """
+    Returns a hash of the raw metadata and the version of the parser for task.
+    """
+    if isinstance(metadata, str):
+        metadata = metadata.encode("utf-8")
+    input_hash = hashlib.sha256("{}:{}:".format(task, registry.version(task)).encode("utf-8"))
+    input_hash.update(metadata)
+    return input_hash.hexdigest()
+
+
+def compute_fingerprint(parsed_record):
+    """
+    Returns a stable hash of parsed_record that ignores key order and volatile fields
+    such as recordData.parsedTime.
+    """
+    record_data = {
+        key: value
+        for key, value in parsed_record.get("recordData", {}).items()
+        if key != "parsedTime"
+    }
+    canonical_record = dict(parsed_record, recordData=record_data)
+    canonical_json = json.dumps(
+        canonical_record, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical_json.encode("utf-8")).hexdigest()
 
 
-def parse_task_selector(app, job_request, producer, reparse=False):
+def input_hash_unchanged(app, job_request):
     """
-    Identifies the correct task and calls the appropriate parser
+    Stores the hash of the raw metadata in job_request["input_hash"] and returns whether
+    it matches the hash stored with the existing parsed record, unless force is set.
+    """
+    if job_request.get("task") not in registry or job_request.get("record_xml") is None:
+        return False
+
+    job_request["input_hash"] = compute_input_hash(
+        job_request.get("task"), job_request.get("record_xml")
+    )
+    if job_request.get("force"):
+        return False
+
+    with app.session_scope() as session:
+        stored_hash = db.get_parser_record_input_hash(session, job_request.get("record_id"))
+    return stored_hash == job_request["input_hash"]
+
+
+def input_unchanged(app, job_request, unchanged=None):
+    """
+    Returns whether the raw metadata of job_request is unchanged, as input_hash_unchanged,
+    and counts the record as skipped if it is.
+    unchanged: The result of input_hash_unchanged for job_request, if it has already been
+               checked
+    """
+    if unchanged is None:
+        unchanged = input_hash_unchanged(app, job_request)
+    if not unchanged:
+        return False
+
+    record_id = job_request.get("record_id")
+    app.logger.info("Raw metadata for {} is unchanged. Skipping parse.".format(record_id))
+    app.metrics.incr("records_skipped")
+    return True
+
+
+def parse_task_selector(
+    app, job_request, producer, reparse=False, parsed_record=None, unchanged=None
+):
+    """
+    Identifies the correct task and calls the appropriate parser.
+    parsed_record may be supplied if the metadata has already been parsed elsewhere, and
+    unchanged if the hash of the metadata has already been checked.
     """
     task = job_request.get("task")
-    if task == "ARXIV":
-        parse_arxiv.parse_store_arxiv_record(app, job_request, producer, reparse=reparse)
+    if task in registry:
+        status = parse_store_record(
+            app,
+            job_request,
+            producer,
+            reparse=reparse,
+            parsed_record=parsed_record,
+            unchanged=unchanged,
+        )
 
     else:
         app.logger.error("{} is not a valid data source. Stopping.".format(task))
         status = "Error"
         db.write_status_redis(
-            app.redis, json.dumps({"job_id": str(job_request.get("record_id")), "status": status})
+            app.status_publisher,
+            json.dumps({"job_id": str(job_request.get("record_id")), "status": status}),
         )
         db.update_job_status(app, job_request["record_id"], status)
+
+    return status
+
+
+def parse_store_record(
+    app, job_request, producer, reparse=False, parsed_record=None, unchanged=None
+):
+    """
+    Parses the raw metadata in job_request, stores the parsed record in postgres
+    and sends it to the Pipeline output topic.
+    """
+    if input_unchanged(app, job_request, unchanged):
+        record_status, status = False, "Unchanged"
+    else:
+        if parsed_record is None:
+            with registry.slot(job_request.get("task")):
+                parsed_record = parse_metadata(
+                    job_request.get("task"), job_request.get("record_xml")
+                )
+        app.logger.debug("Parsed record is: {}".format(parsed_record))
+
+        record_status, status = store_parsed_record(
+            app, job_request, parsed_record, reparse=reparse
+        )
+    if record_status:
+        status = produce_parsed_record(app, job_request, producer, parsed_record)
+
+    db.write_status_redis(
+        app.status_publisher,
+        json.dumps({"job_id": str(job_request["record_id"]), "status": status}),
+    )
+    db.update_job_status(app, job_request["record_id"], status)
+
+    return status
+
+
+def store_parsed_record(app, job_request, parsed_record, reparse=False):
+    """
+    Writes parsed_record to postgres.
+    Returns whether the record was written and, if it was not, the resulting status.
+    """
+    record_id = job_request.get("record_id")
+    s3_key = job_request.get("s3_path")
+    task = job_request.get("task")
+    force = job_request.get("force", False)
+    input_hash = job_request.get("input_hash")
+    fingerprint = compute_fingerprint(parsed_record)
+    date = datetime.now()
+
+    if reparse:
+        app.logger.debug("{}".format(parsed_record))
+        with app.session_scope() as session:
+            old_fingerprint = db.get_parser_record_fingerprint(session, record_id)
+            if old_fingerprint is None:
+                # Records written before fingerprints were stored
+                old_record = db.get_parser_record(session, record_id).parsed_data
+                if old_record:
+                    old_fingerprint = compute_fingerprint(old_record)
+
+        if old_fingerprint == fingerprint and force is not True:
+            # Keep the hashes up to date, e.g. for records written before they were stored,
+            # so that the record is not parsed again while its input stays the same.
+            with app.session_scope() as session:
+                db.update_parser_record_hashes(session, record_id, input_hash, fingerprint)
+            return False, "Unchanged"
+
+        with app.session_scope() as session:
+            record_status = db.update_parser_record_metadata(
+                session,
+                record_id,
+                date,
+                parsed_record,
+                app.logger,
+                input_hash=input_hash,
+                parsed_fingerprint=fingerprint,
+            )
+    else:
+        record_status = db.write_parser_record(
+            app,
+            record_id,
+            date,
+            s3_key,
+            parsed_record,
+            task,
+            input_hash=input_hash,
+            parsed_fingerprint=fingerprint,
+        )
+
+    return record_status, None if record_status else "Error"
+
+
+def produce_parsed_record(app, job_request, producer, parsed_record, on_delivery=None):
+    """
+    Sends parsed_record to the Pipeline output topic, calling on_delivery, if given, with
+    the delivery report of the message when the producer is polled or flushed.
+    """
+    record_id = job_request.get("record_id")
+    parser_output_schema = app.schema_cache.get(app.config.get("PARSER_OUTPUT_SCHEMA"))
+    producer_message = {}
+    producer_message["parsed_record"] = parsed_record
+    producer_message["record_id"] = str(record_id)
+    callbacks = {"on_delivery": on_delivery} if on_delivery else {}
+
+    try:
+        producer.produce(
+            topic=app.config.get("PARSER_OUTPUT_TOPIC"),
+            value=producer_message,
+            value_schema=parser_output_schema,
+            **callbacks,
+        )
+        status = "Success"
+
+    except ValueError as e:
+        app.logger.exception(
+            "Failed to produce {} to Kafka topic: {}".format(
+                record_id, app.config.get("PARSER_OUTPUT_TOPIC")
+            )
+        )
+        status = "Error"
+        db.write_status_redis(
+            app.status_publisher,
+            json.dumps({"job_id": str(job_request["record_id"]), "status": status}),
+        )
+        db.update_job_status(app, job_request["record_id"], status)
+        raise e
+
+    return status
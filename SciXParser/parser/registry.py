@@ -0,0 +1,112 @@
+import importlib
+import threading
+from contextlib import contextmanager
+from importlib import metadata as importlib_metadata
+
+
+class ParserRegistry:
+    """
+    Maps each source task to a factory for its parser.
+
+    Factories given as "module:attribute" strings are only imported when the source is
+    first parsed, so heavy parser modules do not slow down startup. Reusable parser
+    instances are kept per worker thread (and so per worker process), and each source
+    may be given its own limit on concurrent parses so one slow source cannot take up
+    every worker.
+    """
+
+    def __init__(self):
+        self.parsers = {}
+        self._limits = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def __contains__(self, task):
+        return task in self.parsers
+
+    def register(self, task, factory, reusable=True, package="adsingestp"):
+        """
+        input:
+        task: The source task, e.g. ARXIV
+        factory: A callable returning a parser, or a "module:attribute" string naming one
+        reusable: Whether one parser instance may be used for more than one record
+        package: The distribution whose version identifies the parser version
+        """
+        self.parsers[task] = {
+            "factory": factory,
+            "reusable": reusable,
+            "package": package,
+            "version": None,
+        }
+
+    def set_concurrency(self, limits):
+        """
+        Limits the number of records of each source that may be parsed at once.
+        limits: A dict of source task to limit. Sources without a limit are unrestricted.
+        """
+        self._limits = {
+            task: threading.BoundedSemaphore(limit) for task, limit in limits.items() if limit
+        }
+
+    def get_parser(self, task):
+        """
+        Returns a parser for task, importing its module on first use.
+        Raises KeyError if no parser is registered for task.
+        """
+        entry = self.parsers[task]
+        if not entry["reusable"]:
+            return self._get_factory(entry)()
+        instances = self._local.__dict__.setdefault("instances", {})
+        if task not in instances:
+            instances[task] = self._get_factory(entry)()
+        return instances[task]
+
+    def version(self, task):
+        """
+        Returns the version of the parser for task, read from its package metadata.
+        """
+        entry = self.parsers[task]
+        if entry["version"] is None:
+            try:
+                entry["version"] = importlib_metadata.version(entry["package"])
+            except importlib_metadata.PackageNotFoundError:
+                entry["version"] = "unknown"
+        return entry["version"]
+
+    def parse(self, task, metadata):
+        return self.get_parser(task).parse(metadata)
+
+    def acquire(self, task):
+        """Waits for a free parse slot for task."""
+        limit = self._limits.get(task)
+        if limit:
+            limit.acquire()
+
+    def release(self, task):
+        limit = self._limits.get(task)
+        if limit:
+            limit.release()
+
+    @contextmanager
+    def slot(self, task):
+        """Holds a parse slot for task for the duration of the with block."""
+        self.acquire(task)
+        try:
+            yield
+        finally:
+            self.release(task)
+
+    def _get_factory(self, entry):
+        with self._lock:
+            if isinstance(entry["factory"], str):
+                module_name, attribute = entry["factory"].split(":")
+                entry["factory"] = getattr(importlib.import_module(module_name), attribute)
+        return entry["factory"]
+
+
+registry = ParserRegistry()
+# DublinCoreParser keeps the state of the record it last parsed on the instance,
+# so a new instance is built for every record.
+registry.register(
+    "ARXIV", "SciXParser.parser.metadata_parsers.parse_arxiv:get_parser", reusable=False
+)
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from SciXPipelineUtils import utils
+
+
+class SchemaCache:
+    """
+    Process-local cache of schemas fetched from the kafka schema registry.
+    A cached schema is fetched again once it is older than ttl seconds. If the registry
+    cannot be reached at that point, the stale schema continues to be served.
+    """
+
+    def __init__(self, app, ttl=300):
+        """
+        input:
+        app: Any object with a logger and a schema_client, e.g. PARSER_APP
+        ttl: The number of seconds a schema is served before it is fetched again
+        """
+        self.app = app
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._schemas = {}
+
+    def get(self, schema_name):
+        """
+        Returns the schema for schema_name, fetching it from the registry if it is not
+        cached or has expired.
+        """
+        with self._lock:
+            entry = self._schemas.get(schema_name)
+            if entry and time.monotonic() - entry[1] < self.ttl:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        try:
+            schema = utils.get_schema(self.app, self.app.schema_client, schema_name)
+        except Exception:
+            if not entry:
+                raise
+            self.app.logger.warning(
+                "Failed to refresh schema {}. Using cached schema.".format(schema_name)
+            )
+            schema = entry[0]
+        self.put(schema_name, schema)
+        return schema
+
+    def put(self, schema_name, schema):
+        """Caches schema for schema_name."""
+        with self._lock:
+            self._schemas[schema_name] = (schema, time.monotonic())
+
+    def warm(self, schema_names):
+        """Fetches every schema in schema_names so that the first messages do not wait on it."""
+        for schema_name in schema_names:
+            self.get(schema_name)
+
+    def invalidate(self, schema_name=None):
+        """
+        Drops schema_name from the cache so that it is fetched again on its next use.
+        Drops every cached schema if schema_name is not given.
+        """
+        with self._lock:
+            if schema_name:
+                self._schemas.pop(schema_name, None)
+            else:
+                self._schemas.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self._schemas)}
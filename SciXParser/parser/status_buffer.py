@@ -0,0 +1,95 @@
+import threading
+import time
+from datetime import datetime
+
+from SciXParser.parser import db
+
+TERMINAL_STATUSES = ("Success", "Error", "Unchanged")
+
+
+class StatusBuffer:
+    """
+    Write-behind buffer for job status transitions.
+    Intermediate statuses (e.g. Pending, Processing) are held per record_id, so that a
+    record moving through several of them is only written once, and are written to
+    postgres in bulk every interval seconds or once max_size records are waiting.
+    Terminal statuses are never buffered: they replace any waiting status for the record
+    and are written immediately by the caller.
+    Statuses added inside a db.unit_of_work are not written until the caller flushes the
+    buffer after it, as the unit of work may hold locks on the rows being written.
+    """
+
+    def __init__(self, app, interval=1.0, max_size=500):
+        """
+        input:
+        app: Any object with a Session, e.g. PARSER_APP
+        interval: The maximum number of seconds a status waits before it is written
+        max_size: The number of waiting records that triggers a write
+        """
+        self.app = app
+        self.interval = interval
+        self.max_size = max_size
+        self.flushes = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, record_id, status):
+        """
+        Buffers status for record_id and returns True if it is an intermediate status.
+        Returns False for a terminal status, which the caller must write itself.
+        """
+        with self._lock:
+            if status in TERMINAL_STATUSES:
+                self._pending.pop(str(record_id), None)
+                return False
+            self._pending[str(record_id)] = (status, datetime.now())
+        if db.current_session() is None:
+            self.flush_if_due()
+        return True
+
+    def due(self):
+        """
+        Returns whether max_size records are waiting or the oldest of them may have waited
+        interval seconds.
+        """
+        return (
+            len(self._pending) >= self.max_size
+            or time.monotonic() - self._last_flush >= self.interval
+        )
+
+    def flush_if_due(self):
+        """Writes the waiting statuses if they are due."""
+        if self.due():
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every waiting status to postgres and returns the number of records written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        # A terminal status written after the oldest of these statuses was buffered is
+        # newer than it, and is not overwritten.
+        since = min(added for _, added in pending.values())
+        statuses = {record_id: status for record_id, (status, _) in pending.items()}
+        # The statuses belong to many records, so they are written on their own session
+        # rather than in a unit of work that a failure of one record would roll back.
+        session = self.app.Session()
+        try:
+            db.update_job_statuses(session, statuses, since=since, keep=TERMINAL_STATUSES)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        self.flushes += 1
+        return len(statuses)
@@ -0,0 +1,180 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+import redis
+
+_connection_pools = {}
+_connection_pools_lock = threading.Lock()
+
+
+def get_connection_pool(config):
+    """
+    Returns the redis ConnectionPool of this process for the REDIS_HOST and REDIS_PORT
+    in config, creating it on first use.
+    """
+    key = (config.get("REDIS_HOST", "localhost"), config.get("REDIS_PORT", 6379), os.getpid())
+    with _connection_pools_lock:
+        if key not in _connection_pools:
+            _connection_pools[key] = redis.ConnectionPool(
+                host=key[0],
+                port=key[1],
+                max_connections=config.get("REDIS_MAX_CONNECTIONS", 50),
+                decode_responses=True,
+            )
+        return _connection_pools[key]
+
+
+def get_redis(config):
+    """Returns a redis client that uses the shared connection pool of this process."""
+    return redis.StrictRedis(connection_pool=get_connection_pool(config))
+
+
+class _QueuedPipeline:
+    """
+    Collects the commands for one status update, which are queued together on execute.
+    """
+
+    def __init__(self, publisher):
+        self.publisher = publisher
+        self.commands = []
+
+    def publish(self, channel, message):
+        self.commands.append(("publish", (channel, message), {}))
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.commands.append(
+            ("xadd", (name, fields), {"maxlen": maxlen, "approximate": approximate})
+        )
+
+    def run_script(self, script, keys, args):
+        self.commands.append(("run_script", (script, keys, args), {}))
+
+    def hset(self, name, mapping):
+        self.commands.append(("hset", (name,), {"mapping": mapping}))
+
+    def expire(self, name, ttl):
+        self.commands.append(("expire", (name, ttl), {}))
+
+    def execute(self):
+        self.publisher._put(self.commands)
+
+
+class StatusPublisher:
+    """
+    Publishes job statuses to redis from a background thread, so that publishing never
+    waits on a redis round trip. Statuses that queue up while a publish is in flight are
+    sent together through a single pipeline, in the order they were published.
+    Has the same publish and pipeline methods as a redis client, so it can be passed to
+    db.write_status_redis in place of one.
+    """
+
+    def __init__(
+        self,
+        redis_instance,
+        logger=None,
+        metrics=None,
+        max_batch=100,
+        status_ttl=86400,
+        channel_mode="single",
+        channel_shards=64,
+        transport="pubsub",
+        stream_maxlen=10000,
+    ):
+        """
+        input:
+        redis_instance: The redis client to publish with
+        logger: The logger to report failed publishes to
+        metrics: Optional Metrics to record publish latency and failures in
+        max_batch: The maximum number of statuses sent through one pipeline
+        status_ttl: The number of seconds the latest status of a job is kept in redis
+        channel_mode: single, sharded or job; see db.status_channel
+        channel_shards: The number of status channels in sharded mode
+        transport: pubsub to publish statuses or stream to add them to redis streams
+        stream_maxlen: The approximate number of entries kept in each status stream
+        """
+        self.redis = redis_instance
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.status_ttl = status_ttl
+        self.channel_mode = channel_mode
+        self.channel_shards = channel_shards
+        self.transport = transport
+        self.stream_maxlen = stream_maxlen
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._scripts = {}
+
+    def publish(self, channel, message):
+        """Queues message to be published on channel."""
+        self._put([("publish", (channel, message), {})])
+
+    def pipeline(self, transaction=False):
+        """Returns a pipeline whose commands are queued together when it is executed."""
+        return _QueuedPipeline(self)
+
+    def register_script(self, script):
+        """
+        Returns the redis Script for script, registered on the redis client the first time
+        it is used, so that it is sent with EVALSHA.
+        """
+        with self._lock:
+            if script not in self._scripts:
+                self._scripts[script] = self.redis.register_script(script)
+            return self._scripts[script]
+
+    def _put(self, commands):
+        self._start()
+        self._queue.put(commands)
+
+    def flush(self):
+        """Waits until every queued status has been sent."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._send(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _send(self, batch):
+        start = time.monotonic()
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for commands in batch:
+                for method, args, kwargs in commands:
+                    if method == "run_script":
+                        script, keys, script_args = args
+                        script(keys=keys, args=script_args, client=pipeline)
+                    else:
+                        getattr(pipeline, method)(*args, **kwargs)
+            pipeline.execute()
+        except Exception:
+            self.logger.exception("Failed to publish {} statuses to redis".format(len(batch)))
+            self._record("incr", "redis.publish_failures", len(batch))
+            return
+        self._record("observe", "redis.publish", time.monotonic() - start)
+        self._record("incr", "redis.published", len(batch))
+
+    def _record(self, method, name, value):
+        if self.metrics is not None:
+            getattr(self.metrics, method)(name, value)
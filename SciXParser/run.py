@@ -12,7 +12,49 @@ if __name__ == "__main__":
     Parser = argparse.ArgumentParser()
     subparsers = Parser.add_subparsers(help="commands", dest="action")
     subparsers.add_parser("PARSER_API", help="Initialize Parser gRPC API")
-    subparsers.add_parser("PARSER_APP", help="Initialize Parser Working Unit")
+    app_parser = subparsers.add_parser("PARSER_APP", help="Initialize Parser Working Unit")
+    app_parser.add_argument(
+        "--parse-workers",
+        action="store",
+        dest="parse_workers",
+        type=int,
+        default=None,
+        help="Number of worker processes used to parse records. 0 parses records in the consumer process. Defaults to PARSER_PARSE_WORKERS.",
+    )
+    app_parser.add_argument(
+        "--mode",
+        action="store",
+        dest="worker_mode",
+        choices=["sync", "async"],
+        default=None,
+        help="Run the consumer loop (sync) or the staged asyncio worker (async). Defaults to PARSER_WORKER_MODE.",
+    )
+    backfill_parser = subparsers.add_parser(
+        "BACKFILL", help="Bulk load records into postgres without going through Kafka"
+    )
+    backfill_parser.add_argument(
+        "--file",
+        action="store",
+        dest="path",
+        type=str,
+        required=True,
+        help="File listing a record id and the S3 path of its raw metadata on each line.",
+    )
+    backfill_parser.add_argument(
+        "--task",
+        action="store",
+        dest="task",
+        type=str,
+        default="ARXIV",
+        help="The source of the records.",
+    )
+    backfill_parser.add_argument(
+        "--produce",
+        action="store_true",
+        dest="produce",
+        default=False,
+        help="Also send the parsed records to the Pipeline output topic.",
+    )
     args = Parser.parse_args()
     if args.action == "PARSER_APP":
         path = os.path.dirname(__file__)
@@ -23,11 +65,24 @@ if __name__ == "__main__":
         consumer_topic_name = config.get("HARVESTER_OUTPUT_TOPIC")
         consumer_schema_name = config.get("HARVESTER_OUTPUT_SCHEMA")
 
-        Process(target=parser.init_pipeline, args=(proj_home, None, None)).start()
         Process(
             target=parser.init_pipeline,
-            args=(proj_home, consumer_topic_name, consumer_schema_name),
+            args=(proj_home, None, None, args.parse_workers, args.worker_mode),
         ).start()
+        Process(
+            target=parser.init_pipeline,
+            args=(
+                proj_home,
+                consumer_topic_name,
+                consumer_schema_name,
+                args.parse_workers,
+                args.worker_mode,
+            ),
+        ).start()
+
+    elif args.action == "BACKFILL":
+        proj_home = os.path.dirname(__file__)
+        parser.init_backfill(proj_home, args.path, args.task, args.produce)
 
     elif args.action == "PARSER_API":
         asyncio.run(parser_server.serve())
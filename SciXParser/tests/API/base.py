@@ -12,10 +12,11 @@ class mock_gRPC_avro_msg:
             "persistence": None,
             "force": None,
             "resend": None,
+            "batch_id": None,
         }
 
     def bitstream(self):
-        return b"\x00H206f479f-bb1e-49ff-96df-491d66769abc\x00\x00\x00\x00\x00"
+        return b"\x00H206f479f-bb1e-49ff-96df-491d66769abc\x00\x00\x00\x00\x00\x00"
 
 
 class mock_reparse_db_entry(object):
@@ -1,3 +1,6 @@
+import asyncio
+import io
+import json
 import logging
 from unittest import TestCase
 
@@ -5,7 +8,19 @@ import pytest
 from confluent_kafka.schema_registry import Schema
 from SciXPipelineUtils.utils import get_schema
 
-from API.parser_client import Logging, input_parser, output_message
+from API.parser_client import (
+    Logging,
+    bulk_requests,
+    init_query,
+    init_query_request,
+    input_parser,
+    monitor_bulk,
+    monitor_bulk_requests,
+    output_message,
+    view_bulk,
+    view_bulk_requests,
+    write_jsonl,
+)
 from tests.common.mockschemaregistryclient import MockSchemaRegistryClient
 
 
@@ -35,6 +50,10 @@ class TestParserClient(TestCase):
 
         s = output_message(args)
         self.assertEqual(s["task"], "MONITOR")
+        self.assertIsNone(s["last_id"])
+
+        args = input_parser(input_args + ["--persistence", "--last-id", "1700000000000-0"])
+        self.assertEqual(output_message(args)["last_id"], "1700000000000-0")
 
         input_args = [
             "REPARSE",
@@ -104,6 +123,117 @@ class TestParserClient(TestCase):
         self.assertEqual(s["task"], "REPARSE")
         self.assertEqual(s["record_id"], uuids)
 
+    def test_input_parser_bulk_file(self):
+        input_args = [
+            "REPARSE",
+            "--uuid-file",
+            "SciXParser/tests/stubdata/test_uuid_file.txt",
+            "--chunk-size",
+            "4",
+            "--force",
+        ]
+
+        with open("SciXParser/tests/stubdata/test_uuid_file.txt", "r") as f:
+            uuids = f.read().split()
+
+        args = input_parser(input_args)
+        requests = list(bulk_requests(args))
+        self.assertEqual([len(request["record_ids"]) for request in requests], [4, 4, 2])
+        self.assertEqual(
+            [record_id for request in requests for record_id in request["record_ids"]], uuids
+        )
+        for request in requests:
+            self.assertEqual(request["force"], True)
+            self.assertEqual(request["resend"], False)
+
+    def test_input_parser_view_file(self):
+        input_args = [
+            "VIEW",
+            "--uuid-file",
+            "SciXParser/tests/stubdata/test_uuid_file.txt",
+            "--chunk-size",
+            "8",
+        ]
+
+        with open("SciXParser/tests/stubdata/test_uuid_file.txt", "r") as f:
+            uuids = f.read().split()
+
+        args = input_parser(input_args)
+        self.assertTrue(view_bulk(args))
+        requests = list(view_bulk_requests(args))
+        self.assertEqual([request["record_ids"] for request in requests], [uuids[:8], uuids[8:]])
+
+        args = input_parser(["VIEW", "--source", "ARXIV", "--modified-since", "2023-01-01"])
+        self.assertTrue(view_bulk(args))
+        self.assertEqual(
+            list(view_bulk_requests(args)),
+            [
+                {
+                    "record_ids": [],
+                    "source": "ARXIV",
+                    "modified_since": "2023-01-01",
+                    "modified_until": None,
+                }
+            ],
+        )
+        self.assertFalse(view_bulk(input_parser(["VIEW", "--uuid", uuids[0]])))
+
+    def test_write_jsonl(self):
+        async def responses():
+            for record_id in range(0, 3):
+                yield {"record_id": str(record_id), "parsed_record": {}}
+
+        output = io.StringIO()
+        self.assertEqual(asyncio.run(write_jsonl(responses(), output)), 3)
+        lines = output.getvalue().splitlines()
+        self.assertEqual([json.loads(line)["record_id"] for line in lines], ["0", "1", "2"])
+
+    def test_input_parser_monitor_file(self):
+        input_args = [
+            "MONITOR",
+            "--uuid-file",
+            "SciXParser/tests/stubdata/test_uuid_file.txt",
+        ]
+
+        with open("SciXParser/tests/stubdata/test_uuid_file.txt", "r") as f:
+            uuids = f.read()
+
+        args = input_parser(input_args)
+        s = output_message(args)
+        self.assertEqual(s["task"], "MONITOR")
+        self.assertEqual(s["record_id"], uuids)
+
+    def test_input_parser_monitor_bulk(self):
+        input_args = [
+            "MONITOR",
+            "--uuid-file",
+            "SciXParser/tests/stubdata/test_uuid_file.txt",
+            "--chunk-size",
+            "5",
+            "--events",
+            "--persistence",
+        ]
+
+        with open("SciXParser/tests/stubdata/test_uuid_file.txt", "r") as f:
+            uuids = f.read().split()
+
+        args = input_parser(input_args)
+        self.assertTrue(monitor_bulk(args))
+        requests = list(monitor_bulk_requests(args))
+        self.assertEqual([request["record_ids"] for request in requests], [uuids[:5], uuids[5:]])
+        for request in requests:
+            self.assertEqual(request["batch_id"], None)
+            self.assertEqual(request["events"], True)
+            self.assertEqual(request["persistence"], True)
+
+        args = input_parser(["MONITOR", "--batch-id", "1234"])
+        self.assertTrue(monitor_bulk(args))
+        self.assertEqual(
+            list(monitor_bulk_requests(args)),
+            [{"batch_id": "1234", "events": False, "persistence": False, "record_ids": []}],
+        )
+        self.assertFalse(monitor_bulk(input_parser(["MONITOR", "--uuid", uuids[0]])))
+
     def test_input_parser_no_uuid(self):
         input_args = [
             "REPARSE",
@@ -118,3 +248,21 @@ class TestParserClient(TestCase):
 
         with pytest.raises(AttributeError):
             output_message(args)
+
+    def test_input_parser_init_query(self):
+        args = input_parser(
+            ["REPARSE", "--source", "ARXIV", "--modified-until", "2023-01-01", "--force"]
+        )
+        self.assertTrue(init_query(args))
+        self.assertEqual(
+            init_query_request(args),
+            {
+                "source": "ARXIV",
+                "modified_since": None,
+                "modified_until": "2023-01-01",
+                "force": True,
+                "resend": False,
+            },
+        )
+        self.assertFalse(init_query(input_parser(["REPARSE", "--uuid", "1234"])))
+        self.assertFalse(init_query(input_parser(["VIEW", "--source", "ARXIV"])))
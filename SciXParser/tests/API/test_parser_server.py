@@ -1,8 +1,10 @@
+import asyncio
 import json
 import logging
+import time
 import uuid
-from concurrent import futures
-from unittest import TestCase
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase
 
 import grpc
 import pytest
@@ -13,7 +15,7 @@ from SciXPipelineUtils.avro_serializer import AvroSerialHelper
 
 from API.grpc_modules import parser_grpc
 from API.parser_client import get_schema
-from API.parser_server import Listener, Logging, initialize_parser
+from API.parser_server import Listener, Logging, config, initialize_parser
 from SciXParser.parser import db
 from tests.API import base
 from tests.common.mockschemaregistryclient import MockSchemaRegistryClient
@@ -24,10 +26,10 @@ class fake_db_entry(object):
         self.name = status
 
 
-class ParserServer(TestCase):
-    def setUp(self):
+class ParserServer(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
         """Instantiate a Parser server and return a stub for use in tests"""
-        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+        self.server = grpc.aio.server()
         self.logger = Logging(logging)
         self.schema_client = MockSchemaRegistryClient()
         self.VALUE_SCHEMA_FILE = "SciXParser/tests/stubdata/AVRO_schemas/ParserInputSchema.avsc"
@@ -80,14 +82,100 @@ class ParserServer(TestCase):
             self.server,
             self.avroserialhelper,
         )
+        self.bulk_input_schema = open(
+            "SciXParser/tests/stubdata/AVRO_schemas/ParserBulkInputSchema.avsc"
+        ).read()
+        self.bulk_output_schema = open(
+            "SciXParser/tests/stubdata/AVRO_schemas/ParserBulkOutputSchema.avsc"
+        ).read()
+        self.bulkavroserialhelper = AvroSerialHelper(
+            ser_schema=self.bulk_output_schema,
+            des_schema=self.bulk_input_schema,
+            logger=self.logger.logger,
+        )
+        self.bulkclientavroserialhelper = AvroSerialHelper(
+            ser_schema=self.bulk_input_schema,
+            des_schema=self.bulk_output_schema,
+            logger=self.logger.logger,
+        )
+        parser_grpc.add_ParserBulkServicer_to_server(
+            initialize_parser(parser_grpc.ParserBulkServicer)(
+                self.producer, self.ser_schema, self.schema_client, self.logger.logger
+            ),
+            self.server,
+            self.bulkavroserialhelper,
+        )
+        self.view_bulk_input_schema = open(
+            "SciXParser/tests/stubdata/AVRO_schemas/ParserViewBulkInputSchema.avsc"
+        ).read()
+        self.viewbulkavroserialhelper = AvroSerialHelper(
+            ser_schema=self.des_schema,
+            des_schema=self.view_bulk_input_schema,
+            logger=self.logger.logger,
+        )
+        self.viewbulkclientavroserialhelper = AvroSerialHelper(
+            ser_schema=self.view_bulk_input_schema,
+            des_schema=self.des_schema,
+            logger=self.logger.logger,
+        )
+        parser_grpc.add_ParserViewBulkServicer_to_server(
+            initialize_parser(parser_grpc.ParserViewBulkServicer)(
+                self.producer, self.ser_schema, self.schema_client, self.logger.logger
+            ),
+            self.server,
+            self.viewbulkavroserialhelper,
+        )
+        self.monitor_bulk_input_schema = open(
+            "SciXParser/tests/stubdata/AVRO_schemas/ParserMonitorBulkInputSchema.avsc"
+        ).read()
+        self.monitor_bulk_output_schema = open(
+            "SciXParser/tests/stubdata/AVRO_schemas/ParserMonitorBulkOutputSchema.avsc"
+        ).read()
+        self.monitorbulkavroserialhelper = AvroSerialHelper(
+            ser_schema=self.monitor_bulk_output_schema,
+            des_schema=self.monitor_bulk_input_schema,
+            logger=self.logger.logger,
+        )
+        self.monitorbulkclientavroserialhelper = AvroSerialHelper(
+            ser_schema=self.monitor_bulk_input_schema,
+            des_schema=self.monitor_bulk_output_schema,
+            logger=self.logger.logger,
+        )
+        parser_grpc.add_ParserMonitorBulkServicer_to_server(
+            initialize_parser(parser_grpc.ParserMonitorBulkServicer)(
+                self.producer, self.ser_schema, self.schema_client, self.logger.logger
+            ),
+            self.server,
+            self.monitorbulkavroserialhelper,
+        )
+        self.init_query_input_schema = open(
+            "SciXParser/tests/stubdata/AVRO_schemas/ParserInitQueryInputSchema.avsc"
+        ).read()
+        self.initqueryavroserialhelper = AvroSerialHelper(
+            ser_schema=self.bulk_output_schema,
+            des_schema=self.init_query_input_schema,
+            logger=self.logger.logger,
+        )
+        self.initqueryclientavroserialhelper = AvroSerialHelper(
+            ser_schema=self.init_query_input_schema,
+            des_schema=self.bulk_output_schema,
+            logger=self.logger.logger,
+        )
+        parser_grpc.add_ParserInitQueryServicer_to_server(
+            initialize_parser(parser_grpc.ParserInitQueryServicer)(
+                self.producer, self.ser_schema, self.schema_client, self.logger.logger
+            ),
+            self.server,
+            self.initqueryavroserialhelper,
+        )
         self.port = 55551
         self.server.add_insecure_port(f"[::]:{self.port}")
-        self.server.start()
+        await self.server.start()
 
-    def tearDown(self):
-        self.server.stop(None)
+    async def asyncTearDown(self):
+        await self.server.stop(None)
 
-    def test_Parser_server_bad_entry(self):
+    async def test_Parser_server_bad_entry(self):
         """
         An initial test to confirm gRPC raises an error if it is given an invalid message to serialize.
         input:
@@ -95,12 +183,12 @@ class ParserServer(TestCase):
         """
         s = {}
 
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             stub = parser_grpc.ParserInitStub(channel, self.avroserialhelper)
             with pytest.raises(grpc.RpcError):
-                stub.initParser(s)
+                [response async for response in stub.initParser(s)]
 
-    def test_Parser_server_init(self):
+    async def test_Parser_server_init(self):
         """
         A test the of INIT method for the gRPC server
         input:
@@ -113,14 +201,14 @@ class ParserServer(TestCase):
         s = {"record_id": record_id, "status": "Error", "task": "ARXIV"}
         db.write_job_status(cls, s)
         s = {"record_id": record_id, "persistence": False, "task": "REPARSE"}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             stub = parser_grpc.ParserInitStub(channel, self.avroserialhelper)
-            responses = stub.initParser(s)
-            for response in list(responses):
+            responses = [response async for response in stub.initParser(s)]
+            for response in responses:
                 self.assertEqual(response.get("status"), "Pending")
                 self.assertNotEqual(response.get("record_id"), None)
 
-    def test_Parser_server_init_multi_record(self):
+    async def test_Parser_server_init_multi_record(self):
         """
         A test the of INIT method for the gRPC server
         input:
@@ -135,21 +223,28 @@ class ParserServer(TestCase):
             db.write_job_status(cls, s)
 
         s = {"record_id": record_id, "persistence": False, "task": "REPARSE"}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             stub = parser_grpc.ParserInitStub(channel, self.avroserialhelper)
-            responses = stub.initParser(s)
-            for response in list(responses):
+            responses = [response async for response in stub.initParser(s)]
+            for response in responses:
                 self.assertEqual(response.get("status"), "Pending")
                 self.assertNotEqual(response.get("record_id"), None)
+        batch_ids = {response.get("batch_id") for response in responses}
+        self.assertEqual(len(batch_ids), 1)
+        batch_id = batch_ids.pop()
+        progress = db.get_batch_progress_redis(cls.redis, batch_id)
+        self.assertEqual((progress["total"], progress["Pending"]), (5, 5))
+        with cls.session_scope() as session:
+            self.assertEqual(db.get_batch_job_progress(session, batch_id)["total"], 5)
 
-    def test_Parser_server_init_persistence(self):
+    async def test_Parser_server_init_persistence(self):
         """
         A test of the INIT method for the gRPC server with persistence
         input:
             s: AVRO message: ParserInputSchema
         """
         s = {"record_id": str(uuid.uuid4()), "persistence": True, "task": "REPARSE"}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "update_job_status": patch.object(db, "update_job_status", return_value=True),
@@ -158,20 +253,18 @@ class ParserServer(TestCase):
                     ),
                     "__init__": patch.object(Listener, "__init__", return_value=None),
                     "subscribe": patch.object(Listener, "subscribe", return_value=True),
-                    "get_status_redis": patch.object(
-                        Listener, "get_status_redis", return_value=iter(["Success"])
-                    ),
+                    "next_status": patch.object(Listener, "next_status", return_value="Success"),
                 }
             ):
                 stub = parser_grpc.ParserInitStub(channel, self.avroserialhelper)
-                responses = stub.initParser(s)
+                responses = [response async for response in stub.initParser(s)]
                 final_response = []
-                for response in list(responses):
+                for response in responses:
                     self.assertNotEqual(response.get("record_id"), None)
                     final_response.append(response.get("status"))
                 self.assertEqual(final_response, ["Pending", "Processing", "Success"])
 
-    def test_Parser_server_init_persistence_error_redis(self):
+    async def test_Parser_server_init_persistence_error_redis(self):
         """
         A test of the INIT method for the gRPC server with persistence
         where an error is returned by the redis server.
@@ -179,7 +272,7 @@ class ParserServer(TestCase):
             s: AVRO message: ParserInputSchema
         """
         s = {"record_id": str(uuid.uuid4()), "persistence": True, "task": "REPARSE"}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "update_job_status": patch.object(db, "update_job_status", return_value=True),
@@ -188,20 +281,18 @@ class ParserServer(TestCase):
                     ),
                     "__init__": patch.object(Listener, "__init__", return_value=None),
                     "subscribe": patch.object(Listener, "subscribe", return_value=True),
-                    "get_status_redis": patch.object(
-                        Listener, "get_status_redis", return_value=iter(["Error"])
-                    ),
+                    "next_status": patch.object(Listener, "next_status", return_value="Error"),
                 }
             ):
                 stub = parser_grpc.ParserInitStub(channel, self.avroserialhelper)
-                responses = stub.initParser(s)
+                responses = [response async for response in stub.initParser(s)]
                 final_response = []
-                for response in list(responses):
+                for response in responses:
                     self.assertNotEqual(response.get("record_id"), None)
                     final_response.append(response.get("status"))
                 self.assertEqual(final_response, ["Pending", "Processing", "Error"])
 
-    def test_Parser_server_init_persistence_error_db(self):
+    async def test_Parser_server_init_persistence_error_db(self):
         """
         A test of the INIT method for the gRPC server with persistence
         where an error is returned from postgres.
@@ -213,7 +304,7 @@ class ParserServer(TestCase):
             "persistence": True,
             "task": "REPARSE",
         }
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "update_job_status": patch.object(db, "update_job_status", return_value=True),
@@ -222,27 +313,88 @@ class ParserServer(TestCase):
                     ),
                     "__init__": patch.object(Listener, "__init__", return_value=None),
                     "subscribe": patch.object(Listener, "subscribe", return_value=True),
-                    "get_status_redis": patch.object(
-                        Listener, "get_status_redis", return_value=iter(["Error"])
-                    ),
+                    "next_status": patch.object(Listener, "next_status", return_value="Error"),
                 }
             ):
                 stub = parser_grpc.ParserInitStub(channel, self.avroserialhelper)
-                responses = stub.initParser(s)
+                responses = [response async for response in stub.initParser(s)]
                 final_response = []
-                for response in list(responses):
+                for response in responses:
                     self.assertNotEqual(response.get("record_id"), None)
                     final_response.append(response.get("status"))
                 self.assertEqual(final_response, ["Pending", "Error"])
 
-    def test_Parser_server_monitor(self):
+    async def test_Parser_server_bulk(self):
+        """
+        A test of the bulk REPARSE method for the gRPC server
+        input:
+            s: AVRO messages: ParserBulkInputSchema
+        """
+        cls = initialize_parser()(
+            self.producer, self.ser_schema, self.schema_client, self.logger.logger
+        )
+        record_ids = [str(uuid.uuid4()) for _ in range(0, 5)]
+        for record in record_ids:
+            s = {"record_id": record, "status": "Error", "task": "ARXIV"}
+            db.write_job_status(cls, s)
+
+        chunks = [
+            {"record_ids": record_ids[0:2], "force": False, "resend": False},
+            {"record_ids": record_ids[2:5], "force": False, "resend": False},
+        ]
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            stub = parser_grpc.ParserBulkStub(channel, self.bulkclientavroserialhelper)
+            responses = [response async for response in stub.bulkParser(iter(chunks))]
+        self.assertEqual([response.get("chunk") for response in responses], [0, 1])
+        self.assertEqual([response.get("accepted") for response in responses], [2, 3])
+        self.assertEqual([response.get("failed") for response in responses], [0, 0])
+        self.assertEqual(responses[-1].get("submitted"), 5)
+        statuses = db.get_job_statuses_by_record_ids(cls, record_ids)
+        for record_id in record_ids:
+            self.assertEqual(statuses[record_id].name, "Pending")
+
+        batch_id = responses[0].get("batch_id")
+        self.assertEqual(responses[-1].get("batch_id"), batch_id)
+        for record_id, status in zip(record_ids, ["Processing", "Success"]):
+            db.write_status_redis(cls.redis, json.dumps({"job_id": record_id, "status": status}))
+        self.assertGreaterEqual(cls.reconcile_batches(), 1)
+        with cls.session_scope() as session:
+            progress = db.get_batch_job_progress(session, batch_id)
+        self.assertEqual(
+            (progress["total"], progress["Pending"], progress["Processing"], progress["Success"]),
+            (5, 3, 1, 1),
+        )
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_batch_progress_redis": patch.object(
+                    db, "get_batch_progress_redis", return_value=None
+                )
+            }
+        ):
+            self.assertEqual(cls.batch_progress(batch_id, True, "0-0"), (progress, []))
+
+        # Counters that expire in the middle of the batch neither complete the batch job nor
+        # change its total, and the batch job is no longer reconciled.
+        cls.redis.delete("PARSER_batch:{}".format(batch_id))
+        db.write_status_redis(
+            cls.redis, json.dumps({"job_id": record_ids[2], "status": "Success"})
+        )
+        cls.reconcile_batches()
+        self.assertEqual(cls.batch_progress(batch_id, True, "0-0"), (progress, []))
+        with cls.session_scope() as session:
+            self.assertNotIn(batch_id, db.get_open_batch_job_ids(session))
+            batch = session.query(db.models.batch_job).filter_by(id=batch_id).first()
+            self.assertIsNotNone(batch.date_expired)
+            self.assertIsNone(batch.date_completed)
+
+    async def test_Parser_server_monitor(self):
         """
         A test of the MONITOR method for the gRPC server
         input:
             s: AVRO message: ParserInputSchema
         """
         s = {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": False}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "get_job_status_by_record_id": patch.object(
@@ -251,19 +403,116 @@ class ParserServer(TestCase):
                 }
             ):
                 stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
-                responses = stub.monitorParser(s)
-                for response in list(responses):
+                responses = [response async for response in stub.monitorParser(s)]
+                for response in responses:
                     self.assertEqual(response.get("status"), "Success")
                     self.assertEqual(response.get("record_id"), s.get("record_id"))
 
-    def test_Parser_server_monitor_persistent_success(self):
+    async def test_Parser_server_monitor_concurrent(self):
+        """
+        A test that slow postgres lookups of concurrent MONITOR requests do not block
+        each other.
+        input:
+            s: AVRO message: ParserInputSchema
+        """
+
+        def slow_lookup(cls, record_ids):
+            time.sleep(0.5)
+            return fake_db_entry()
+
+        requests = [
+            {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": False}
+            for _ in range(0, 4)
+        ]
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            with base.base_utils.mock_multiple_targets(
+                {
+                    "get_job_status_by_record_id": patch.object(
+                        db, "get_job_status_by_record_id", side_effect=slow_lookup
+                    )
+                }
+            ):
+                stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
+
+                async def monitor(s):
+                    return [response async for response in stub.monitorParser(s)]
+
+                start = time.monotonic()
+                responses = await asyncio.gather(*[monitor(s) for s in requests])
+                elapsed = time.monotonic() - start
+        self.assertLess(elapsed, 0.5 * len(requests))
+        for s, response in zip(requests, responses):
+            self.assertEqual(response[0].get("record_id"), s.get("record_id"))
+            self.assertEqual(response[0].get("status"), "Success")
+
+    async def test_Parser_server_monitor_multi_record(self):
+        """
+        A test of the MONITOR method for the gRPC server with multiple records
+        input:
+            s: AVRO message: ParserInputSchema
+        """
+        cls = initialize_parser()(
+            self.producer, self.ser_schema, self.schema_client, self.logger.logger
+        )
+        record_ids = [str(uuid.uuid4()) for _ in range(0, 5)]
+        for record in record_ids:
+            s = {"record_id": record, "status": "Success", "task": "ARXIV"}
+            db.write_job_status(cls, s)
+        missing_record_id = str(uuid.uuid4())
+
+        s = {
+            "task": "MONITOR",
+            "record_id": " ".join(record_ids + [missing_record_id]),
+            "persistence": False,
+        }
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
+            responses = [response async for response in stub.monitorParser(s)]
+        self.assertEqual(
+            [response.get("record_id") for response in responses],
+            record_ids + [missing_record_id],
+        )
+        for response in responses[:-1]:
+            self.assertEqual(response.get("status"), "Success")
+        self.assertEqual(responses[-1].get("status"), "Error")
+
+    async def test_Parser_server_monitor_cached_status(self):
+        """
+        A test of the MONITOR method for the gRPC server where the latest status of the job
+        is cached in redis.
+        input:
+            s: AVRO message: ParserInputSchema
+        """
+        cls = initialize_parser()(
+            self.producer, self.ser_schema, self.schema_client, self.logger.logger
+        )
+        s = {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": False}
+        db.write_status_redis(
+            cls.redis, json.dumps({"job_id": s.get("record_id"), "status": "Processing"})
+        )
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            with base.base_utils.mock_multiple_targets(
+                {
+                    "get_job_status_by_record_id": patch.object(
+                        db, "get_job_status_by_record_id", return_value=fake_db_entry()
+                    )
+                }
+            ) as mocks:
+                stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
+                responses = [response async for response in stub.monitorParser(s)]
+                for response in responses:
+                    self.assertEqual(response.get("status"), "Processing")
+                    self.assertEqual(response.get("record_id"), s.get("record_id"))
+                mocks["get_job_status_by_record_id"].assert_not_called()
+
+    async def test_Parser_server_monitor_persistent_success(self):
         """
         A test of the MONITOR method for the gRPC server with persistence
         input:
             s: AVRO message: ParserInputSchema
         """
         s = {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": True}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "update_job_status": patch.object(db, "update_job_status", return_value=True),
@@ -272,18 +521,55 @@ class ParserServer(TestCase):
                     ),
                     "__init__": patch.object(Listener, "__init__", return_value=None),
                     "subscribe": patch.object(Listener, "subscribe", return_value=True),
-                    "get_status_redis": patch.object(
-                        Listener, "get_status_redis", return_value=iter(["Success"])
-                    ),
+                    "next_status": patch.object(Listener, "next_status", return_value="Success"),
                 }
             ):
                 stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
-                responses = stub.monitorParser(s)
-                for response in list(responses):
+                responses = [response async for response in stub.monitorParser(s)]
+                for response in responses:
                     self.assertEqual(response.get("status"), "Success")
                     self.assertEqual(response.get("hash"), s.get("hash"))
 
-    def test_Parser_server_monitor_persistent_error_db(self):
+    async def test_Parser_server_monitor_persistent_resume(self):
+        """
+        A test that a persistent MONITOR stream resumes after the last_id of the request
+        and returns the stream entry id of each status.
+        input:
+            s: AVRO message: ParserInputSchema
+        """
+        s = {
+            "task": "MONITOR",
+            "record_id": str(uuid.uuid4()),
+            "persistence": True,
+            "last_id": "5-0",
+        }
+        subscribed = []
+
+        def subscribe(listener, job_id=None, last_id=None, status_queue=None):
+            subscribed.append(last_id)
+            listener.replay = [("7-0", "Processing")]
+
+        async def next_status(listener, job_id, logger):
+            listener.last_id = "8-0"
+            return "Success"
+
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            with base.base_utils.mock_multiple_targets(
+                {
+                    "__init__": patch.object(Listener, "__init__", return_value=None),
+                    "subscribe": patch.object(Listener, "subscribe", subscribe),
+                    "next_status": patch.object(Listener, "next_status", next_status),
+                }
+            ):
+                stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
+                responses = [response async for response in stub.monitorParser(s)]
+        self.assertEqual(subscribed, ["5-0"])
+        self.assertEqual(
+            [(response.get("status"), response.get("last_id")) for response in responses],
+            [("Processing", "7-0"), ("Success", "8-0")],
+        )
+
+    async def test_Parser_server_monitor_persistent_error_db(self):
         """
         A test of the MONITOR method for the gRPC server with persistence
         where an error is returned from postgres.
@@ -291,7 +577,7 @@ class ParserServer(TestCase):
             s: AVRO message: ParserInputSchema
         """
         s = {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": True}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "update_job_status": patch.object(db, "update_job_status", return_value=True),
@@ -300,18 +586,16 @@ class ParserServer(TestCase):
                     ),
                     "__init__": patch.object(Listener, "__init__", return_value=None),
                     "subscribe": patch.object(Listener, "subscribe", return_value=True),
-                    "get_status_redis": patch.object(
-                        Listener, "get_status_redis", return_value=iter(["Success"])
-                    ),
+                    "next_status": patch.object(Listener, "next_status", return_value="Success"),
                 }
             ):
                 stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
-                responses = stub.monitorParser(s)
-                for response in list(responses):
+                responses = [response async for response in stub.monitorParser(s)]
+                for response in responses:
                     self.assertEqual(response.get("status"), "Error")
                     self.assertEqual(response.get("hash"), s.get("hash"))
 
-    def test_Parser_server_monitor_persistent_error_redis(self):
+    async def test_Parser_server_monitor_persistent_error_redis(self):
         """
         A test of the MONITOR method for the gRPC server with persistence
         where an error is returned from redis.
@@ -319,7 +603,7 @@ class ParserServer(TestCase):
             s: AVRO message: ParserInputSchema
         """
         s = {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": True}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "update_job_status": patch.object(db, "update_job_status", return_value=True),
@@ -328,20 +612,88 @@ class ParserServer(TestCase):
                     ),
                     "__init__": patch.object(Listener, "__init__", return_value=None),
                     "subscribe": patch.object(Listener, "subscribe", return_value=True),
-                    "get_status_redis": patch.object(
-                        Listener, "get_status_redis", return_value=iter(["Error"])
-                    ),
+                    "next_status": patch.object(Listener, "next_status", return_value="Error"),
                 }
             ):
                 stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
-                responses = stub.monitorParser(s)
+                responses = [response async for response in stub.monitorParser(s)]
                 final_responses = []
-                for response in list(responses):
+                for response in responses:
                     final_responses.append(response.get("status"))
                     self.assertEqual(response.get("hash"), s.get("hash"))
                 self.assertEqual(final_responses, ["Processing", "Error"])
 
-    def test_Parser_server_monitor_no_hash(self):
+    async def test_Parser_server_monitor_persistent_deadline(self):
+        """
+        A test of the MONITOR method for the gRPC server with persistence where no final
+        status arrives before the stream deadline.
+        input:
+            s: AVRO message: ParserInputSchema
+        """
+
+        async def no_status(job_id, logger):
+            await asyncio.sleep(60)
+
+        s = {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": True}
+        statuses = []
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            with base.base_utils.mock_multiple_targets(
+                {
+                    "get_job_status_by_record_id": patch.object(
+                        db, "get_job_status_by_record_id", return_value=fake_db_entry("Processing")
+                    ),
+                    "__init__": patch.object(Listener, "__init__", return_value=None),
+                    "subscribe": patch.object(Listener, "subscribe", return_value=True),
+                    "next_status": patch.object(Listener, "next_status", side_effect=no_status),
+                    "config": patch.dict(
+                        config, {"GRPC_STREAM_HEARTBEAT": 0.2, "GRPC_STREAM_DEADLINE": 1}
+                    ),
+                }
+            ):
+                stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
+                with pytest.raises(grpc.RpcError) as error:
+                    async for response in stub.monitorParser(s):
+                        statuses.append(response.get("status"))
+        self.assertEqual(error.value.code(), grpc.StatusCode.DEADLINE_EXCEEDED)
+        # The first status followed by heartbeats.
+        self.assertGreater(len(statuses), 1)
+        self.assertEqual(set(statuses), {"Processing"})
+
+    async def test_Parser_server_monitor_persistent_cancel(self):
+        """
+        A test that a persistent MONITOR stream is cleaned up when the client cancels it.
+        input:
+            s: AVRO message: ParserInputSchema
+        """
+
+        async def no_status(job_id, logger):
+            await asyncio.sleep(60)
+
+        s = {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": True}
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            with base.base_utils.mock_multiple_targets(
+                {
+                    "get_job_status_by_record_id": patch.object(
+                        db, "get_job_status_by_record_id", return_value=fake_db_entry("Processing")
+                    ),
+                    "__init__": patch.object(Listener, "__init__", return_value=None),
+                    "subscribe": patch.object(Listener, "subscribe", return_value=True),
+                    "next_status": patch.object(Listener, "next_status", side_effect=no_status),
+                    "close": patch.object(Listener, "close", return_value=None),
+                }
+            ) as mocks:
+                stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
+                call = stub.monitorParser(s)
+                response = await call.read()
+                self.assertEqual(response.get("status"), "Processing")
+                call.cancel()
+                for _ in range(0, 50):
+                    if mocks["close"].called:
+                        break
+                    await asyncio.sleep(0.1)
+                mocks["close"].assert_called_once()
+
+    async def test_Parser_server_monitor_no_hash(self):
         """
         A test of the MONITOR method for the gRPC server with persistence
         where the job hash was not provided.
@@ -349,7 +701,7 @@ class ParserServer(TestCase):
             s: AVRO message: ParserInputSchema
         """
         s = {"task": "MONITOR", "record_id": str(uuid.uuid4()), "persistence": True}
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "update_job_status": patch.object(db, "update_job_status", return_value=True),
@@ -358,18 +710,16 @@ class ParserServer(TestCase):
                     ),
                     "__init__": patch.object(Listener, "__init__", return_value=None),
                     "subscribe": patch.object(Listener, "subscribe", return_value=True),
-                    "get_status_redis": patch.object(
-                        Listener, "get_status_redis", return_value=iter(["Success"])
-                    ),
+                    "next_status": patch.object(Listener, "next_status", return_value="Success"),
                 }
             ):
                 stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
-                responses = stub.monitorParser(s)
-                for response in list(responses):
+                responses = [response async for response in stub.monitorParser(s)]
+                for response in responses:
                     self.assertEqual(response.get("status"), "Error")
                     self.assertEqual(response.get("hash"), s.get("hash"))
 
-    def test_Parser_server_init_and_monitor(self):
+    async def test_Parser_server_init_and_monitor(self):
         """
         An end-to-end test of the gRPC server that sends an INIT request to the server,
         and the monitors it with the MONITOR task.
@@ -387,11 +737,11 @@ class ParserServer(TestCase):
                 "update_job_status": patch.object(db, "update_job_status", return_value=True),
             }
         ):
-            with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+            async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
                 stub = parser_grpc.ParserInitStub(channel, self.avroserialhelper)
-                responses = stub.initParser(s)
+                responses = [response async for response in stub.initParser(s)]
                 output_hash = None
-                for response in list(responses):
+                for response in responses:
                     output_hash = response.get("record_id")
                     self.assertEqual(response.get("status"), "Pending")
                     self.assertNotEqual(response.get("record_id"), None)
@@ -405,15 +755,15 @@ class ParserServer(TestCase):
             # Test update_job_status as well to mimic the Pipeline updating the status.
             db.update_job_status(cls, output_hash, status="Processing")
 
-            with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+            async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
                 stub = parser_grpc.ParserMonitorStub(channel, self.avroserialhelper)
-                responses = stub.monitorParser(s)
-                print(list(responses))
-                for response in list(responses):
+                responses = [response async for response in stub.monitorParser(s)]
+                print(responses)
+                for response in responses:
                     self.assertEqual(response.get("status"), "Processing")
                     self.assertEqual(response.get("record_id"), s.get("record_id"))
 
-    def test_Parser_server_view(self):
+    async def test_Parser_server_view(self):
         """
         A test of the MONITOR method for the gRPC server
         input:
@@ -422,7 +772,7 @@ class ParserServer(TestCase):
         s = {"task": "VIEW", "record_id": str(uuid.uuid4())}
         with open("SciXParser/tests/stubdata/arxiv_parsed_data.json", "r") as f:
             parsed_record = json.load(f)
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
             with base.base_utils.mock_multiple_targets(
                 {
                     "get_parser_record": patch.object(
@@ -437,6 +787,251 @@ class ParserServer(TestCase):
                 }
             ):
                 stub = parser_grpc.ParserViewStub(channel, self.monclientavroserialhelper)
-                responses = stub.viewParser(s)
-                for response in list(responses):
+                responses = [response async for response in stub.viewParser(s)]
+                for response in responses:
                     self.assertEqual(response.get("record_id"), s.get("record_id"))
+
+    async def test_Parser_server_view_bulk(self):
+        """
+        A test of the bulk VIEW method for the gRPC server
+        input:
+            s: AVRO messages: ParserViewBulkInputSchema
+        """
+        cls = initialize_parser()(
+            self.producer, self.ser_schema, self.schema_client, self.logger.logger
+        )
+        with open("SciXParser/tests/stubdata/arxiv_parsed_data.json", "r") as f:
+            parsed_record = json.load(f)
+        record_ids = sorted(str(uuid.uuid4()) for _ in range(0, 5))
+        for record_id in record_ids:
+            db.write_parser_record(
+                cls, record_id, datetime.now(), "/{}".format(record_id), parsed_record, "ARXIV"
+            )
+        missing_record_id = str(uuid.uuid4())
+
+        requests = [
+            {"record_ids": record_ids[0:3] + [missing_record_id]},
+            {"record_ids": record_ids[3:5]},
+        ]
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            with base.base_utils.mock_multiple_targets(
+                {"config": patch.dict(config, {"VIEW_BULK_PAGE_SIZE": 2})}
+            ):
+                stub = parser_grpc.ParserViewBulkStub(channel, self.viewbulkclientavroserialhelper)
+                responses = [response async for response in stub.viewParserBulk(iter(requests))]
+                with pytest.raises(grpc.RpcError) as error:
+                    [
+                        response
+                        async for response in stub.viewParserBulk(iter([{"record_ids": []}]))
+                    ]
+        self.assertEqual([response.get("record_id") for response in responses], record_ids)
+        for response in responses:
+            self.assertEqual(
+                response["parsed_record"]["recordData"]["loadType"],
+                parsed_record["recordData"]["loadType"],
+            )
+        self.assertEqual(error.value.code(), grpc.StatusCode.INVALID_ARGUMENT)
+
+    async def test_Parser_server_monitor_bulk(self):
+        """
+        A test of the bulk MONITOR method for the gRPC server following jobs that were not
+        submitted in a batch until every one of them is done, without registering a batch.
+        input:
+            s: AVRO messages: ParserMonitorBulkInputSchema
+        """
+        cls = initialize_parser()(
+            self.producer, self.ser_schema, self.schema_client, self.logger.logger
+        )
+        record_ids = [str(uuid.uuid4()) for _ in range(0, 3)]
+        for record_id, status in zip(record_ids, ["Processing", "Processing", "Success"]):
+            db.write_job_status(cls, {"record_id": record_id, "status": status, "task": "ARXIV"})
+
+        s = {"record_ids": record_ids, "events": True, "persistence": True}
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            with base.base_utils.mock_multiple_targets(
+                {"config": patch.dict(config, {"GRPC_BATCH_PROGRESS_INTERVAL": 0.1})}
+            ):
+                stub = parser_grpc.ParserMonitorBulkStub(
+                    channel, self.monitorbulkclientavroserialhelper
+                )
+                call = stub.monitorParserBulk(iter([s]))
+                first = await call.read()
+                for record_id, status in zip(record_ids[0:2], ["Success", "Error"]):
+                    db.write_status_redis(
+                        cls.redis, json.dumps({"job_id": record_id, "status": status})
+                    )
+                responses = [response async for response in call]
+
+        self.assertEqual(first["total"], 3)
+        self.assertEqual((first["processing"], first["success"]), (2, 1))
+        self.assertEqual((first["record_id"], first["status"]), (record_ids[0], "Processing"))
+        self.assertFalse(first["done"])
+        statuses = [
+            (response["record_id"], response["status"])
+            for response in responses
+            if response.get("record_id")
+        ]
+        self.assertEqual(
+            statuses,
+            [
+                (record_ids[1], "Processing"),
+                (record_ids[2], "Success"),
+                (record_ids[0], "Success"),
+                (record_ids[1], "Error"),
+            ],
+        )
+        final = responses[-1]
+        self.assertEqual({response["batch_id"] for response in responses}, {""})
+        self.assertEqual((final["processing"], final["success"], final["error"]), (0, 2, 1))
+        self.assertTrue(final["done"])
+        self.assertEqual(
+            db.get_job_batches_redis(cls.redis, record_ids), dict.fromkeys(record_ids)
+        )
+
+    async def test_Parser_server_init_query(self):
+        """
+        A test of the REPARSE by query method for the gRPC server
+        input:
+            s: AVRO message: ParserInitQueryInputSchema
+        """
+        cls = initialize_parser()(
+            self.producer, self.ser_schema, self.schema_client, self.logger.logger
+        )
+        with open("SciXParser/tests/stubdata/arxiv_parsed_data.json", "r") as f:
+            parsed_record = json.load(f)
+        # A date range that no other test writes records in.
+        modified = datetime(2100, 1, 1) + timedelta(seconds=uuid.uuid4().int % 10**8)
+        record_ids = [str(uuid.uuid4()) for _ in range(0, 5)]
+        for record_id in record_ids:
+            db.write_parser_record(
+                cls, record_id, modified, "/{}".format(record_id), parsed_record, "ARXIV"
+            )
+            db.write_job_status(
+                cls, {"record_id": record_id, "status": "Success", "task": "ARXIV"}
+            )
+
+        s = {
+            "source": "ARXIV",
+            "modified_since": modified.isoformat(),
+            "modified_until": (modified + timedelta(seconds=1)).isoformat(),
+        }
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            with base.base_utils.mock_multiple_targets(
+                {"config": patch.dict(config, {"REPARSE_QUERY_CHUNK_SIZE": 2})}
+            ):
+                stub = parser_grpc.ParserInitQueryStub(
+                    channel, self.initqueryclientavroserialhelper
+                )
+                responses = [response async for response in stub.initParserQuery(s)]
+                with pytest.raises(grpc.RpcError) as error:
+                    [response async for response in stub.initParserQuery({"source": "trash"})]
+        self.assertEqual([response.get("accepted") for response in responses], [2, 2, 1])
+        self.assertEqual(responses[-1].get("submitted"), 5)
+        self.assertEqual(len({response.get("batch_id") for response in responses}), 1)
+        statuses = db.get_job_statuses_by_record_ids(cls, record_ids)
+        for record_id in record_ids:
+            self.assertEqual(statuses[record_id].name, "Pending")
+        self.assertEqual(error.value.code(), grpc.StatusCode.INVALID_ARGUMENT)
+
+    async def test_Parser_server_monitor_bulk_existing_batch(self):
+        """
+        A test that the bulk MONITOR method follows the batch jobs were submitted in
+        without moving them to a new batch, nor adding jobs outside of it to one.
+        input:
+            s: AVRO messages: ParserMonitorBulkInputSchema
+        """
+        cls = initialize_parser()(
+            self.producer, self.ser_schema, self.schema_client, self.logger.logger
+        )
+        record_ids = [str(uuid.uuid4()) for _ in range(0, 3)]
+        s = {"record_id": " ".join(record_ids), "persistence": False, "task": "REPARSE"}
+        unbatched_id = str(uuid.uuid4())
+        db.write_job_status(cls, {"record_id": unbatched_id, "status": "Success", "task": "ARXIV"})
+        async with grpc.aio.insecure_channel(f"localhost:{self.port}") as channel:
+            stub = parser_grpc.ParserInitStub(channel, self.avroserialhelper)
+            batch_id = [response async for response in stub.initParser(s)][0]["batch_id"]
+
+            stub = parser_grpc.ParserMonitorBulkStub(
+                channel, self.monitorbulkclientavroserialhelper
+            )
+            responses = []
+            for _ in range(0, 2):
+                requests = [
+                    {"record_ids": record_ids[0:2]},
+                    {"record_ids": record_ids[2:3] + [unbatched_id]},
+                ]
+                responses += [
+                    response async for response in stub.monitorParserBulk(iter(requests))
+                ]
+
+        self.assertEqual({response["batch_id"] for response in responses}, {batch_id})
+        self.assertEqual(
+            [(response["record_id"], response["status"]) for response in responses[0:2]],
+            [(unbatched_id, "Success"), (None, None)],
+        )
+        self.assertEqual((responses[1]["total"], responses[1]["pending"]), (4, 3))
+        self.assertEqual(responses[2:4], responses[0:2])
+        self.assertEqual(
+            db.get_job_batches_redis(cls.redis, record_ids + [unbatched_id]),
+            dict(dict.fromkeys(record_ids, batch_id), **{unbatched_id: None}),
+        )
+        with cls.session_scope() as session:
+            self.assertEqual(db.get_batch_job_progress(session, batch_id)["total"], 3)
+
+    def test_Parser_server_submit_chunk_failure(self):
+        """
+        A test that records that cannot be sent to the Parser Topic are counted as Error
+        through the status publisher of the server.
+        """
+        with base.base_utils.mock_multiple_targets(
+            {
+                "config": patch.dict(
+                    config, {"STATUS_CHANNEL_MODE": "job", "STATUS_TRANSPORT": "stream"}
+                )
+            }
+        ):
+            cls = initialize_parser()(
+                self.producer, self.ser_schema, self.schema_client, self.logger.logger
+            )
+        self.assertEqual(
+            (cls.status_publisher.channel_mode, cls.status_publisher.transport), ("job", "stream")
+        )
+        batch_id = str(uuid.uuid4())
+        record_ids = [str(uuid.uuid4()) for _ in range(0, 2)]
+        with base.base_utils.mock_multiple_targets(
+            {"produce": patch.object(cls.producer, "produce", side_effect=BufferError)}
+        ):
+            self.assertEqual(cls.submit_chunk(record_ids, batch_id=batch_id), (0, 2))
+        cls.status_publisher.flush()
+        progress = db.get_batch_progress_redis(cls.redis, batch_id)
+        self.assertEqual((progress["total"], progress["Error"]), (2, 2))
+        self.assertEqual(
+            cls.redis.xrevrange(db.status_stream(record_ids[0], "job"), count=1)[0][1]["status"],
+            "Error",
+        )
+
+    def test_Parser_server_submit_chunk_keeps_final_status(self):
+        """
+        A test that a final status set while a chunk is being submitted is not overwritten
+        with Pending.
+        """
+        cls = initialize_parser()(
+            self.producer, self.ser_schema, self.schema_client, self.logger.logger
+        )
+        record_ids = [str(uuid.uuid4()) for _ in range(0, 2)]
+        for record_id in record_ids:
+            db.write_job_status(cls, {"record_id": record_id, "status": "Error", "task": "ARXIV"})
+        produce = cls.producer.produce
+
+        def produce_and_finish(*args, **kwargs):
+            produce(*args, **kwargs)
+            if kwargs["value"]["record_id"] == record_ids[0]:
+                db.update_job_status(cls, record_ids[0], "Success")
+
+        with base.base_utils.mock_multiple_targets(
+            {"produce": patch.object(cls.producer, "produce", side_effect=produce_and_finish)}
+        ):
+            self.assertEqual(cls.submit_chunk(record_ids), (2, 0))
+        statuses = db.get_job_statuses_by_record_ids(cls, record_ids)
+        self.assertEqual(statuses[record_ids[0]].name, "Success")
+        self.assertEqual(statuses[record_ids[1]].name, "Pending")
@@ -1,18 +1,33 @@
+import asyncio
 import json
 import logging
-from unittest import TestCase
+import uuid
+from unittest import IsolatedAsyncioTestCase
 
 import redis
 
 import API.parser_server as hs
-from SciXParser.parser.db import write_status_redis
+from SciXParser.parser.db import (
+    cache_statuses_redis,
+    clear_cached_statuses_redis,
+    get_batch_progress_redis,
+    get_cached_statuses_redis,
+    read_batch_events_redis,
+    register_batch_redis,
+    write_status_redis,
+)
+from SciXParser.parser.status_publisher import StatusPublisher
 
 
-class TestRedisReadWrite(TestCase):
-    def test_redis_read_write(self):
-        listener = hs.Listener()
-        listener.subscribe()
+async def next_status(listener, job_id, logger):
+    return await asyncio.wait_for(listener.next_status(job_id, logger), timeout=5)
+
+
+class TestRedisReadWrite(IsolatedAsyncioTestCase):
+    async def test_redis_read_write(self):
         job_id = "1234234215"
+        listener = hs.Listener()
+        listener.subscribe(job_id, None, hs.AsyncStatusQueue(asyncio.get_running_loop()))
         status = "Success"
         logger = hs.Logging(logging)
         redis_status = json.dumps({"job_id": job_id, "status": status})
@@ -22,5 +37,133 @@ class TestRedisReadWrite(TestCase):
             decode_responses=True,
         )
         write_status_redis(redis_instance, redis_status)
-        status = next(listener.get_status_redis(job_id, logger.logger))
-        self.assertEqual(status, status)
+        self.assertEqual(await next_status(listener, job_id, logger.logger), status)
+        listener.close()
+        self.assertEqual(listener.hub.subscribers(), 0)
+
+    def test_redis_status_cache(self):
+        job_ids = [str(uuid.uuid4()) for _ in range(0, 3)]
+        redis_instance = redis.StrictRedis(
+            "localhost",
+            6379,
+            decode_responses=True,
+        )
+        write_status_redis(redis_instance, json.dumps({"job_id": job_ids[0], "status": "Success"}))
+        cache_statuses_redis(redis_instance, {job_ids[0]: "Pending", job_ids[1]: "Processing"})
+        self.assertEqual(
+            get_cached_statuses_redis(redis_instance, job_ids),
+            {job_ids[0]: "Success", job_ids[1]: "Processing"},
+        )
+
+        clear_cached_statuses_redis(redis_instance, job_ids)
+        self.assertEqual(get_cached_statuses_redis(redis_instance, job_ids), {})
+
+        # The status update script is loaded again once redis has dropped it.
+        redis_instance.script_flush()
+        write_status_redis(redis_instance, json.dumps({"job_id": job_ids[2], "status": "Error"}))
+        self.assertEqual(get_cached_statuses_redis(redis_instance, job_ids), {job_ids[2]: "Error"})
+
+    async def test_redis_status_hub(self):
+        job_ids = [str(uuid.uuid4()) for _ in range(0, 2)]
+        listeners = [hs.Listener() for _ in job_ids]
+        for listener, job_id in zip(listeners, job_ids):
+            listener.subscribe(job_id, None, hs.AsyncStatusQueue(asyncio.get_running_loop()))
+        self.assertIs(listeners[0].hub, listeners[1].hub)
+
+        redis_instance = redis.StrictRedis(
+            "localhost",
+            6379,
+            decode_responses=True,
+        )
+        write_status_redis(redis_instance, json.dumps({"job_id": job_ids[1], "status": "Success"}))
+        write_status_redis(redis_instance, json.dumps({"job_id": job_ids[0], "status": "Error"}))
+        logger = hs.Logging(logging)
+        self.assertEqual(await next_status(listeners[0], job_ids[0], logger.logger), "Error")
+        self.assertEqual(await next_status(listeners[1], job_ids[1], logger.logger), "Success")
+        for listener in listeners:
+            listener.close()
+
+    async def test_redis_status_stream(self):
+        job_id = str(uuid.uuid4())
+        redis_instance = redis.StrictRedis(
+            "localhost",
+            6379,
+            decode_responses=True,
+        )
+        publisher = StatusPublisher(redis_instance, channel_mode="job", transport="stream")
+        write_status_redis(publisher, json.dumps({"job_id": job_id, "status": "Processing"}))
+        publisher.flush()
+
+        hub = hs.StatusHub()
+        hub.channel_mode = "job"
+        hub.transport = "stream"
+        hub.start()
+        logger = hs.Logging(logging)
+        late_listener = hs.Listener()
+        late_listener.hub = hub
+        late_listener.subscribe(job_id, "0-0", hs.AsyncStatusQueue(asyncio.get_running_loop()))
+        self.assertEqual(late_listener.latest_status(), "Processing")
+
+        write_status_redis(publisher, json.dumps({"job_id": job_id, "status": "Success"}))
+        publisher.flush()
+        self.assertEqual(await next_status(late_listener, job_id, logger.logger), "Success")
+        last_id = late_listener.last_id
+        late_listener.close()
+
+        listener = hs.Listener()
+        listener.hub = hub
+        listener.subscribe(job_id=job_id, last_id=last_id)
+        self.assertIsNone(listener.latest_status())
+        listener.close()
+        self.assertEqual(hub.channels(), set())
+
+    def test_redis_batch_progress(self):
+        batch_id = str(uuid.uuid4())
+        job_ids = [str(uuid.uuid4()) for _ in range(0, 3)]
+        redis_instance = redis.StrictRedis(
+            "localhost",
+            6379,
+            decode_responses=True,
+        )
+        self.assertIsNone(get_batch_progress_redis(redis_instance, batch_id))
+        register_batch_redis(
+            redis_instance, batch_id, dict.fromkeys(job_ids, "Pending"), reset=True, chunk_size=2
+        )
+        write_status_redis(
+            redis_instance, json.dumps({"job_id": job_ids[0], "status": "Processing"})
+        )
+        write_status_redis(
+            redis_instance, json.dumps({"job_id": job_ids[0], "status": "Processing"})
+        )
+        write_status_redis(redis_instance, json.dumps({"job_id": job_ids[1], "status": "Success"}))
+
+        progress = get_batch_progress_redis(redis_instance, batch_id)
+        self.assertEqual(progress["total"], 3)
+        self.assertEqual(
+            (progress["Pending"], progress["Processing"], progress["Success"]), (1, 1, 1)
+        )
+        events = read_batch_events_redis(redis_instance, batch_id)
+        self.assertEqual([event[1:] for event in events], [(job_ids[1], "Success")])
+        self.assertEqual(read_batch_events_redis(redis_instance, batch_id, events[-1][0]), [])
+
+    def test_redis_batch_progress_expired(self):
+        batch_id = str(uuid.uuid4())
+        job_ids = [str(uuid.uuid4()) for _ in range(0, 2)]
+        redis_instance = redis.StrictRedis(
+            "localhost",
+            6379,
+            decode_responses=True,
+        )
+        register_batch_redis(redis_instance, batch_id, dict.fromkeys(job_ids, "Pending"), ttl=60)
+        write_status_redis(redis_instance, json.dumps({"job_id": job_ids[0], "status": "Success"}))
+        self.assertGreater(redis_instance.ttl("PARSER_batch:{}".format(batch_id)), 0)
+        self.assertGreater(redis_instance.ttl("PARSER_batch_events:{}".format(batch_id)), 0)
+
+        # The counters expire in the middle of the batch.
+        redis_instance.delete("PARSER_batch:{}".format(batch_id))
+        write_status_redis(redis_instance, json.dumps({"job_id": job_ids[1], "status": "Success"}))
+        self.assertFalse(redis_instance.exists("PARSER_batch:{}".format(batch_id)))
+        self.assertIsNone(get_batch_progress_redis(redis_instance, batch_id))
+
+        redis_instance.hincrby("PARSER_batch:{}".format(batch_id), "Success", 1)
+        self.assertIsNone(get_batch_progress_redis(redis_instance, batch_id))
@@ -28,9 +28,11 @@ class base_utils(TestCase):
 
 
 class mock_job_request(object):
-    def __init__(self, source="ARXIV", n_ids=1):
+    def __init__(self, source="ARXIV", n_ids=1, partition=0, offset=0):
         self.record_id = " ".join([str(uuid.uuid4()) for _ in range(0, n_ids)])
         self.source = source
+        self._partition = partition
+        self._offset = offset
 
     def value(self):
         with open("SciXParser/tests/stubdata/arxiv_raw_xml_data.xml", "r") as f:
@@ -43,6 +45,21 @@ class mock_job_request(object):
                 "datetime": datetime.now(),
             }
 
+    def error(self):
+        return None
+
+    def timestamp(self):
+        return (0, 0)
+
+    def topic(self):
+        return "ParserInput"
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
 
 class mock_reparse_job_request(object):
     def __init__(self, force=False, resend=False):
@@ -58,12 +75,52 @@ class mock_reparse_job_request(object):
             "resend": self.resend,
         }
 
+    def timestamp(self):
+        return (0, 0)
+
 
 class bad_producer(object):
     def produce(*args, **kwargs):
         raise ValueError
 
 
+class mock_producer(object):
+    def __init__(self):
+        self.produced = []
+        self.flushed = 0
+        self.undelivered = []
+
+    def produce(self, *args, **kwargs):
+        self.produced.append(kwargs.get("value"))
+        if kwargs.get("on_delivery"):
+            self.undelivered.append(kwargs["on_delivery"])
+
+    def poll(self, timeout=None):
+        delivered, self.undelivered = self.undelivered, []
+        for on_delivery in delivered:
+            on_delivery(None, None)
+        return len(delivered)
+
+    def flush(self, *args, **kwargs):
+        self.flushed += 1
+        self.poll()
+        return 0
+
+
+class mock_consumer(object):
+    def __init__(self, msgs):
+        self.msgs = list(msgs)
+        self.committed = []
+
+    def poll(self, timeout=None):
+        if self.msgs:
+            return self.msgs.pop(0)
+        return None
+
+    def commit(self, message=None, offsets=None, asynchronous=True):
+        self.committed.append(message if offsets is None else offsets)
+
+
 class mock_reparse_db_entry(object):
     def __init__(self, record_id, s3_key, record=None):
         self.id = record_id
@@ -0,0 +1,115 @@
+from unittest import IsolatedAsyncioTestCase
+
+import base
+from mock import Mock, patch
+from SciXPipelineUtils import utils
+
+from SciXParser.parser import db
+from SciXParser.parser.async_worker import STAGES, AsyncParserWorker, _Job
+from SciXParser.parser.parser import PARSER_APP
+from tests.common.mockschemaregistryclient import MockSchemaRegistryClient
+
+
+class TestAsyncParserWorker(IsolatedAsyncioTestCase):
+    async def test_async_worker_stages(self):
+        mock_job_requests = [
+            base.mock_job_request(offset=0),
+            base.mock_job_request(source="trash", offset=1),
+        ]
+        with open("SciXParser/tests/stubdata/AVRO_schemas/ParserOutputSchema.avsc") as f:
+            schema_str = f.read()
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_schema": patch.object(
+                    utils,
+                    "get_schema",
+                    return_value=schema_str,
+                )
+            }
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.schema_client = MockSchemaRegistryClient()
+            mock_app._init_logger()
+            consumer = base.mock_consumer([])
+            producer = base.mock_producer()
+            worker = AsyncParserWorker(mock_app, consumer, producer)
+            worker.start()
+            for mock_job_request in mock_job_requests:
+                await worker.submit(mock_job_request)
+            await worker.join()
+            for task in worker.tasks:
+                task.cancel()
+
+        self.assertEqual(len(producer.produced), 1)
+        self.assertEqual(
+            db.get_job_status_by_record_id(
+                mock_app, [mock_job_requests[0].value()["record_id"]]
+            ).name,
+            "Success",
+        )
+        self.assertEqual(
+            db.get_job_status_by_record_id(
+                mock_app, [mock_job_requests[1].value()["record_id"]]
+            ).name,
+            "Error",
+        )
+
+        self.assertEqual(consumer.committed[-1][0].offset, 2)
+
+        stats = worker.stats()
+        self.assertEqual(stats["timings"]["stage.prepare"]["count"], 2)
+        self.assertEqual(stats["timings"]["stage.parse"]["count"], 1)
+        self.assertEqual(stats["counters"]["records.Success"], 1)
+        for stage in STAGES:
+            self.assertEqual(stats["gauges"]["queue.{}".format(stage)], 0)
+
+    def test_async_worker_commit_watermark(self):
+        consumer = base.mock_consumer([])
+        mock_app = Mock(config={})
+        worker = AsyncParserWorker(mock_app, consumer, base.mock_producer())
+        jobs = [_Job(base.mock_job_request(offset=offset)) for offset in range(0, 3)]
+        other_partition = _Job(base.mock_job_request(partition=1, offset=7))
+        for job in jobs + [other_partition]:
+            worker._track(job)
+
+        # A later message finishing first must not commit past the one still in flight.
+        worker._complete(jobs[1])
+        worker._complete(other_partition)
+        self.assertEqual(len(consumer.committed), 1)
+        self.assertEqual(
+            (consumer.committed[0][0].partition, consumer.committed[0][0].offset), (1, 8)
+        )
+
+        worker._complete(jobs[0])
+        self.assertEqual(
+            (consumer.committed[-1][0].partition, consumer.committed[-1][0].offset), (0, 2)
+        )
+        worker._complete(jobs[2])
+        self.assertEqual(consumer.committed[-1][0].offset, 3)
+
+    def test_async_worker_commits_after_delivery(self):
+        consumer = base.mock_consumer([])
+        mock_app = Mock(config={})
+        worker = AsyncParserWorker(mock_app, consumer, base.mock_producer())
+        jobs = [_Job(base.mock_job_request(offset=offset)) for offset in range(0, 3)]
+        for job in jobs:
+            worker._track(job)
+            job.delivered = False
+
+        # A job that has been through every stage waits for its output to be delivered.
+        worker._complete(jobs[0])
+        self.assertEqual(consumer.committed, [])
+        worker._delivered(jobs[0], None)
+        self.assertEqual(consumer.committed[-1][0].offset, 1)
+
+        # A delivery report may also arrive before the publish stage is over.
+        worker._delivered(jobs[1], None)
+        self.assertEqual(len(consumer.committed), 1)
+        worker._complete(jobs[1])
+        self.assertEqual(consumer.committed[-1][0].offset, 2)
+
+        # A failed delivery is never committed.
+        worker._complete(jobs[2])
+        worker._delivered(jobs[2], "Message timed out")
+        self.assertEqual(consumer.committed[-1][0].offset, 2)
+        mock_app.logger.error.assert_called_once()
@@ -0,0 +1,81 @@
+import tempfile
+import uuid
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import base
+
+from SciXParser.parser import bulk_load, db, models
+from SciXParser.parser.parser import PARSER_APP
+
+
+class TestBulkLoad(TestCase):
+    def test_copy_value(self):
+        self.assertEqual(bulk_load._copy_value(None), "\\N")
+        self.assertEqual(bulk_load._copy_value("a\tb\nc\\d"), "a\\tb\\nc\\\\d")
+        self.assertEqual(bulk_load._copy_value({"title": "A"}), '{"title": "A"}')
+        self.assertEqual(
+            bulk_load._copy_value(datetime(2023, 6, 1, 12, 30)), "2023-06-01T12:30:00"
+        )
+        self.assertEqual(bulk_load._copy_value(models.Source.ARXIV), "ARXIV")
+        record_id = uuid.uuid4()
+        self.assertEqual(bulk_load._copy_value(record_id), str(record_id))
+
+    def test_load_records(self):
+        mock_job_requests = [base.mock_job_request() for _ in range(0, 3)]
+        mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+        mock_app._init_logger()
+
+        statuses = bulk_load.load_records(
+            mock_app, [mock_job_request.value() for mock_job_request in mock_job_requests]
+        )
+        for mock_job_request in mock_job_requests:
+            record_id = mock_job_request.value()["record_id"]
+            self.assertEqual(statuses[record_id], "Success")
+            self.assertEqual(db.get_job_status_by_record_id(mock_app, [record_id]).name, "Success")
+            with mock_app.session_scope() as session:
+                self.assertNotEqual(db.get_parser_record(session, record_id).parsed_data, None)
+
+        statuses = bulk_load.load_records(
+            mock_app, [mock_job_request.value() for mock_job_request in mock_job_requests]
+        )
+        self.assertEqual(set(statuses.values()), {"Unchanged"})
+        self.assertEqual(mock_app.metrics.snapshot()["counters"]["records_skipped"], 3)
+
+    def test_load_records_failed_merge(self):
+        mock_job_requests = [base.mock_job_request() for _ in range(0, 2)]
+        mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+        mock_app._init_logger()
+        mock_app.schema_cache = Mock()
+        producer = Mock()
+
+        # Nothing is produced for a load that is rolled back and retried record by record.
+        with patch.object(bulk_load, "copy_job_statuses", side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                bulk_load.load_records(
+                    mock_app,
+                    [mock_job_request.value() for mock_job_request in mock_job_requests],
+                    producer,
+                )
+        producer.produce.assert_not_called()
+
+        statuses = bulk_load.load_records(
+            mock_app,
+            [mock_job_request.value() for mock_job_request in mock_job_requests],
+            producer,
+        )
+        self.assertEqual(set(statuses.values()), {"Success"})
+        self.assertEqual(producer.produce.call_count, 2)
+
+    def test_read_backfill_file(self):
+        record_id = str(uuid.uuid4())
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as f:
+            f.write("{} /{}\n\n{}\n".format(record_id, record_id, uuid.uuid4()))
+            f.flush()
+            logger = Mock()
+            self.assertEqual(
+                list(bulk_load.read_backfill_file(f.name, logger=logger)),
+                [{"record_id": record_id, "s3_path": "/{}".format(record_id), "task": "ARXIV"}],
+            )
+            self.assertIn("line 3", logger.error.call_args[0][0])
@@ -1,5 +1,10 @@
 import json
 import os
+import uuid
+from collections import deque
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
 from unittest import TestCase
 
 import base
@@ -7,11 +12,13 @@ import boto3
 import moto
 import pytest
 from confluent_kafka.avro import AvroProducer
-from mock import patch
+from mock import Mock, patch
 from SciXPipelineUtils import s3_methods, utils
+from sqlalchemy import event
 
-from SciXParser.parser import db
-from SciXParser.parser.parser import PARSER_APP
+from SciXParser.parser import db, parsing_handler
+from SciXParser.parser.parser import PARSER_APP, PollBackoff
+from SciXParser.parser.registry import registry
 from tests.common.mockschemaregistryclient import MockSchemaRegistryClient
 
 
@@ -43,6 +50,33 @@ class TestParser(TestCase):
                     "Success",
                 )
 
+    def test_parser_task_single_transaction(self):
+        mock_job_request = base.mock_job_request()
+        with open("SciXParser/tests/stubdata/AVRO_schemas/ParserOutputSchema.avsc") as f:
+            schema_str = f.read()
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_schema": patch.object(
+                    utils,
+                    "get_schema",
+                    return_value=schema_str,
+                )
+            }
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.schema_client = MockSchemaRegistryClient()
+            mock_app._init_logger()
+            commits = []
+            event.listen(mock_app.engine, "commit", lambda conn: commits.append(conn))
+            mock_app.parser_task(mock_job_request, base.mock_producer())
+            self.assertEqual(len(commits), 1)
+            self.assertEqual(
+                db.get_job_status_by_record_id(
+                    mock_app, [mock_job_request.value()["record_id"]]
+                ).name,
+                "Success",
+            )
+
     def test_parser_task_producer_failure(self):
         mock_job_request = base.mock_job_request()
         url = "https://test.bucket.domain"
@@ -72,6 +106,252 @@ class TestParser(TestCase):
                     ).name,
                     "Error",
                 )
+                # The Processing status cached at the start of the task is replaced.
+                mock_app.status_publisher.flush()
+                record_id = str(mock_job_request.value()["record_id"])
+                self.assertEqual(
+                    db.get_cached_statuses_redis(mock_app.redis, [record_id]),
+                    {record_id: "Error"},
+                )
+
+    def test_parser_batch_task(self):
+        mock_job_requests = [base.mock_job_request(), base.mock_job_request(source="trash")]
+        with open("SciXParser/tests/stubdata/AVRO_schemas/ParserOutputSchema.avsc") as f:
+            schema_str = f.read()
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_schema": patch.object(
+                    utils,
+                    "get_schema",
+                    return_value=schema_str,
+                )
+            }
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.schema_client = MockSchemaRegistryClient()
+            mock_app._init_logger()
+            mock_app.config["PARSER_CONSUMER_BATCH_SIZE"] = 5
+            consumer = base.mock_consumer(mock_job_requests)
+            msgs = mock_app._consume_batch_from_topic(consumer)
+            self.assertEqual(len(msgs), 2)
+
+            producer = base.mock_producer()
+            mock_app.parser_batch_task(msgs, producer)
+            self.assertEqual(len(producer.produced), 1)
+            self.assertEqual(producer.flushed, 1)
+            self.assertEqual(
+                db.get_job_status_by_record_id(
+                    mock_app, [mock_job_requests[0].value()["record_id"]]
+                ).name,
+                "Success",
+            )
+            self.assertEqual(
+                db.get_job_status_by_record_id(
+                    mock_app, [mock_job_requests[1].value()["record_id"]]
+                ).name,
+                "Error",
+            )
+
+    def test_parser_task_parse_executor(self):
+        mock_job_request = base.mock_job_request()
+        with open("SciXParser/tests/stubdata/AVRO_schemas/ParserOutputSchema.avsc") as f:
+            schema_str = f.read()
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_schema": patch.object(
+                    utils,
+                    "get_schema",
+                    return_value=schema_str,
+                )
+            }
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.schema_client = MockSchemaRegistryClient()
+            mock_app._init_logger()
+            consumer = base.mock_consumer([])
+            producer = base.mock_producer()
+            with futures.ProcessPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(
+                    parsing_handler.parse_metadata,
+                    "ARXIV",
+                    mock_job_request.value()["record_xml"],
+                )
+                in_flight = {("ParserInput", 0): deque([(mock_job_request, future, False)])}
+                mock_app._drain_parsed(consumer, producer, in_flight, block=True)
+            self.assertEqual(consumer.committed, [mock_job_request])
+            self.assertEqual(producer.flushed, 1)
+            self.assertEqual(
+                producer.produced[0]["record_id"], mock_job_request.value()["record_id"]
+            )
+            self.assertEqual(
+                db.get_job_status_by_record_id(
+                    mock_app, [mock_job_request.value()["record_id"]]
+                ).name,
+                "Success",
+            )
+
+    def test_submit_parse_unchanged_input(self):
+        mock_job_request = base.mock_job_request()
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_schema": patch.object(utils, "get_schema", return_value="{}"),
+                "input_hash_unchanged": patch.object(
+                    parsing_handler, "input_hash_unchanged", return_value=True
+                ),
+            }
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.parse_executor = Mock()
+            mock_app.parser_task = Mock()
+            in_flight = {}
+            mock_app._submit_parse(mock_job_request, in_flight)
+            mock_app.parse_executor.submit.assert_not_called()
+            self.assertEqual(list(in_flight[("ParserInput", 0)]), [(mock_job_request, None, True)])
+            # The result of the hash check is handed to the consumer task.
+            mock_app._drain_parsed(base.mock_consumer([]), base.mock_producer(), in_flight)
+            self.assertIs(mock_app.parser_task.call_args[1]["unchanged"], True)
+            self.assertEqual(parsing_handler.input_hash_unchanged.call_count, 1)
+
+            # A message for a record with an earlier message in flight is checked again.
+            in_flight = {}
+            mock_app._submit_parse(mock_job_request, in_flight)
+            mock_app._submit_parse(mock_job_request, in_flight)
+        self.assertEqual(
+            [unchanged for _, _, unchanged in in_flight[("ParserInput", 0)]], [True, None]
+        )
+
+    def test_parse_executor_partition_order(self):
+        first, second = base.mock_job_request(offset=0), base.mock_job_request(offset=1)
+        other_partition = base.mock_job_request(partition=1, offset=0)
+        parse_futures = [futures.Future() for _ in range(0, 3)]
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_schema": patch.object(utils, "get_schema", return_value="{}"),
+                "input_hash_unchanged": patch.object(
+                    parsing_handler, "input_hash_unchanged", return_value=False
+                ),
+            }
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.parse_executor = Mock()
+            mock_app.parse_executor.submit.side_effect = parse_futures
+            finished = []
+            mock_app._finish_parsed = lambda producer, msg, future, unchanged: finished.append(msg)
+            in_flight = {}
+            for msg in (first, second, other_partition):
+                mock_app._submit_parse(msg, in_flight)
+
+            # The second message of the partition is parsed before the first one.
+            parse_futures[1].set_result({})
+            parse_futures[2].set_result({})
+            mock_app._drain_parsed(None, None, in_flight)
+            self.assertEqual(finished, [other_partition])
+
+            parse_futures[0].set_result({})
+            mock_app._drain_parsed(None, None, in_flight, block=True)
+        self.assertEqual(finished, [other_partition, first, second])
+
+    def test_parse_executor_failed_task(self):
+        first, second = base.mock_job_request(offset=0), base.mock_job_request(offset=1)
+        with base.base_utils.mock_multiple_targets(
+            {"get_schema": patch.object(utils, "get_schema", return_value="{}")}
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.parser_task = Mock(side_effect=[None, ValueError()])
+            consumer = base.mock_consumer([])
+            producer = base.mock_producer()
+            in_flight = {("ParserInput", 0): deque([(first, None, None)])}
+            mock_app._drain_parsed(consumer, producer, in_flight)
+            # The output of the message is delivered before its offset is committed.
+            self.assertEqual((producer.flushed, consumer.committed), (1, [first]))
+
+            in_flight[("ParserInput", 0)].append((second, None, None))
+            mock_app._drain_parsed(consumer, producer, in_flight)
+        self.assertEqual((producer.flushed, consumer.committed), (1, [first]))
+
+    def test_parse_executor_failed_submit(self):
+        mock_job_request = base.mock_job_request()
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_schema": patch.object(utils, "get_schema", return_value="{}"),
+                "input_hash_unchanged": patch.object(
+                    parsing_handler, "input_hash_unchanged", return_value=False
+                ),
+            }
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.parse_executor = Mock()
+            mock_app.parse_executor.submit.side_effect = BrokenProcessPool()
+            registry.set_concurrency({"ARXIV": 1})
+            try:
+                in_flight = {}
+                mock_app._submit_parse(mock_job_request, in_flight)
+                # The slot taken for the record has been released.
+                self.assertTrue(registry._limits["ARXIV"].acquire(blocking=False))
+            finally:
+                registry.set_concurrency({})
+        self.assertEqual(list(in_flight[("ParserInput", 0)]), [(mock_job_request, None, False)])
+
+    def test_report_stats_if_due(self):
+        with base.base_utils.mock_multiple_targets(
+            {"get_schema": patch.object(utils, "get_schema", return_value="{}")}
+        ):
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+        mock_app.metrics.incr("records_skipped")
+        mock_app.config["PARSER_STATS_INTERVAL"] = 60
+        self.assertFalse(mock_app._report_stats_if_due())
+        mock_app.config["PARSER_STATS_INTERVAL"] = 0
+        with patch.object(mock_app.logger, "info") as info:
+            self.assertTrue(mock_app._report_stats_if_due())
+        self.assertIn('"records_skipped": 1', info.call_args[0][0])
+
+    def test_poll_backoff(self):
+        backoff = PollBackoff(0.1, 0.5)
+        self.assertEqual(backoff.timeout, 0.1)
+        for _ in range(5):
+            backoff.idle()
+        self.assertEqual(backoff.timeout, 0.5)
+        backoff.reset()
+        self.assertEqual(backoff.timeout, 0.1)
+
+    def test_compute_fingerprint(self):
+        with open("SciXParser/tests/stubdata/arxiv_parsed_data.json", "r") as f:
+            parsed_record = json.load(f)
+        fingerprint = parsing_handler.compute_fingerprint(parsed_record)
+
+        reordered_record = dict(reversed(list(parsed_record.items())))
+        reordered_record["recordData"] = dict(parsed_record["recordData"], parsedTime="now")
+        self.assertEqual(parsing_handler.compute_fingerprint(reordered_record), fingerprint)
+
+        changed_record = dict(parsed_record, abstract="A different abstract")
+        self.assertNotEqual(parsing_handler.compute_fingerprint(changed_record), fingerprint)
+
+    def test_write_parser_record_replay(self):
+        mock_job_request = base.mock_job_request()
+        with open("SciXParser/tests/stubdata/arxiv_parsed_data.json", "r") as f:
+            parsed_record = json.load(f)
+        mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+        record_id = mock_job_request.value()["record_id"]
+        date = datetime.now()
+
+        db.write_job_status(mock_app, mock_job_request.value())
+        db.write_job_status(mock_app, mock_job_request.value())
+        self.assertTrue(db.write_parser_record(mock_app, record_id, date, "/s3_key", {}, "ARXIV"))
+        self.assertTrue(
+            db.write_parser_record(mock_app, record_id, date, "/s3_key", parsed_record, "ARXIV")
+        )
+        with mock_app.session_scope() as session:
+            self.assertEqual(db.get_parser_record(session, record_id).parsed_data, parsed_record)
+            self.assertEqual(
+                db.upsert_parser_records(
+                    session,
+                    [
+                        {"id": record_id, "s3_key": "/s3_key", "source": "ARXIV"},
+                        {"id": str(uuid.uuid4()), "s3_key": "/s3_key", "source": "ARXIV"},
+                    ],
+                ),
+                2,
+            )
 
     def test_parser_task_bad_source(self):
         mock_job_request = base.mock_job_request(source="trash")
@@ -321,6 +601,78 @@ class TestParser(TestCase):
                 ).name,
                 "Unchanged",
             )
+            with mock_app.session_scope() as session:
+                self.assertEqual(
+                    db.get_parser_record_input_hash(session, return_value.id),
+                    parsing_handler.compute_input_hash("ARXIV", raw_record),
+                )
+                self.assertEqual(
+                    db.get_parser_record_fingerprint(session, return_value.id),
+                    parsing_handler.compute_fingerprint(parsed_record),
+                )
+        moto_fake.stop()
+
+    @moto.mock_s3
+    def test_reparse_task_unchanged_input(self):
+        mock_job_request = base.mock_reparse_job_request(force=False, resend=False)
+        with open("SciXParser/tests/stubdata/arxiv_raw_xml_data.xml", "rb") as f:
+            raw_record = f.read()
+
+        with open("SciXParser/tests/stubdata/AVRO_schemas/ParserOutputSchema.avsc") as f:
+            schema_str = f.read()
+
+        with open("SciXParser/tests/stubdata/arxiv_parsed_data.json", "r") as f:
+            parsed_record = json.load(f)
+
+        mock_config = {"S3_PROVIDERS": ["AWS"], "AWS_BUCKET_NAME": "BUCKETNAME"}
+        moto_fake = moto.mock_s3()
+        moto_fake.start()
+        conn = boto3.resource("s3")
+        conn.create_bucket(Bucket="BUCKETNAME")
+        buckets = s3_methods.load_s3_providers(mock_config)
+        file_bytes = raw_record
+        object_name = "/{}".format(mock_job_request.record_id)
+        for producer in buckets:
+            buckets[producer].write_object_s3(file_bytes=file_bytes, object_name=object_name)
+
+        with base.base_utils.mock_multiple_targets(
+            {
+                "get_schema": patch.object(
+                    utils,
+                    "get_schema",
+                    return_value=schema_str,
+                ),
+                "parse_metadata": patch.object(parsing_handler, "parse_metadata"),
+            }
+        ) as mocked:
+            return_value = base.mock_reparse_db_entry(
+                str(mock_job_request.record_id),
+                "/{}".format(mock_job_request.record_id),
+                parsed_record,
+            )
+            mock_app = PARSER_APP(proj_home="SciXParser/tests/stubdata/")
+            mock_app.schema_client = MockSchemaRegistryClient()
+            mock_app._init_logger()
+            producer = AvroProducer({}, schema_registry=mock_app.schema_client)
+            db.write_parser_record(
+                mock_app,
+                return_value.id,
+                return_value.date_created,
+                return_value.s3_key,
+                return_value.parsed_data,
+                return_value.source,
+                input_hash=parsing_handler.compute_input_hash("ARXIV", raw_record),
+            )
+            db.write_job_status(mock_app, mock_job_request.value())
+            mock_app.parser_task(mock_job_request, producer)
+            self.assertEqual(
+                db.get_job_status_by_record_id(
+                    mock_app, [mock_job_request.value()["record_id"]]
+                ).name,
+                "Unchanged",
+            )
+            mocked["parse_metadata"].assert_not_called()
+            self.assertEqual(mock_app.metrics.snapshot()["counters"]["records_skipped"], 1)
         moto_fake.stop()
 
     @moto.mock_s3
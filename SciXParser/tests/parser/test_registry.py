@@ -0,0 +1,51 @@
+import json
+import threading
+from unittest import TestCase
+
+from SciXParser.parser.registry import ParserRegistry, registry
+
+
+class fake_parser(object):
+    def parse(self, metadata):
+        return {"parsed": metadata}
+
+
+class TestParserRegistry(TestCase):
+    def test_registry_lazy_factory(self):
+        test_registry = ParserRegistry()
+        test_registry.register("FAKE", "json:JSONDecoder")
+        self.assertEqual(test_registry.parsers["FAKE"]["factory"], "json:JSONDecoder")
+        self.assertIsInstance(test_registry.get_parser("FAKE"), json.JSONDecoder)
+        self.assertEqual(test_registry.parsers["FAKE"]["factory"], json.JSONDecoder)
+
+    def test_registry_reusable_parsers(self):
+        test_registry = ParserRegistry()
+        test_registry.register("REUSABLE", fake_parser)
+        test_registry.register("SINGLE_USE", fake_parser, reusable=False)
+        self.assertIs(test_registry.get_parser("REUSABLE"), test_registry.get_parser("REUSABLE"))
+        self.assertIsNot(
+            test_registry.get_parser("SINGLE_USE"), test_registry.get_parser("SINGLE_USE")
+        )
+        self.assertEqual(test_registry.parse("REUSABLE", "xml"), {"parsed": "xml"})
+
+        other_thread_parser = []
+        thread = threading.Thread(
+            target=lambda: other_thread_parser.append(test_registry.get_parser("REUSABLE"))
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(other_thread_parser[0], test_registry.get_parser("REUSABLE"))
+
+    def test_registry_concurrency(self):
+        test_registry = ParserRegistry()
+        test_registry.register("FAKE", fake_parser)
+        test_registry.set_concurrency({"FAKE": 1})
+        with test_registry.slot("FAKE"):
+            self.assertFalse(test_registry._limits["FAKE"].acquire(blocking=False))
+        self.assertTrue(test_registry._limits["FAKE"].acquire(blocking=False))
+
+    def test_registry_unknown_source(self):
+        self.assertIn("ARXIV", registry)
+        self.assertNotIn("trash", registry)
+        with self.assertRaises(KeyError):
+            registry.get_parser("trash")
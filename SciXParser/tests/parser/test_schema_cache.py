@@ -0,0 +1,46 @@
+import logging
+from unittest import TestCase
+
+from confluent_kafka.schema_registry import Schema
+
+from SciXParser.parser.schema_cache import SchemaCache
+from tests.common.mockschemaregistryclient import MockSchemaRegistryClient
+
+
+class mock_app(object):
+    def __init__(self, schema_client):
+        self.logger = logging.getLogger(__name__)
+        self.schema_client = schema_client
+
+
+class TestSchemaCache(TestCase):
+    def setUp(self):
+        self.schema_client = MockSchemaRegistryClient()
+        self.schema_name = "ParserOutputSchema"
+        with open("SciXParser/tests/stubdata/AVRO_schemas/ParserOutputSchema.avsc") as f:
+            self.schema_str = f.read()
+        self.schema_client.register(self.schema_name, Schema(self.schema_str, "AVRO"))
+
+    def test_schema_cache_hits(self):
+        cache = SchemaCache(mock_app(self.schema_client), ttl=300)
+        cache.warm([self.schema_name])
+        self.assertEqual(cache.get(self.schema_name), self.schema_str)
+        self.assertEqual(cache.get(self.schema_name), self.schema_str)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "cached": 1})
+
+    def test_schema_cache_invalidate(self):
+        cache = SchemaCache(mock_app(self.schema_client), ttl=300)
+        cache.get(self.schema_name)
+        cache.invalidate(self.schema_name)
+        cache.get(self.schema_name)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.hits, 0)
+
+    def test_schema_cache_expired_registry_failure(self):
+        cache = SchemaCache(mock_app(self.schema_client), ttl=0)
+        cache.get(self.schema_name)
+        cache.app.schema_client = MockSchemaRegistryClient()
+        self.assertEqual(cache.get(self.schema_name), self.schema_str)
+        self.assertEqual(cache.misses, 2)
+        with self.assertRaises(Exception):
+            cache.get("FakeSchema")
@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from SciXParser.parser import db
+from SciXParser.parser.status_buffer import TERMINAL_STATUSES, StatusBuffer
+
+
+class mock_app(object):
+    def __init__(self):
+        self.Session = Mock()
+
+
+class TestStatusBuffer(TestCase):
+    def test_status_buffer_coalesces(self):
+        status_buffer = StatusBuffer(mock_app(), interval=300, max_size=10)
+        with patch.object(db, "update_job_statuses") as update_job_statuses:
+            self.assertTrue(status_buffer.add("record-1", "Pending"))
+            self.assertTrue(status_buffer.add("record-1", "Processing"))
+            self.assertTrue(status_buffer.add("record-2", "Processing"))
+            self.assertTrue(status_buffer.add("record-3", "Processing"))
+            self.assertFalse(status_buffer.add("record-3", "Success"))
+            update_job_statuses.assert_not_called()
+            self.assertEqual(len(status_buffer), 2)
+
+            self.assertEqual(status_buffer.flush(), 2)
+            update_job_statuses.assert_called_once()
+            args, kwargs = update_job_statuses.call_args
+            self.assertEqual(args[1], {"record-1": "Processing", "record-2": "Processing"})
+            self.assertEqual(kwargs["keep"], TERMINAL_STATUSES)
+            self.assertEqual(len(status_buffer), 0)
+            self.assertEqual(status_buffer.flush(), 0)
+            self.assertEqual(status_buffer.flushes, 1)
+
+    def test_status_buffer_flushes_when_full_or_due(self):
+        status_buffer = StatusBuffer(mock_app(), interval=300, max_size=3)
+        with patch.object(db, "update_job_statuses") as update_job_statuses:
+            for record_id in ["record-1", "record-2", "record-3"]:
+                status_buffer.add(record_id, "Pending")
+            self.assertEqual(update_job_statuses.call_count, 1)
+            self.assertEqual(len(status_buffer), 0)
+
+            status_buffer.add("record-4", "Pending")
+            status_buffer.flush_if_due()
+            self.assertEqual(update_job_statuses.call_count, 1)
+            status_buffer.interval = 0
+            status_buffer.flush_if_due()
+            self.assertEqual(update_job_statuses.call_count, 2)
+
+    def test_status_buffer_flushes_on_own_session(self):
+        app = mock_app()
+        status_buffer = StatusBuffer(app, interval=300, max_size=10)
+        status_buffer.add("record-1", "Processing")
+        with patch.object(db, "update_job_statuses") as update_job_statuses:
+            with patch.object(db, "current_session", return_value=Mock()):
+                status_buffer.flush()
+        session = app.Session.return_value
+        self.assertIs(update_job_statuses.call_args[0][0], session)
+        session.commit.assert_called_once()
+        session.close.assert_called_once()
+
+    def test_status_buffer_defers_flush_in_unit_of_work(self):
+        status_buffer = StatusBuffer(mock_app(), interval=0, max_size=1)
+        with patch.object(db, "update_job_statuses") as update_job_statuses:
+            # The unit of work of a batch holds the row lock of a record seen twice in it.
+            with patch.object(db, "current_session", return_value=Mock()):
+                self.assertTrue(status_buffer.add("record-1", "Pending"))
+                self.assertTrue(status_buffer.add("record-1", "Processing"))
+                self.assertTrue(status_buffer.add("record-2", "Processing"))
+            update_job_statuses.assert_not_called()
+            self.assertTrue(status_buffer.due())
+
+            status_buffer.flush_if_due()
+            update_job_statuses.assert_called_once()
+            self.assertEqual(
+                update_job_statuses.call_args[0][1],
+                {"record-1": "Processing", "record-2": "Processing"},
+            )
@@ -0,0 +1,129 @@
+import json
+import threading
+from unittest import TestCase
+
+from SciXParser.parser import db
+from SciXParser.parser.metrics import Metrics
+from SciXParser.parser.status_publisher import (
+    StatusPublisher,
+    get_connection_pool,
+    get_redis,
+)
+
+
+class mock_pipeline(object):
+    def __init__(self, redis_instance):
+        self.redis_instance = redis_instance
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append((channel, message))
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.messages.append((name, fields["status"]))
+
+    def hset(self, name, mapping):
+        self.messages.append((name, mapping["status"]))
+
+    def expire(self, name, ttl):
+        pass
+
+    def execute(self):
+        if self.redis_instance.fail:
+            raise ConnectionError("redis is unavailable")
+        self.redis_instance.executed.append(self.messages)
+
+
+class mock_script(object):
+    def __init__(self, script):
+        self.script = script
+
+    def __call__(self, keys=None, args=None, client=None):
+        client.messages.append((keys[0], args[1]))
+
+
+class mock_redis(object):
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.executed = []
+        self.registered = []
+        self.blocked = threading.Event()
+        self.blocked.set()
+
+    def register_script(self, script):
+        self.registered.append(script)
+        return mock_script(script)
+
+    def pipeline(self, transaction=True):
+        self.blocked.wait()
+        return mock_pipeline(self)
+
+
+class TestStatusPublisher(TestCase):
+    def test_status_publisher_pipelines(self):
+        redis_instance = mock_redis()
+        metrics = Metrics()
+        publisher = StatusPublisher(redis_instance, metrics=metrics, max_batch=3)
+        # Hold the first pipeline so that the rest of the statuses queue up behind it.
+        redis_instance.blocked.clear()
+        publisher.publish("PARSER_statuses", "0")
+        for message in range(1, 6):
+            publisher.publish("PARSER_statuses", str(message))
+        redis_instance.blocked.set()
+        publisher.flush()
+
+        messages = [message for pipeline in redis_instance.executed for _, message in pipeline]
+        self.assertEqual(messages, [str(message) for message in range(0, 6)])
+        self.assertLess(len(redis_instance.executed), 6)
+        self.assertTrue(all(len(pipeline) <= 3 for pipeline in redis_instance.executed))
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"]["redis.published"], 6)
+        self.assertEqual(
+            snapshot["timings"]["redis.publish"]["count"], len(redis_instance.executed)
+        )
+
+    def test_status_publisher_failure(self):
+        metrics = Metrics()
+        publisher = StatusPublisher(mock_redis(fail=True), metrics=metrics)
+        publisher.publish("PARSER_statuses", "0")
+        publisher.flush()
+        self.assertEqual(metrics.snapshot()["counters"]["redis.publish_failures"], 1)
+
+    def test_shared_connection_pool(self):
+        config = {"REDIS_HOST": "localhost", "REDIS_PORT": 6379}
+        self.assertIs(get_connection_pool(config), get_connection_pool(dict(config)))
+        self.assertIs(get_redis(config).connection_pool, get_connection_pool(config))
+
+    def test_status_publisher_channels(self):
+        redis_instance = mock_redis()
+        publisher = StatusPublisher(redis_instance, channel_mode="sharded", channel_shards=4)
+        job_ids = [str(job_id) for job_id in range(0, 20)]
+        for job_id in job_ids:
+            db.write_status_redis(publisher, json.dumps({"job_id": job_id, "status": "Success"}))
+        publisher.flush()
+
+        channels = [
+            channel
+            for pipeline in redis_instance.executed
+            for channel, _ in pipeline
+            if channel.startswith(db.STATUS_CHANNEL)
+        ]
+        self.assertEqual(channels, [db.status_channel(job_id, "sharded", 4) for job_id in job_ids])
+        self.assertEqual(len(set(channels)), 4)
+        # The status update script is registered once, and then run with EVALSHA.
+        self.assertEqual(redis_instance.registered, [db.STATUS_UPDATE_SCRIPT])
+        self.assertEqual(db.status_channel("1234", "job"), "PARSER_statuses:1234")
+        self.assertEqual(db.status_channel("1234"), "PARSER_statuses")
+
+    def test_status_publisher_stream(self):
+        redis_instance = mock_redis()
+        publisher = StatusPublisher(
+            redis_instance, channel_mode="job", transport="stream", stream_maxlen=10
+        )
+        db.write_status_redis(publisher, json.dumps({"job_id": "1234", "status": "Success"}))
+        publisher.flush()
+
+        self.assertIn(("PARSER_status_stream:1234", "Success"), redis_instance.executed[0])
+        self.assertIn(("PARSER_status:1234", "Success"), redis_instance.executed[0])
+        self.assertNotIn("PARSER_statuses:1234", [name for name, _ in redis_instance.executed[0]])
+        self.assertLess(db.stream_id("1700000000000-1"), db.stream_id("1700000000000-12"))